@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+
+"""Mesure le débit des moteurs du pipeline VLM sur des données synthétiques.
+
+Chaque banc d'essai génère un jeu de données déterministe (aucun rapport
+réel n'est nécessaire), exécute les variantes à comparer sur les mêmes
+entrées, vérifie qu'elles produisent un résultat identique, puis affiche
+le débit de chacune et le gain obtenu.
+
+Bancs d'essai disponibles :
+  clean  — clean_report.py : moteur ``text`` (ligne à ligne) vs ``bytes``.
+  copt   — découpage des ``Copt@Val`` (reformat_copt.py et build_json.py) :
+           ancien parcours caractère par caractère vs lexeur ``copt_lexer``.
+  json   — build_json.py : vérification ``ET.parse`` puis conversion de
+           l'arbre complet vs conversion en flux, en une seule lecture.
+
+Exemple :
+    python script/benchmark.py clean --size-mb 50
+    python script/benchmark.py copt --size-mb 5
+    python script/benchmark.py json --size-mb 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import logging
+import random
+import re
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from pathlib import Path
+
+# Les scripts du pipeline importent « utils » à plat : src/ doit être
+# dans sys.path avant leur import.
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+import build_json  # noqa: E402
+import clean_report  # noqa: E402
+import reformat_copt  # noqa: E402
+
+_OPTIONS = (
+    "RENT",
+    "NOOPT",
+    "OPT(2)",
+    "DATA(31)",
+    "CSECT(CODE, ACCPRINT)",
+    "ARCH(10)",
+    "TRUNC(BIN)",
+    "NODYNAM",
+    "LEINFO=(A B CDbiPathBase() C)",
+)
+
+# Options supplémentaires du banc copt (groupes avec blancs et virgules).
+_COPT_OPTIONS = (
+    *_OPTIONS,
+    "XREF(FULL)",
+    "TEST(NOEJPD, SOURCE)",
+    "SQL('APOSTSQL, QUOTE')",
+    "ARITH(EXTEND)",
+    "CP(1147)",
+    "LIST",
+    "MAP",
+)
+
+# Une loadlib sur _EMPTY_LIB_PERIOD est vide (message FMNBE329).
+_EMPTY_LIB_PERIOD = 17
+
+
+def generate_report(path: Path, size_mb: int, seed: int = 42) -> int:
+    """Écrit un rapport VLM brut synthétique d'environ ``size_mb`` Mo.
+
+    Le rapport reproduit la structure réelle : en-tête File Manager,
+    sections ``DSNIN=``, blocs ``<vlm>`` avec loadmods et CSECTs, messages
+    ``FMNBB437`` / ``FMNBE329`` et caractère ASA en colonne 1.
+
+    Returns:
+        Taille du fichier généré, en octets.
+
+    """
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with path.open("w", encoding="iso8859-1", newline="") as f_out:
+        written += f_out.write(
+            "1IBM File Manager for z/OS\n FMNBA001 Version 15\n"
+            " DEFAULT SET FILEMAN\n PRINTOUT=SYSOUT\n"
+        )
+        lib = 0
+        while written < target:
+            chunk = [f" $$FILEM VLM   DSNIN=APP{lib:05d}.LOAD.LIB,\n"]
+            if lib % _EMPTY_LIB_PERIOD == 0:
+                chunk.append(" FMNBE329  The PDS contains no members\n")
+            else:
+                chunk.append("0<vlm>\n")
+                members = rng.randint(5, 40)
+                for member in range(members):
+                    name = f"P{lib:04d}{member:03d}"
+                    chunk.append(
+                        f'0  <Loadmod Name="{name}" Linkedon="2025/06/01"'
+                        ' Linkedat="10:32:00"\n'
+                        '             Linkedby="IEWL" EPA="00000000"'
+                        ' MSize="000080" TTR="000001"\n'
+                        '             SSI="" AC="0" AM="31" RM="24">\n'
+                    )
+                    for csect in range(rng.randint(1, 6)):
+                        copt = "  ".join(rng.sample(_OPTIONS, 5))
+                        chunk.append(
+                            f'0    <CSECT Name="{name}{csect}" Type="SD"'
+                            ' Class="B_TEXT" Address="00000000"\n'
+                            '           Size="000060" ARMODE="31"'
+                            ' Compiler1="Enterpr.COBOL for z/OS V6R3"'
+                            ' Date="2025/06/01">\n'
+                            '      <Identify Val="PRF/ABCD1234/DY012345678"/>\n'
+                            f'      <Copt Val="{copt}"/>\n'
+                            "0    </CSECT>\n"
+                        )
+                    chunk.append("0  </Loadmod>\n")
+                chunk.append("0</vlm>\n")
+                chunk.append(f" FMNBB437    {members} member(s) read\n")
+            written += f_out.write("".join(chunk))
+            lib += 1
+        f_out.write(" FMNBA010 end\n")
+    return path.stat().st_size
+
+
+def time_run(func: Callable[[], object], repeat: int) -> float:
+    """Retourne la meilleure durée (secondes) sur ``repeat`` exécutions."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(label: str, size: int, seconds: float) -> None:
+    """Affiche le débit d'une variante en Mo/s."""
+    mb_per_s = size / (1024 * 1024) / seconds
+    print(f"  {label:<40} {seconds:8.3f} s  {mb_per_s:8.1f} Mo/s")
+
+
+def bench_clean(size_mb: int, repeat: int) -> None:
+    """Compare les moteurs ``text`` et ``bytes`` de ``clean_report``."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        report_path = tmp_dir / "vlm.txt"
+        size = generate_report(report_path, size_mb)
+        print(f"clean_report — rapport synthétique de {size / 1e6:.1f} Mo")
+
+        timings: dict[str, float] = {}
+        outputs: dict[str, bytes] = {}
+        for engine in ("text", "bytes"):
+            out_path = tmp_dir / f"clean_{engine}.xml"
+            timings[engine] = time_run(
+                lambda engine=engine, out_path=out_path: (
+                    clean_report.convert_report(
+                        report_path, out_path, "iso8859-1", engine=engine
+                    )
+                ),
+                repeat,
+            )
+            outputs[engine] = out_path.read_bytes()
+            report(f"moteur {engine}", size, timings[engine])
+
+        if outputs["text"] != outputs["bytes"]:
+            print("ERREUR : les deux moteurs produisent des XML différents.")
+            sys.exit(1)
+        print(
+            f"  gain : x{timings['text'] / timings['bytes']:.1f} (XML identiques)"
+        )
+
+
+def generate_copt_values(size_mb: int, seed: int = 42) -> list[str]:
+    """Génère de longues chaînes ``Copt@Val`` (≈ ``size_mb`` Mo au total).
+
+    Chaque chaîne compte de 50 à 200 options séparées par des blancs
+    variés ; une sur deux contient un ``LEINFO=(...)`` de plusieurs Ko.
+    """
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    values: list[str] = []
+    total = 0
+    while total < target:
+        options = [
+            rng.choice(_COPT_OPTIONS) for _ in range(rng.randint(50, 200))
+        ]
+        if rng.random() < 0.5:  # noqa: PLR2004
+            words = (
+                f"W{rng.randrange(10**6)}" for _ in range(rng.randint(100, 400))
+            )
+            options.insert(
+                rng.randrange(len(options)),
+                f"LEINFO=({' '.join(words)} CDbiPathBase() X)",
+            )
+        value = rng.choice(["  ", " ", "\n      "]).join(options)
+        values.append(value)
+        total += len(value)
+    return values
+
+
+def _reference_tokenize(val: str, *, keep_inner_spaces: bool) -> list[str]:
+    """Ancien découpage caractère par caractère (référence du banc copt)."""
+    tokens: list[str] = []
+    current: list[str] = []
+    depth = 0
+    for ch in val:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        elif ch.isspace():
+            if depth == 0:
+                if current:
+                    tokens.append("".join(current))
+                current = []
+                continue
+            if not keep_inner_spaces:
+                continue
+        current.append(ch)
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+def _reference_reformat(
+    val: str, counter: list[int], f_out: io.StringIO
+) -> str:
+    """Ancien reformatage de ``reformat_copt.py`` (mode placeholder)."""
+    out: list[str] = []
+    idx = 0
+    while idx < len(val):
+        # Essai de la tête LEINFO à chaque position, comme l'ancien code.
+        match = re.compile(r"(?:NON-)?LEINFO=\(", re.IGNORECASE).match(val, idx)
+        if match is None:
+            out.append(val[idx])
+            idx += 1
+            continue
+        depth = 0
+        end = len(val)
+        for pos in range(match.end() - 1, len(val)):
+            depth += {"(": 1, ")": -1}.get(val[pos], 0)
+            if depth == 0:
+                end = pos + 1
+                break
+        counter[0] += 1
+        f_out.write(f"{counter[0]}\t{val[idx:end]}\n")
+        prefix = "NON-" if val[idx:end].upper().startswith("NON-") else ""
+        out.append(f"{prefix}LEINFO=({counter[0]})")
+        idx = end
+    value = re.sub(r"\s+", " ", "".join(out)).strip()
+    return " ".join(
+        re.sub(r",\s+", ",", token)
+        for token in _reference_tokenize(value, keep_inner_spaces=True)
+    )
+
+
+def _reference_split(val: str) -> list[str]:
+    """Ancien découpage de ``build_json.split_copt_options``."""
+    val = re.sub(r"(\b(?:NON-)?LEINFO=\([^)]*)CDbiPathBase\(\)", r"\1", val)
+    val = re.sub(r"\b(?:NON-)?LEINFO=\(.*?\)", "", val, flags=re.DOTALL)
+    return _reference_tokenize(" ".join(val.split()), keep_inner_spaces=False)
+
+
+def _copt_variants(
+    values: list[str],
+) -> dict[str, tuple[Callable[[], object], Callable[[], object]]]:
+    """Associe à chaque script sa référence et sa version actuelle."""
+
+    def reference_reformat() -> object:
+        counter = [0]
+        f_out = io.StringIO()
+        results = [_reference_reformat(v, counter, f_out) for v in values]
+        return results, f_out.getvalue()
+
+    def lexer_reformat() -> object:
+        reformat_copt.compile_copt_value.cache_clear()
+        state = reformat_copt.ReformatState()
+        f_out = io.StringIO()
+        results = [
+            reformat_copt.reformat_copt_value(v, state, f_out, "placeholder")[0]
+            for v in values
+        ]
+        return results, f_out.getvalue()
+
+    def lexer_split() -> object:
+        build_json.tokenize_copt_options.cache_clear()
+        return [build_json.split_copt_options(v) for v in values]
+
+    return {
+        "reformat_copt": (reference_reformat, lexer_reformat),
+        "build_json": (
+            lambda: [_reference_split(v) for v in values],
+            lexer_split,
+        ),
+    }
+
+
+def bench_copt(size_mb: int, repeat: int) -> None:
+    """Compare l'ancien découpage des ``Copt@Val`` au lexeur commun.
+
+    Les chaînes générées sont toutes distinctes : les caches LRU des deux
+    scripts, vidés avant chaque exécution, n'interviennent pas.
+    """
+    values = generate_copt_values(size_mb)
+    size = sum(len(value) for value in values)
+    print(
+        f"Copt@Val — {len(values)} chaînes synthétiques, "
+        f"{size / 1e6:.1f} Mo ({size // len(values)} car. en moyenne)"
+    )
+
+    for script, funcs in _copt_variants(values).items():
+        timings: list[float] = []
+        outputs: list[object] = []
+        for label, func in zip(
+            ("caractère par caractère", "lexeur copt_lexer"), funcs, strict=True
+        ):
+            # Premier appel : résultat à comparer (et mise en température).
+            outputs.append(func())
+            timings.append(time_run(func, repeat))
+            report(f"{script} : {label}", size, timings[-1])
+        if outputs[0] != outputs[1]:
+            print(f"ERREUR : {script} — résultats différents.")
+            sys.exit(1)
+        print(f"  gain : x{timings[0] / timings[1]:.1f} (résultats identiques)")
+
+
+def _json_two_parses(xml_path: Path, json_path: Path) -> None:
+    """Ancien ``build_json.main()`` : ``ET.parse`` de contrôle, puis arbre."""
+    build_json.tokenize_copt_options.cache_clear()
+    ET.parse(xml_path)
+    build_json.xml_to_json(str(xml_path), str(json_path), "utf-8", "tree")
+
+
+def _json_one_pass(xml_path: Path, json_path: Path) -> None:
+    """``build_json.main()`` actuel : conversion en flux, une seule lecture."""
+    build_json.tokenize_copt_options.cache_clear()
+    build_json.xml_to_json(str(xml_path), str(json_path), "utf-8", "stream")
+
+
+def _parse_twice(xml_path: Path) -> None:
+    """Analyses seules de l'ancienne étape 3 : contrôle puis conversion."""
+    ET.parse(xml_path)
+    ET.parse(xml_path)
+
+
+def _parse_once(xml_path: Path) -> None:
+    """Analyse seule de l'étape 3 actuelle : ``iter_vlm()`` en flux."""
+    with xml_path.open("rb") as f_in:
+        for _vlm in build_json.iter_vlm(f_in, "utf-8"):
+            pass
+
+
+def bench_json(size_mb: int, repeat: int) -> None:
+    """Compare l'ancienne étape 3 (deux analyses) à la conversion en flux.
+
+    Le XML d'entrée est le nettoyage d'un rapport synthétique.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        report_path = tmp_dir / "vlm.txt"
+        xml_path = tmp_dir / "clean_vlm.xml"
+        generate_report(report_path, size_mb)
+        clean_report.convert_report(report_path, xml_path, "iso8859-1")
+        size = xml_path.stat().st_size
+        print(f"build_json — XML nettoyé de {size / 1e6:.1f} Mo")
+
+        parse_twice = time_run(lambda: _parse_twice(xml_path), repeat)
+        report("analyse : ET.parse x2 (avant)", size, parse_twice)
+        parse_once = time_run(lambda: _parse_once(xml_path), repeat)
+        report("analyse : iter_vlm x1 (après)", size, parse_once)
+        print(f"  gain : x{parse_twice / parse_once:.1f}")
+
+        variants = {
+            "étape 3 : contrôle + arbre (avant)": _json_two_parses,
+            "étape 3 : une lecture en flux (après)": _json_one_pass,
+        }
+        timings: list[float] = []
+        outputs: list[bytes] = []
+        for index, (label, func) in enumerate(variants.items()):
+            json_path = tmp_dir / f"vlm_{index}.json"
+            timings.append(
+                time_run(
+                    lambda func=func, json_path=json_path: func(
+                        xml_path, json_path
+                    ),
+                    repeat,
+                )
+            )
+            outputs.append(json_path.read_bytes())
+            report(label, size, timings[-1])
+
+        if outputs[0] != outputs[1]:
+            print("ERREUR : les deux variantes produisent des JSON différents.")
+            sys.exit(1)
+        print(f"  gain : x{timings[0] / timings[1]:.1f} (JSON identiques)")
+
+
+def parse_args() -> argparse.Namespace:
+    """Lit les arguments de ligne de commande."""
+    parser = argparse.ArgumentParser(
+        description="Bancs d'essai des moteurs du pipeline VLM."
+    )
+    parser.add_argument(
+        "bench",
+        choices=["clean", "copt", "json"],
+        help="Banc d'essai à exécuter",
+    )
+    parser.add_argument(
+        "--size-mb",
+        type=int,
+        default=None,
+        help=(
+            "Taille approximative des données générées "
+            "(défaut : 50 Mo pour clean et json, 5 Mo pour copt)"
+        ),
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Nombre d'exécutions par variante, meilleure retenue (défaut : 3)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    """Point d'entrée CLI."""
+    args = parse_args()
+    # Les moteurs journalisent en DEBUG ; le banc d'essai ne mesure pas le
+    # coût du logging.
+    logging.disable(logging.INFO)
+    if args.bench == "clean":
+        bench_clean(args.size_mb or 50, args.repeat)
+    elif args.bench == "copt":
+        bench_copt(args.size_mb or 5, args.repeat)
+    elif args.bench == "json":
+        bench_json(args.size_mb or 50, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
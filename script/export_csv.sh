@@ -77,6 +77,25 @@ MIN_LINKEDIT_DATE=""
 # n'est pas exportée dans l'environnement.
 DATA_DIR="${VLM_DATA_DIR:-}"
 
+# Fonction jq commune aux trois modes : produit chaque loadlib du document,
+# quelle que soit la disposition des options Copt (build_json.py
+# --copt-layout) :
+#   - inline : le document est le tableau des loadlibs ;
+#   - table  : le document est un objet {CoptTable, Loadlibs} ; chaque numéro
+#     de jeu Copt est remplacé par la liste de ses options.
+# Voir doc/export_csv/filtres.md §0.
+readonly JQ_LOADLIBS='
+    def loadlibs:
+        if type == "object" then
+            .CoptTable as $t
+            | .Loadlibs[]
+            | .Loadmods[].CSECTs[] |= (
+                if (.Copt | type) == "number"
+                then .Copt = [$t.Sets[.Copt][] | $t.Options[.]]
+                else . end)
+        else .[] end;
+'
+
 
 # =============================================================================
 # show_help — affiche l'aide et la liste des options disponibles
@@ -337,6 +356,23 @@ prepare_output_file() {
 }
 
 
+# =============================================================================
+# read_input — écrit le JSON d'entrée sur stdout, décompressé si nécessaire
+# =============================================================================
+# Le pipeline peut produire vlm.json compressé (vlm.json.gz, .bz2 ou .xz) :
+# le contenu est décompressé à la volée et passé à jq par un pipe, sans
+# fichier temporaire. Un fichier non compressé est simplement lu par cat.
+# =============================================================================
+read_input() {
+    case "$INPUT_JSON" in
+        *.gz)  gzip -dc -- "$INPUT_JSON" ;;
+        *.bz2) bzip2 -dc -- "$INPUT_JSON" ;;
+        *.xz)  xz -dc -- "$INPUT_JSON" ;;
+        *)     cat -- "$INPUT_JSON" ;;
+    esac
+}
+
+
 # =============================================================================
 # run_global_mode — extrait toutes les métadonnées CSECT
 # =============================================================================
@@ -347,7 +383,9 @@ prepare_output_file() {
 run_global_mode() {
     # -------------------------------------------------------------------------
     # jq est un processeur JSON en ligne de commande : il accepte un filtre
-    # (programme jq) et un fichier JSON, et produit une sortie transformée.
+    # (programme jq) et un flux JSON, et produit une sortie transformée.
+    # Le JSON lui est transmis sur stdin par read_input (décompression
+    # éventuelle).
     # Analogie : jq est à JSON ce que sed/awk est au texte.
     #   -r (raw output) : affiche les chaînes sans guillemets.
     #   --arg min_date "$MIN_LINKEDIT_DATE" : injecte la date de filtre comme
@@ -358,8 +396,8 @@ run_global_mode() {
     # des variables sauvegardées ($lib, $lm, $csect) :
     #   doc/export_csv/jq.md §17 "Décryptage du filtre du mode global"
     # -------------------------------------------------------------------------
-    jq -r --arg min_date "$MIN_LINKEDIT_DATE" '
-        .[]
+    read_input | jq -r --arg min_date "$MIN_LINKEDIT_DATE" "$JQ_LOADLIBS"'
+        loadlibs
         | .Loadlib as $lib
         | .Loadmods[] as $lm
         | select($min_date == "" or ($lm.Linkedon >= $min_date))
@@ -374,7 +412,7 @@ run_global_mode() {
         +"DB2=\($csect.DB2);"
         +"WMQ=\($csect.WMQ);"
         +"\($csect.Identify // "")"
-    ' "$INPUT_JSON" > "$OUTPUT"
+    ' > "$OUTPUT"
     # > "$OUTPUT" : redirige toute la sortie de jq vers le fichier CSV.
     # Si le fichier n'existe pas, il est créé. S'il existe, il est écrasé
     # (ce qui est sûr ici car prepare_output_file l'a déjà supprimé).
@@ -403,8 +441,8 @@ run_options_mode() {
     # modules sans Copt exclus) et les options triées/concaténées.
     # Décryptage complet, ligne par ligne, avec schéma :
     #   doc/export_csv/jq.md §18 "Décryptage du filtre du mode options"
-    jq -r --arg min_date "$MIN_LINKEDIT_DATE" '
-        .[]
+    read_input | jq -r --arg min_date "$MIN_LINKEDIT_DATE" "$JQ_LOADLIBS"'
+        loadlibs
         | .Loadlib as $lib
         | .Loadmods[] as $lm
         | select($min_date == "" or ($lm.Linkedon >= $min_date))
@@ -416,7 +454,7 @@ run_options_mode() {
         +"\($lm.Linkedon);"
         +"\($csect.Compiler1);"
         +($csect.Copt | sort | join(";"))
-    ' "$INPUT_JSON" > "$OUTPUT"
+    ' > "$OUTPUT"
 
     [ -n "$MIN_LINKEDIT_DATE" ] && echo "Date filter: >= $MIN_LINKEDIT_DATE"
     echo "Options mode: compilation options collected per load and loadlib."
@@ -435,8 +473,8 @@ run_compiler_mode() {
     # le même filtre "CSECT principal" que le mode options (§18).
     # Décryptage complet, ligne par ligne, avec schéma :
     #   doc/export_csv/jq.md §19 "Décryptage du filtre du mode compiler"
-    jq -r --arg min_date "$MIN_LINKEDIT_DATE" '
-        .[]
+    read_input | jq -r --arg min_date "$MIN_LINKEDIT_DATE" "$JQ_LOADLIBS"'
+        loadlibs
         | .Loadlib as $lib
         | .Loadmods[] as $lm
         | select($min_date == "" or ($lm.Linkedon >= $min_date))
@@ -447,7 +485,7 @@ run_compiler_mode() {
         +"\($lm.Linkedon);"
         +"\($csect.Name);"
         +"\($csect.Compiler1)"
-    ' "$INPUT_JSON" > "$OUTPUT"
+    ' > "$OUTPUT"
 
     [ -n "$MIN_LINKEDIT_DATE" ] && echo "Date filter: >= $MIN_LINKEDIT_DATE"
     echo "Compiler mode: compilers collected (primary CSECT only)."
@@ -19,43 +19,139 @@ Exemple :
 """
 
 import argparse
+import functools
+import io
+import itertools
 import json
 import logging
 import re
 import sys
+import tempfile
 import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Any
-
-from utils import load_config, setup_logging
+from typing import IO, Any, TextIO
+from xml.parsers import expat
+
+from copt_lexer import compact_token, split_options
+from csect_flags import DEFAULT_FLAG_MATCHER, FlagMatcher, load_flag_matcher
+from utils import (
+    is_ascii_compatible,
+    load_config,
+    open_binary,
+    open_text,
+    resolve_workers,
+    setup_logging,
+    split_vlm_chunks,
+)
+from value_pool import ValuePool
+from vlm_model import (
+    COPT_TABLE_KEY,
+    LOADLIBS_KEY,
+    CoptTable,
+    Csect,
+    Loadlib,
+    Loadmod,
+)
+from vlm_snapshot import SnapshotWriter
 
 LOGGER = logging.getLogger("build_json")
 
+# Nombre de chaînes COPT distinctes mémorisées par `tokenize_copt_options()`.
+# Les CSECTs d'une même loadlib partagent le plus souvent la même chaîne.
+COPT_CACHE_SIZE = 4096
+
+# Modes de conversion : `stream` (une loadlib à la fois, mémoire bornée) ou
+# `tree` (arbre et modèle complets en mémoire, puis écriture).
+ENGINES = ("stream", "tree")
+
+# Formats du JSON produit (`--format`) : `pretty` (indentation de 2 espaces),
+# `compact` (sans blanc) ou `jsonl` (JSON Lines, un loadmod par ligne).
+JSON_FORMATS = ("pretty", "compact", "jsonl")
+
+# Disposition des options Copt (`--copt-layout`) : `inline` (liste d'options
+# dans chaque CSECT) ou `table` (dictionnaire global en tête du document,
+# chaque CSECT ne porte que le numéro de son jeu d'options).
+COPT_LAYOUTS = ("inline", "table")
+
+# Séparateurs de json.dumps() sans aucun blanc.
+_COMPACT_SEPARATORS = (",", ":")
+
+# Instances partagées des valeurs à faible cardinalité (Compiler1, Type,
+# dates, options Copt…) : chaque valeur distincte n'est gardée qu'une fois
+# en mémoire. Comme le cache COPT, le pool dure le temps du processus ; sa
+# taille par champ est journalisée en fin de conversion.
+VALUE_POOL = ValuePool()
+
+# Mode `--workers` : morceaux en attente par processus (mémoire bornée).
+_PENDING_PER_WORKER = 2
+
+
+@dataclass
+class ConvertOptions:
+    """Options de la conversion XML → JSON, hors chemins et encodage.
+
+    Attributs:
+        json_format: Valeur de ``--format`` (voir :data:`JSON_FORMATS`).
+        copt_layout: Valeur de ``--copt-layout`` (voir :data:`COPT_LAYOUTS`).
+        flag_matcher: Règles compilées des champs booléens (table
+            ``[flags]`` de ``config.toml``).
+        snapshot_path: Instantané colonnaire à écrire en plus du JSON
+            (:mod:`vlm_snapshot`), construit pendant la même lecture du XML.
+        workers: Processus de conversion (mode ``stream`` ; 1 = séquentiel,
+            0 = un par cœur).
+    """
+
+    json_format: str = "pretty"
+    copt_layout: str = "inline"
+    flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+    snapshot_path: str | None = None
+    workers: int = 1
+
 
 def split_copt_options(raw: str) -> list[str]:
-    """Découpe une chaîne COPT brute en liste propre d'options de compilation.
+    """Découpe une chaîne COPT brute en liste d'options (voir ci-dessous)."""
+    return list(parse_copt_options(raw))
+
+
+def parse_copt_options(raw: str) -> tuple[str, ...]:
+    """Découpe une chaîne COPT brute en options de compilation.
 
     Pourquoi ne pas utiliser un simple ``.split()`` ?
     - ``.split()`` coupe sur chaque espace, ce qui casse les options contenant
       des espaces *à l'intérieur* de parenthèses. Exemple :
       ``"CSECT(CODE, MCONFIG)"`` deviendrait ``["CSECT(CODE,", "MCONFIG)"]``.
 
-    Stratégie (parcours caractère par caractère) :
+    Stratégie :
     1. Nettoyer LEINFO=(...) qui est une métadonnée, pas une vraie option.
-    2. Normaliser les espaces et sauts de ligne en un seul espace.
-    3. Compter la profondeur des parenthèses (depth).
-    4. Couper les tokens uniquement quand depth == 0 (hors parenthèses).
+    2. Couper les tokens sur les blancs hors parenthèses (depth == 0), avec
+       le lexeur commun ``copt_lexer.split_options``.
+    3. Supprimer les blancs restants, internes aux parenthèses.
 
     Exemple de résultat :
-        ``"CSECT(CODE, MCONFIG) OPT2"`` → ``["CSECT(CODE,MCONFIG)", "OPT2"]``
+        ``"CSECT(CODE, MCONFIG) OPT2"`` → ``("CSECT(CODE,MCONFIG)", "OPT2")``
 
     Args:
         raw: Chaîne d'options brutes telle que présente dans l'attribut XML.
 
     Returns:
-        Liste de chaînes, chaque élément représentant une option de compilation.
+        Les options de compilation, dans l'ordre. Le tuple vient du cache de
+        :func:`tokenize_copt_options` : les CSECTs de même chaîne COPT le
+        partagent.
 
     """
+    # Aucune des deux expressions ci-dessous ne peut correspondre avant le
+    # premier "LEINFO=(" : elles ne parcourent que la fin de la chaîne, à
+    # partir de 5 caractères plus tôt (préfixe "NON-" et caractère précédent,
+    # nécessaire à \b).
+    start = raw.find("LEINFO=(")
+    if start < 0:
+        return tokenize_copt_options(raw)
+    head, raw = raw[: max(start - 5, 0)], raw[max(start - 5, 0) :]
+
     # CDbiPathBase() peut apparaître à l'intérieur d'un bloc LEINFO=(...).
     # On l'efface en premier car il contient lui-même des parenthèses qui
     # perturberaient la suppression du LEINFO global.
@@ -83,48 +179,34 @@ def split_copt_options(raw: str) -> list[str]:
         flags=re.DOTALL,
     )
 
-    # .split() sans argument découpe sur tout espace/tabulation/saut de ligne
-    # et ignore les séquences vides. " ".join(...) recolle avec un seul espace.
-    normalized: str = " ".join(raw_without_leinfo.split())
+    # Le découpage est mémorisé sur la chaîne privée de ses LEINFO : les
+    # placeholders LEINFO=(N), uniques par occurrence, n'en font pas partie.
+    return tokenize_copt_options(head + raw_without_leinfo)
 
-    tokens: list[str] = []
-    current: list[str] = []  # Buffer pour le token en cours de construction.
-    paren_depth: int = 0  # Profondeur de parenthèses imbriquées.
 
-    for ch in normalized:
-        if ch == "(":
-            paren_depth += 1
-            current.append(ch)
-            continue
-
-        if ch == ")":
-            # Protection contre les ')' en excès (XML malformé) :
-            # on garde le caractère mais on n'autorise pas depth < 0.
-            if paren_depth > 0:
-                paren_depth -= 1
-            current.append(ch)
-            continue
+@functools.lru_cache(maxsize=COPT_CACHE_SIZE)
+def tokenize_copt_options(raw_without_leinfo: str) -> tuple[str, ...]:
+    """Découpe les options et retire leurs blancs (étapes 2 et 3, cache LRU).
 
-        # Espace à l'intérieur d'une parenthèse → ignoré (on nettoie).
-        # Exemple : "CSECT(CODE, MCONFIG)" → "CSECT(CODE,MCONFIG)".
-        if ch.isspace() and paren_depth > 0:
-            continue
+    Les CSECTs d'une même loadlib partagent le plus souvent la même chaîne
+    d'options : une chaîne déjà rencontrée n'est pas re-tokenisée. Le tuple
+    retourné est partagé entre les appels.
 
-        if ch.isspace() and paren_depth == 0:
-            # Espace hors parenthèse = séparateur entre deux options.
-            # On finalise le token courant s'il est non vide.
-            if current:
-                tokens.append("".join(current))
-                current = []
-            continue
-
-        current.append(ch)
+    Args:
+        raw_without_leinfo: Chaîne COPT dont les LEINFO ont été retirés.
 
-    # Dernier token sans espace final (fin de chaîne).
-    if current:
-        tokens.append("".join(current))
+    Returns:
+        Les options de compilation, dans l'ordre.
 
-    return tokens
+    """
+    # Le lexeur commun coupe sur les blancs hors parenthèses ; les blancs
+    # restants, internes aux parenthèses, sont supprimés :
+    # "CSECT(CODE, MCONFIG)" → "CSECT(CODE,MCONFIG)".
+    # Les options, très répétées d'une chaîne à l'autre, sont partagées.
+    options: tuple[str, ...] = VALUE_POOL.intern_all(
+        "Copt", split_options(raw_without_leinfo, compact_token)
+    )
+    return options
 
 
 def parse_args() -> argparse.Namespace:
@@ -137,7 +219,8 @@ def parse_args() -> argparse.Namespace:
     Returns:
         Namespace argparse avec les attributs :
         ``file`` (XML en entrée), ``output`` (JSON en sortie),
-        ``encoding`` (encodage du XML).
+        ``encoding`` (encodage du XML), ``engine`` (mode de conversion),
+        ``format`` (format du JSON).
 
     """
     parser = argparse.ArgumentParser(
@@ -164,29 +247,91 @@ def parse_args() -> argparse.Namespace:
         default="iso8859-1",
         help="Encodage du fichier XML en entrée (défaut : iso8859-1)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--engine",
+        required=False,
+        default="stream",
+        choices=ENGINES,
+        help=(
+            "Mode de conversion : stream = une loadlib à la fois, mémoire "
+            "bornée ; tree = arbre complet en mémoire (défaut : stream)"
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        required=False,
+        default="pretty",
+        choices=JSON_FORMATS,
+        help=(
+            "Format du JSON : pretty = indenté, compact = sans blanc, "
+            "jsonl = un loadmod par ligne (défaut : pretty)"
+        ),
+    )
+    parser.add_argument(
+        "--copt-layout",
+        required=False,
+        default="inline",
+        choices=COPT_LAYOUTS,
+        help=(
+            "Disposition des options Copt : inline = liste dans chaque CSECT ; "
+            "table = dictionnaire global en tête, numéro de jeu par CSECT "
+            "(défaut : inline)"
+        ),
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Processus de conversion, mode stream uniquement "
+            "(défaut : 1 = séquentiel, 0 = un par cœur)"
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        required=False,
+        default=None,
+        metavar="FICHIER",
+        help=(
+            "Écrit aussi un instantané colonnaire du parc, lu par mmap "
+            "(voir vlm_snapshot.py)"
+        ),
+    )
+    args = parser.parse_args()
+    if args.workers != 1 and args.engine != "stream":
+        parser.error("--workers exige --engine stream")
+    return args
 
 
-def check_xml_well_formed(xml_path: str) -> bool:
+def check_xml_well_formed(xml_path: str, encoding: str | None = None) -> bool:
     """Vérifie que le fichier XML est syntaxiquement correct.
 
     "Bien formé" signifie : balises ouvrantes/fermantes équilibrées,
-    imbrication correcte, encodage déclaré respecté. ``ET.parse()`` lève
-    une ``ParseError`` si le fichier ne respecte pas ces règles.
+    imbrication correcte, encodage déclaré respecté. L'analyseur expat lit
+    le fichier en flux sans construire d'arbre : la vérification coûte
+    bien moins qu'un ``ET.parse()``.
+
+    ``main()`` ne l'appelle pas : la conversion lit déjà tout le fichier
+    et lève ``ET.ParseError`` au premier défaut. Elle reste utile pour
+    valider un XML sans le convertir.
 
     Cette fonction capture l'exception et retourne un booléen plutôt
     que de laisser le programme planter.
 
     Args:
         xml_path: Chemin du fichier XML à vérifier.
+        encoding: Encodage imposé à la lecture (``None`` : celui déclaré
+            par le document).
 
     Returns:
         ``True`` si le fichier est bien formé, ``False`` sinon.
 
     """
     try:
-        ET.parse(xml_path)
-    except ET.ParseError as e:
+        with open_binary(Path(xml_path), "rb") as f_in:
+            expat.ParserCreate(encoding).ParseFile(f_in)
+    except expat.ExpatError as e:
         LOGGER.error("Erreur de syntaxe XML dans %s : %s", xml_path, e)
         return False
     else:
@@ -194,11 +339,787 @@ def check_xml_well_formed(xml_path: str) -> bool:
         return True
 
 
-def xml_to_json(xml_path: str, json_path: str, encoding: str) -> None:
+# Pattern pour valider le format de l'attribut "Identify" d'un CSECT.
+# Exemple attendu : "CCBD01/51EBC3AD/DYA0000005"
+# - Partie 1 (1-8 chars alphanum, _, @, à) : code application.
+# - Partie 2 (1-8 chars alphanum)           : hash ou version.
+# - Partie 3 (DY|DA + 2 chars + 6 chiffres) : code de package.
+IDENTIFY_PATTERN: str = (
+    r"^[A-Za-z0-9_@à]{1,8}"  # Partie 1 : code application
+    r"/"
+    r"[A-Za-z0-9]{1,8}"  # Partie 2 : hash/version
+    r"/"
+    r"(DY|DA)[A-Za-z0-9]{2}[0-9]{6}$"  # Partie 3 : code package
+)
+
+IDENTIFY_RE = re.compile(IDENTIFY_PATTERN)
+
+
+def csect_from_xml(
+    csect: ET.Element, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> Csect:
+    """Construit le :class:`Csect` d'un élément ``<CSECT>``.
+
+    Les champs booléens dérivés du nom sont décrits dans :func:`xml_to_json`.
+
+    Args:
+        csect: Élément ``<CSECT>`` complet (enfants ``Identify``/``Copt``).
+        flag_matcher: Règles compilées des champs booléens.
+
+    Returns:
+        Le CSECT ; :meth:`Csect.to_json` donne ses clés dans l'ordre du JSON.
+
+    """
+    # Les champs à faible cardinalité passent par le pool de valeurs.
+    intern = VALUE_POOL.intern
+    name = csect.get("Name")
+    csect_data = Csect(
+        name=name,
+        type=intern("Type", csect.get("Type")),
+        cls=intern("Class", csect.get("Class")),
+        address=csect.get("Address"),
+        size=csect.get("Size"),
+        rmode=intern("RMODE", csect.get("ARMODE")),
+        compiler1=intern("Compiler1", csect.get("Compiler1")),
+        date=intern("Date", csect.get("Date")),
+        # Champs booléens dérivés du nom du CSECT (règles [flags] de
+        # config.toml), tous calculés en un seul passage sur le nom.
+        flags=flag_matcher.match(name or ""),
+    )
+
+    # Recherche de la balise <Identify> (identifiant de package).
+    identify_elem: ET.Element | None = csect.find("Identify")
+    if identify_elem is not None:
+        csect_data.has_identify = True
+        val: str | None = identify_elem.attrib.get("Val")
+        if val and IDENTIFY_RE.match(val):
+            # Le format est valide : on garde uniquement la 3e partie
+            # (code package) après découpe sur '/'. Un format invalide
+            # laisse `identify` à None (null dans le JSON).
+            i: list[str] = val.split("/")
+            csect_data.identify = intern("Identify", i[-1])
+
+    # Recherche de la balise <Copt> contenant les options de compilation.
+    copt_elem: ET.Element | None = csect.find("Copt")
+    if copt_elem is not None:
+        # .get("Val") retourne None si l'attribut est absent ;
+        # `or ""` le remplace par une chaîne vide pour éviter
+        # un crash dans parse_copt_options.
+        csect_data.copt = parse_copt_options(copt_elem.get("Val") or "")
+
+    return csect_data
+
+
+def loadmod_from_xml(
+    loadmod: ET.Element, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> Loadmod:
+    """Construit le :class:`Loadmod` d'un élément ``<Loadmod>``."""
+    # Construction du loadmod depuis ses attributs XML ; les champs à
+    # faible cardinalité passent par le pool de valeurs.
+    intern = VALUE_POOL.intern
+    return Loadmod(
+        name=loadmod.get("Name"),
+        linkedon=intern("Linkedon", loadmod.get("Linkedon")),
+        linkedat=loadmod.get("Linkedat"),
+        linkedby=intern("Linkedby", loadmod.get("Linkedby")),
+        epa=loadmod.get("EPA"),
+        msize=loadmod.get("MSize"),
+        ttr=loadmod.get("TTR"),
+        ssi=loadmod.get("SSI"),
+        ac=intern("AC", loadmod.get("AC")),
+        am=intern("AM", loadmod.get("AM")),
+        rm=intern("RM", loadmod.get("RM")),
+        csects=[
+            csect_from_xml(csect, flag_matcher)
+            for csect in loadmod.findall("CSECT")
+        ],
+    )
+
+
+def loadlib_from_xml(
+    vlm: ET.Element, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> Loadlib:
+    """Construit la :class:`Loadlib` d'un bloc ``<vlm>``.
+
+    Partagée par :func:`xml_to_json` et le moteur fusionné
+    ``report_to_json.py``, qui l'appelle sur chaque ``<vlm>`` dès sa
+    fermeture, sans charger le document entier.
+
+    Args:
+        vlm: Élément ``<vlm>`` complet.
+        flag_matcher: Règles compilées des champs booléens des CSECTs.
+
+    Returns:
+        La loadlib et toute sa hiérarchie.
+
+    """
+    # .get("loadlib") lit l'attribut XML loadlib="..." de la balise <vlm>.
+    loadlib: str | None = vlm.get("loadlib")
+    member_count_elem: ET.Element | None = vlm.find("memberCount")
+    if member_count_elem is not None:
+        # .get("value") retourne str | None ; on substitue "0" si absent.
+        member_count: int = int(member_count_elem.get("value") or "0")
+    else:
+        member_count = 0
+
+    return Loadlib(
+        name=loadlib,
+        member_count=member_count,
+        loadmods=[
+            loadmod_from_xml(mod, flag_matcher)
+            for mod in vlm.findall("Loadmod")
+        ],
+    )
+
+
+def csect_to_dict(
+    csect: ET.Element, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> dict[str, Any]:
+    """Convertit un élément ``<CSECT>`` en dictionnaire JSON."""
+    data: dict[str, Any] = csect_from_xml(csect, flag_matcher).to_dict()
+    return data
+
+
+def loadmod_to_dict(
+    loadmod: ET.Element, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> dict[str, Any]:
+    """Convertit un élément ``<Loadmod>`` et ses CSECTs en dictionnaire JSON."""
+    data: dict[str, Any] = loadmod_from_xml(loadmod, flag_matcher).to_dict()
+    return data
+
+
+def vlm_to_dict(
+    vlm: ET.Element, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> dict[str, Any]:
+    """Convertit un bloc ``<vlm>`` (une loadlib) en dictionnaire JSON.
+
+    Returns:
+        Dictionnaire ``{"Loadlib", "MemberCount", "Loadmods"}``.
+
+    """
+    data: dict[str, Any] = loadlib_from_xml(vlm, flag_matcher).to_dict()
+    return data
+
+
+def render_pretty(lib: Loadlib, copt_table: CoptTable | None = None) -> str:
+    """Retourne le texte d'une loadlib dans le tableau ``pretty``.
+
+    La loadlib est sérialisée seule puis réindentée d'un niveau (les chaînes
+    JSON ne contiennent jamais de saut de ligne brut).
+    """
+    return json.dumps(
+        lib.to_dict(copt_table), indent=2, ensure_ascii=False
+    ).replace("\n", "\n  ")
+
+
+def render_compact(lib: Loadlib, copt_table: CoptTable | None = None) -> str:
+    """Retourne le texte d'une loadlib dans le tableau ``compact``."""
+    return json.dumps(
+        lib.to_dict(copt_table),
+        separators=_COMPACT_SEPARATORS,
+        ensure_ascii=False,
+    )
+
+
+def render_lines(lib: Loadlib, copt_table: CoptTable | None = None) -> str:
+    """Retourne les lignes JSON Lines d'une loadlib, une par loadmod.
+
+    Chaque ligne est un objet compact ``{"Loadlib", "MemberCount",
+    "Loadmod"}`` : le loadmod garde la structure du format tableau, et sa
+    loadlib l'accompagne. Une loadlib sans loadmod produit une seule ligne,
+    de ``"Loadmod"`` ``null`` : aucune loadlib n'est perdue.
+    """
+    return "".join(
+        json.dumps(
+            {
+                "Loadlib": lib.name,
+                "MemberCount": lib.member_count,
+                "Loadmod": loadmod.to_dict(copt_table) if loadmod else None,
+            },
+            separators=_COMPACT_SEPARATORS,
+            ensure_ascii=False,
+        )
+        + "\n"
+        for loadmod in lib.loadmods or [None]
+    )
+
+
+def _join_pretty(parts: Iterable[str], f: TextIO) -> int:
+    """Écrit les textes de :func:`render_pretty` en tableau indenté."""
+    count = 0
+    for part in parts:
+        f.write(",\n  " if count else "[\n  ")
+        f.write(part)
+        count += 1
+    f.write("\n]" if count else "[]")
+    return count
+
+
+def _join_compact(parts: Iterable[str], f: TextIO) -> int:
+    """Écrit les textes de :func:`render_compact` en tableau sans blanc."""
+    count = 0
+    f.write("[")
+    for part in parts:
+        if count:
+            f.write(",")
+        f.write(part)
+        count += 1
+    f.write("]")
+    return count
+
+
+def _join_lines(parts: Iterable[str], f: TextIO) -> int:
+    """Écrit les textes de :func:`render_lines` les uns après les autres."""
+    count = 0
+    for part in parts:
+        f.write(part)
+        count += 1
+    return count
+
+
+# Pour chaque valeur de `--format` : texte d'une loadlib, et assemblage de
+# ces textes en document. Le mode `--workers` produit les textes dans les
+# processus du pool et les assemble dans le processus principal.
+_RENDERERS: dict[str, Callable[[Loadlib, CoptTable | None], str]] = {
+    "pretty": render_pretty,
+    "compact": render_compact,
+    "jsonl": render_lines,
+}
+_JOINERS: dict[str, Callable[[Iterable[str], TextIO], int]] = {
+    "pretty": _join_pretty,
+    "compact": _join_compact,
+    "jsonl": _join_lines,
+}
+
+
+def write_json_array(
+    items: Iterable[Loadlib], f: TextIO, copt_table: CoptTable | None = None
+) -> int:
+    """Écrit une liste JSON élément par élément, sans la construire en mémoire.
+
+    Le texte produit est identique à
+    ``json.dump([lib.to_dict() for lib in items], f, indent=2,
+    ensure_ascii=False)`` (voir :func:`render_pretty`).
+
+    Args:
+        items: Loadlibs, consommées au fil de l'eau.
+        f: Flux texte de sortie.
+        copt_table: Table où enregistrer les options ``Copt`` (disposition
+            ``table``, voir :func:`write_json`).
+
+    Returns:
+        Nombre d'éléments écrits.
+
+    """
+    return _join_pretty((render_pretty(lib, copt_table) for lib in items), f)
+
+
+def write_json_compact(
+    items: Iterable[Loadlib], f: TextIO, copt_table: CoptTable | None = None
+) -> int:
+    """Écrit une liste JSON sans aucun blanc, élément par élément.
+
+    Le texte produit est identique à ``json.dump([lib.to_dict() for lib in
+    items], f, separators=(",", ":"), ensure_ascii=False)``.
+
+    Args:
+        items: Loadlibs, consommées au fil de l'eau.
+        f: Flux texte de sortie.
+        copt_table: Voir :func:`write_json_array`.
+
+    Returns:
+        Nombre d'éléments écrits.
+
+    """
+    return _join_compact((render_compact(lib, copt_table) for lib in items), f)
+
+
+def write_json_lines(
+    items: Iterable[Loadlib], f: TextIO, copt_table: CoptTable | None = None
+) -> int:
+    """Écrit un enregistrement JSON Lines par loadmod (voir :func:`render_lines`).
+
+    Args:
+        items: Loadlibs (voir :func:`loadlib_from_xml`).
+        f: Flux texte de sortie.
+        copt_table: Voir :func:`write_json_array`.
+
+    Returns:
+        Nombre de loadlibs lues.
+
+    """
+    return _join_lines((render_lines(lib, copt_table) for lib in items), f)
+
+
+# Écriture du JSON pour chaque valeur de `--format`.
+JSON_WRITERS: dict[
+    str, Callable[[Iterable[Loadlib], TextIO, CoptTable | None], int]
+] = {
+    "pretty": write_json_array,
+    "compact": write_json_compact,
+    "jsonl": write_json_lines,
+}
+
+
+def _pretty_list(values: list[str], indent: str) -> str:
+    """Retourne une liste JSON indentée, un élément déjà sérialisé par ligne."""
+    if not values:
+        return "[]"
+    inner = indent + "  "
+    return "[\n" + inner + f",\n{inner}".join(values) + "\n" + indent + "]"
+
+
+def _copt_table_frame(json_format: str, table: CoptTable) -> tuple[str, str]:
+    """Retourne le texte qui précède et celui qui suit les loadlibs.
+
+    En ``pretty``, chaque option et chaque jeu occupent une ligne ; en
+    ``jsonl``, la table est seule sur la première ligne.
+    """
+    if json_format == "jsonl":
+        header = {COPT_TABLE_KEY: table.to_dict()}
+        return (
+            json.dumps(
+                header, separators=_COMPACT_SEPARATORS, ensure_ascii=False
+            )
+            + "\n",
+            "",
+        )
+    if json_format == "compact":
+        options = json.dumps(
+            table.to_dict(), separators=_COMPACT_SEPARATORS, ensure_ascii=False
+        )
+        return f'{{"{COPT_TABLE_KEY}":{options},"{LOADLIBS_KEY}":', "}"
+    options = _pretty_list(
+        [json.dumps(option, ensure_ascii=False) for option in table.options],
+        "    ",
+    )
+    sets = _pretty_list([json.dumps(list(s)) for s in table.sets], "    ")
+    return (
+        f'{{\n  "{COPT_TABLE_KEY}": {{\n    "Options": {options},\n'
+        f'    "Sets": {sets}\n  }},\n  "{LOADLIBS_KEY}": ',
+        "\n}",
+    )
+
+
+def write_json(
+    items: Iterable[Loadlib],
+    f: TextIO,
+    json_format: str = "pretty",
+    copt_layout: str = "inline",
+) -> int:
+    """Écrit les loadlibs au format ``json_format``.
+
+    En disposition ``table``, le document devient un objet
+    ``{"CoptTable": {"Options": [...], "Sets": [[...]]}, "Loadlibs": [...]}``
+    (en ``jsonl`` : la table sur la première ligne) et chaque ``Copt`` est
+    le numéro d'un jeu de ``Sets``, lui-même une liste d'indices dans
+    ``Options``. La table n'est complète qu'après la dernière loadlib mais
+    précède les loadlibs : elles sont d'abord écrites dans un fichier
+    temporaire, recopié ensuite derrière la table.
+
+    Args:
+        items: Loadlibs, consommées au fil de l'eau.
+        f: Flux texte de sortie.
+        json_format: Valeur de ``--format`` (voir :data:`JSON_FORMATS`).
+        copt_layout: Valeur de ``--copt-layout`` (voir :data:`COPT_LAYOUTS`).
+
+    Returns:
+        Nombre de loadlibs lues.
+
+    """
+    writer = JSON_WRITERS[json_format]
+    if copt_layout != "table":
+        return writer(items, f, None)
+    table = CoptTable()
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as body:
+        count = writer(items, body, table)
+        header, footer = _copt_table_frame(json_format, table)
+        f.write(header)
+        body.seek(0)
+        # En `pretty`, les loadlibs descendent d'un niveau d'indentation.
+        pretty = json_format == "pretty"
+        while chunk := body.read(1 << 20):
+            f.write(chunk.replace("\n", "\n  ") if pretty else chunk)
+        f.write(footer)
+    LOGGER.debug(
+        "Table Copt : %d option(s), %d jeu(x) distinct(s).",
+        len(table.options),
+        len(table.sets),
+    )
+    return count
+
+
+def iter_vlm(f_in: IO[bytes], encoding: str) -> Iterator[ET.Element]:
+    """Produit chaque ``<vlm>`` enfant de la racine dès sa fermeture.
+
+    ``ET.iterparse`` lit le XML au fil de l'eau ; chaque enfant direct de
+    la racine est détaché après usage, si bien que seul le bloc en cours
+    est en mémoire. Les ``<vlm>`` sont ceux de ``root.findall("vlm")``.
+
+    Args:
+        f_in: XML nettoyé, en binaire.
+        encoding: Encodage imposé à la lecture (comme ``ET.XMLParser``).
+
+    Yields:
+        Les éléments ``<vlm>`` complets, dans l'ordre du document.
+
+    Raises:
+        ET.ParseError: Si le XML est mal formé.
+
+    """
+    depth = 0
+    root: ET.Element | None = None
+    for event, elem in ET.iterparse(
+        f_in,
+        events=("start", "end"),
+        parser=ET.XMLParser(encoding=encoding),
+    ):
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = elem
+            continue
+        depth -= 1
+        if depth == 1 and root is not None:
+            if elem.tag == "vlm":
+                yield elem
+            # La racine n'a jamais plus d'un enfant : remove() est immédiat.
+            root.remove(elem)
+
+
+def _count_loadlibs(
+    vlms: Iterable[ET.Element],
+    totals: Counter[str],
+    flag_matcher: FlagMatcher,
+    snapshot: SnapshotWriter | None = None,
+) -> Iterator[Loadlib]:
+    """Convertit chaque ``<vlm>`` et cumule loadmods et CSECTs dans ``totals``.
+
+    Chaque loadlib est aussi ajoutée à ``snapshot``, s'il est fourni.
+    """
+    for vlm in vlms:
+        lib = loadlib_from_xml(vlm, flag_matcher)
+        totals["loadmods"] += len(lib.loadmods)
+        totals["csects"] += lib.csect_count()
+        if snapshot is not None:
+            snapshot.add(lib)
+        yield lib
+
+
+def _convert_stream(
+    xml_path: str,
+    json_path: str,
+    encoding: str,
+    totals: Counter[str],
+    options: ConvertOptions,
+    snapshot: SnapshotWriter | None = None,
+) -> int:
+    """Mode ``stream`` : écrit chaque loadlib dès que son ``<vlm>`` est lu.
+
+    Returns:
+        Nombre de loadlibs écrites.
+
+    """
+    try:
+        with (
+            open_binary(Path(xml_path), "rb") as f_in,
+            open_text(Path(json_path), "w", "utf-8") as f,
+        ):
+            # Le texte produit est celui de json.dump() sur la liste entière.
+            return write_json(
+                _count_loadlibs(
+                    iter_vlm(f_in, encoding),
+                    totals,
+                    options.flag_matcher,
+                    snapshot,
+                ),
+                f,
+                options.json_format,
+                options.copt_layout,
+            )
+    except BaseException:
+        # Pas de JSON tronqué : il ne serait pas exploitable par jq.
+        Path(json_path).unlink(missing_ok=True)
+        raise
+
+
+def _convert_tree(
+    xml_path: str,
+    json_path: str,
+    encoding: str,
+    totals: Counter[str],
+    options: ConvertOptions,
+    snapshot: SnapshotWriter | None = None,
+) -> int:
+    """Mode ``tree`` : charge l'arbre et le modèle complets, puis les écrit.
+
+    Returns:
+        Nombre de loadlibs écrites.
+
+    """
+    # ET.parse() charge le fichier XML en mémoire sous forme d'arbre d'objets.
+    # ET.XMLParser(encoding=...) force l'encodage déclaré dans l'argument CLI.
+    # open_binary() décompresse à la volée une entrée gzip/bz2/xz.
+    with open_binary(Path(xml_path), "rb") as f_in:
+        tree: ET.ElementTree[ET.Element] = ET.parse(
+            f_in, parser=ET.XMLParser(encoding=encoding)
+        )
+    # getroot() retourne l'élément racine ou None si l'arbre est vide.
+    # ET.parse() garantit une racine présente, mais le type annoté est
+    # Element | None : on lève une erreur explicite si ce cas impossible survient.
+    root: ET.Element = tree.getroot()
+    if root is None:
+        raise ValueError(
+            f"Le fichier XML '{xml_path}' ne contient pas d'élément racine."
+        )
+    # root.findall("vlm") retourne la liste de tous les éléments <vlm> fils directs.
+    # Tout le modèle est construit avant l'écriture.
+    libs: list[Loadlib] = list(
+        _count_loadlibs(
+            root.findall("vlm"), totals, options.flag_matcher, snapshot
+        )
+    )
+
+    # open_text() compresse à la volée si json_path finit par .gz/.bz2/.xz.
+    # Les mêmes fonctions d'écriture qu'en mode stream : le JSON est le même.
+    with open_text(Path(json_path), "w", "utf-8") as f:
+        return write_json(libs, f, options.json_format, options.copt_layout)
+
+
+@dataclass
+class _ChunkResult:
+    """Morceau du XML converti par un processus de ``--workers``.
+
+    Attributs:
+        parts: Texte de chaque loadlib (voir :data:`_RENDERERS`) ; vide en
+            disposition ``table``, dont la numérotation des jeux d'options
+            est globale : le processus principal sérialise alors lui-même.
+        libs: Loadlibs du modèle, renvoyées seulement si le processus
+            principal en a besoin (disposition ``table``, instantané).
+        count: Nombre de loadlibs du morceau.
+        totals: Loadmods et CSECTs du morceau, et succès / échecs du cache
+            COPT du processus pendant sa conversion.
+    """
+
+    parts: list[str]
+    libs: list[Loadlib]
+    count: int
+    totals: Counter[str]
+
+
+def _convert_chunk(
+    head: bytes,
+    chunk: bytes,
+    root_tag: str,
+    encoding: str,
+    options: ConvertOptions,
+    *,
+    final: bool,
+) -> _ChunkResult:
+    """Convertit un morceau de ``split_vlm_chunks()`` (processus du pool).
+
+    Le morceau est analysé comme un document, précédé de l'en-tête ``head``
+    (déclaration et ouverture de la racine) ; sauf le dernier (``final``),
+    qui la contient déjà, il est suivi de la balise fermante de la racine.
+    """
+    document = head + chunk
+    if not final:
+        document += f"</{root_tag}>".encode(encoding)
+    render = (
+        _RENDERERS[options.json_format]
+        if options.copt_layout != "table"
+        else None
+    )
+    keep_models = render is None or options.snapshot_path is not None
+    cache_before = tokenize_copt_options.cache_info()
+    totals: Counter[str] = Counter()
+    parts: list[str] = []
+    libs: list[Loadlib] = []
+    for lib in _count_loadlibs(
+        iter_vlm(io.BytesIO(document), encoding), totals, options.flag_matcher
+    ):
+        if render is not None:
+            parts.append(render(lib, None))
+        if keep_models:
+            libs.append(lib)
+        totals["loadlibs"] += 1
+    # Le cache du processus sert à plusieurs morceaux : seul l'écart compte.
+    cache_after = tokenize_copt_options.cache_info()
+    totals["copt_cache_hits"] = cache_after.hits - cache_before.hits
+    totals["copt_cache_misses"] = cache_after.misses - cache_before.misses
+    return _ChunkResult(parts, libs, totals.pop("loadlibs", 0), totals)
+
+
+def _root_tag(head: bytes, encoding: str) -> str:
+    """Retourne la balise racine, ouverte dans l'en-tête ``head``.
+
+    Raises:
+        ET.ParseError: Si l'en-tête n'ouvre aucun élément.
+
+    """
+    for _event, elem in ET.iterparse(
+        io.BytesIO(head),
+        events=("start",),
+        parser=ET.XMLParser(encoding=encoding),
+    ):
+        tag: str = elem.tag
+        return tag
+    raise ET.ParseError("aucun élément racine avant le premier <vlm>")
+
+
+def _iter_chunk_results(
+    pool: ProcessPoolExecutor,
+    head: bytes,
+    chunks: Iterator[bytes],
+    root_tag: str,
+    encoding: str,
+    options: ConvertOptions,
+) -> Iterator[_ChunkResult]:
+    """Soumet les morceaux au pool et restitue leurs résultats dans l'ordre.
+
+    Au plus ``_PENDING_PER_WORKER`` morceaux par processus sont en cours :
+    la lecture de l'entrée suit le rythme des processus.
+    """
+    max_pending = options.workers * _PENDING_PER_WORKER
+    pending: deque[Future[_ChunkResult]] = deque()
+    chunk = next(chunks)
+    for following in itertools.chain(chunks, [None]):
+        pending.append(
+            pool.submit(
+                _convert_chunk,
+                head,
+                chunk,
+                root_tag,
+                encoding,
+                options,
+                final=following is None,
+            )
+        )
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        if following is None:
+            break
+        chunk = following
+    while pending:
+        yield pending.popleft().result()
+
+
+def _collect_chunks(
+    results: Iterable[_ChunkResult],
+    totals: Counter[str],
+    snapshot: SnapshotWriter | None,
+) -> Iterator[_ChunkResult]:
+    """Cumule les totaux de chaque morceau et l'ajoute à ``snapshot``."""
+    for result in results:
+        totals.update(result.totals)
+        if snapshot is not None:
+            for lib in result.libs:
+                snapshot.add(lib)
+        yield result
+
+
+def _convert_parallel(
+    xml_path: str,
+    json_path: str,
+    encoding: str,
+    totals: Counter[str],
+    options: ConvertOptions,
+    snapshot: SnapshotWriter | None = None,
+) -> int:
+    """Mode ``stream`` avec ``--workers`` : loadlibs converties par un pool.
+
+    Le XML est découpé en morceaux de blocs ``<vlm>`` entiers
+    (``utils.split_vlm_chunks()``, sans analyse) ; chaque processus
+    analyse son morceau, construit le modèle et sérialise ses loadlibs. Le
+    processus principal écrit les textes dans l'ordre du document : le JSON
+    et les totaux sont ceux du mode séquentiel.
+
+    Returns:
+        Nombre de loadlibs écrites.
+
+    """
+    with open_binary(Path(xml_path), "rb") as f_in:
+        chunks = split_vlm_chunks(f_in)
+        head = next(chunks)
+        first = next(chunks, None)
+        if first is None:
+            # Aucun bloc `<vlm>` : rien à répartir.
+            return _convert_stream(
+                xml_path, json_path, encoding, totals, options, snapshot
+            )
+        root_tag = _root_tag(head, encoding)
+        try:
+            with (
+                open_text(Path(json_path), "w", "utf-8") as f,
+                ProcessPoolExecutor(max_workers=options.workers) as pool,
+            ):
+                results = _collect_chunks(
+                    _iter_chunk_results(
+                        pool,
+                        head,
+                        itertools.chain([first], chunks),
+                        root_tag,
+                        encoding,
+                        options,
+                    ),
+                    totals,
+                    snapshot,
+                )
+                if options.copt_layout == "table":
+                    return write_json(
+                        (lib for result in results for lib in result.libs),
+                        f,
+                        options.json_format,
+                        options.copt_layout,
+                    )
+                return _JOINERS[options.json_format](
+                    (part for result in results for part in result.parts), f
+                )
+        except BaseException:
+            # Pas de JSON tronqué, comme en mode séquentiel.
+            Path(json_path).unlink(missing_ok=True)
+            raise
+
+
+def _resolve_convert_workers(workers: int, engine: str, encoding: str) -> int:
+    """Retourne le nombre de processus effectif de la conversion.
+
+    Le découpage de ``split_vlm_chunks()`` exige le moteur ``stream`` et un
+    encodage compatible ASCII : sinon, la conversion reste séquentielle.
+    """
+    workers = resolve_workers(workers)
+    if workers > 1 and (
+        engine != "stream" or not is_ascii_compatible(encoding)
+    ):
+        LOGGER.info(
+            "Moteur %s ou encodage %s incompatible avec --workers : "
+            "conversion séquentielle.",
+            engine,
+            encoding,
+        )
+        return 1
+    if workers > 1:
+        LOGGER.info("Conversion parallèle : %d processus.", workers)
+    return workers
+
+
+def xml_to_json(
+    xml_path: str,
+    json_path: str,
+    encoding: str,
+    engine: str = "stream",
+    options: ConvertOptions | None = None,
+) -> None:
     """Convertit un fichier XML VLM nettoyé en fichier JSON structuré.
 
     Parcourt l'arbre XML niveau par niveau (Loadlib → Loadmod → CSECT)
-    et construit une liste Python de dictionnaires, puis la sérialise en JSON.
+    et sérialise en JSON la liste des loadlibs. En mode ``stream``, chaque
+    ``<vlm>`` est converti et écrit dès sa fermeture puis libéré : une seule
+    loadlib est en mémoire. En mode ``tree``, l'arbre et le modèle complets
+    (:mod:`vlm_model`) sont chargés avant l'écriture. Avec
+    ``options.workers`` (mode ``stream``), les loadlibs sont converties par
+    un pool de processus (:func:`_convert_parallel`). Le JSON est identique
+    dans tous les modes.
 
     Structure du JSON produit (hiérarchie à 3 niveaux) ::
 
@@ -224,7 +1145,8 @@ def xml_to_json(xml_path: str, json_path: str, encoding: str) -> None:
           }
         ]
 
-    Champs booléens dérivés (calculés automatiquement depuis le nom du CSECT) :
+    Champs booléens dérivés du nom du CSECT, selon la table ``[flags]`` de
+    ``config.toml`` (règles par défaut, voir ``csect_flags.py``) :
     - ``ThreadSafe`` : vrai si le CSECT s'appelle ``CEEUOPT``.
     - ``CICS``       : vrai si le CSECT s'appelle ``DFHECI``.
     - ``DB2``        : vrai si le nom contient un stub DB2 connu.
@@ -234,160 +1156,51 @@ def xml_to_json(xml_path: str, json_path: str, encoding: str) -> None:
         xml_path: Chemin du fichier XML d'entrée (bien formé, encodage déclaré).
         json_path: Chemin du fichier JSON à créer.
         encoding: Encodage du fichier XML (ex. ``utf-8``, ``iso8859-1``).
+        engine: Mode de conversion, ``stream`` (défaut) ou ``tree``.
+        options: Format, disposition des options, règles des champs
+            booléens, instantané et processus (voir :class:`ConvertOptions` ;
+            défaut : JSON ``pretty`` historique, séquentiel).
 
-    """
-    # Pattern pour valider le format de l'attribut "Identify" d'un CSECT.
-    # Exemple attendu : "CCBD01/51EBC3AD/DYA0000005"
-    # - Partie 1 (1-8 chars alphanum, _, @, à) : code application.
-    # - Partie 2 (1-8 chars alphanum)           : hash ou version.
-    # - Partie 3 (DY|DA + 2 chars + 6 chiffres) : code de package.
-    pattern: str = (
-        r"^[A-Za-z0-9_@à]{1,8}"  # Partie 1 : code application
-        r"/"
-        r"[A-Za-z0-9]{1,8}"  # Partie 2 : hash/version
-        r"/"
-        r"(DY|DA)[A-Za-z0-9]{2}[0-9]{6}$"  # Partie 3 : code package
-    )
+    Raises:
+        ET.ParseError: Si le XML est mal formé ; en mode ``stream``, le JSON
+            partiel est alors supprimé.
 
+    """
     LOGGER.info("Début de la conversion : %s → %s", xml_path, json_path)
 
-    # ET.parse() charge le fichier XML en mémoire sous forme d'arbre d'objets.
-    # ET.XMLParser(encoding=...) force l'encodage déclaré dans l'argument CLI.
-    tree: ET.ElementTree[ET.Element] = ET.parse(
-        xml_path, parser=ET.XMLParser(encoding=encoding)
+    options = options or ConvertOptions()
+    workers = _resolve_convert_workers(options.workers, engine, encoding)
+    options = replace(options, workers=workers)
+    totals: Counter[str] = Counter()
+    snapshot = SnapshotWriter() if options.snapshot_path else None
+    convert = _convert_tree if engine == "tree" else _convert_stream
+    if workers > 1:
+        convert = _convert_parallel
+    nb_loadlibs = convert(
+        xml_path, json_path, encoding, totals, options, snapshot
     )
-    # getroot() retourne l'élément racine ou None si l'arbre est vide.
-    # ET.parse() garantit une racine présente, mais le type annoté est
-    # Element | None : on lève une erreur explicite si ce cas impossible survient.
-    root: ET.Element = tree.getroot()
-    if root is None:
-        raise ValueError(
-            f"Le fichier XML '{xml_path}' ne contient pas d'élément racine."
-        )
-    vlm_list: list[dict[str, Any]] = []  # Accumulera toutes les Loadlibs.
-    nb_loadmods: int = 0
-    nb_csects: int = 0
-
-    # root.findall("vlm") retourne la liste de tous les éléments <vlm> fils directs.
-    for vlm in root.findall("vlm"):
-        # .get("loadlib") lit l'attribut XML loadlib="..." de la balise <vlm>.
-        loadlib: str | None = vlm.get("loadlib")
-        member_count_elem: ET.Element | None = vlm.find("memberCount")
-        if member_count_elem is not None:
-            # .get("value") retourne str | None ; on substitue "0" si absent.
-            member_count: int = int(member_count_elem.get("value") or "0")
-        else:
-            member_count = 0
-
-        loadmods: list[dict[str, Any]] = []
-
-        for loadmod in vlm.findall("Loadmod"):
-            nb_loadmods += 1
-            # Construction du dictionnaire du loadmod depuis ses attributs XML.
-            loadmod_data: dict[str, Any] = {
-                "Name": loadmod.get("Name"),
-                "Linkedon": loadmod.get("Linkedon"),
-                "Linkedat": loadmod.get("Linkedat"),
-                "Linkedby": loadmod.get("Linkedby"),
-                "EPA": loadmod.get("EPA"),
-                "MSize": loadmod.get("MSize"),
-                "TTR": loadmod.get("TTR"),
-                "SSI": loadmod.get("SSI"),
-                "AC": loadmod.get("AC"),
-                "AM": loadmod.get("AM"),
-                "RM": loadmod.get("RM"),
-                "CSECTs": [],
-            }
-
-            for csect in loadmod.findall("CSECT"):
-                nb_csects += 1
-                csect_data: dict[str, Any] = {
-                    "Name": csect.get("Name"),
-                    "Type": csect.get("Type"),
-                    "Class": csect.get("Class"),
-                    "Address": csect.get("Address"),
-                    "Size": csect.get("Size"),
-                    "RMODE": csect.get("ARMODE"),
-                    "Compiler1": csect.get("Compiler1"),
-                    "Date": csect.get("Date"),
-                }
-
-                # Champs booléens dérivés du nom du CSECT.
-                # En Python, une comparaison (==) retourne directement True/False,
-                # ce qui permet de stocker le résultat comme booléen JSON.
-                csect_data["ThreadSafe"] = csect_data["Name"] == "CEEUOPT"
-                csect_data["CICS"] = csect_data["Name"] == "DFHECI"
-
-                # any(iterable) retourne True si au moins un élément est vrai.
-                # Ici : True si le nom du CSECT contient l'un des stubs DB2 connus.
-                csect_data["DB2"] = any(
-                    sub in csect_data["Name"]
-                    for sub in ("DSNCLI", "DSNELI", "DSNULI")
-                )
-                # Même logique pour les stubs WMQ (WebSphere MQ / IBM MQ).
-                csect_data["WMQ"] = any(
-                    sub in csect_data["Name"]
-                    for sub in (
-                        "DFHMQSTB",
-                        "CSQBSTUB",
-                        "CSQBRRSI",
-                        "CSQBRSTB",
-                        "CSQCSTUB",
-                        "CSQQSTUB",
-                        "CSQXSTUB",
-                        "CSQASTUB",
-                    )
-                )
-
-                # Recherche de la balise <Identify> (identifiant de package).
-                identify_elem: ET.Element | None = csect.find("Identify")
-                if identify_elem is not None:
-                    val: str | None = identify_elem.attrib.get("Val")
-                    if val and re.match(pattern, val):
-                        # Le format est valide : on garde uniquement la 3e partie
-                        # (code package) après découpe sur '/'.
-                        i: list[str] = val.split("/")
-                        package: str = i[-1]
-                        csect_data["Identify"] = package
-                    else:
-                        csect_data["Identify"] = None
-
-                # Recherche de la balise <Copt> contenant les options de compilation.
-                copt_elem: ET.Element | None = csect.find("Copt")
-                if copt_elem is not None:
-                    # .get("Val") retourne None si l'attribut est absent ;
-                    # `or ""` le remplace par une chaîne vide pour éviter
-                    # un crash dans split_copt_options.
-                    copt_val: str = copt_elem.get("Val") or ""
-                    options: list[str] = split_copt_options(copt_val)
-                    csect_data["Copt"] = options
-
-                loadmod_data["CSECTs"].append(csect_data)
-            loadmods.append(loadmod_data)
-
-        vlm_list.append(
-            {
-                "Loadlib": loadlib,
-                "MemberCount": member_count,
-                "Loadmods": loadmods,
-            }
-        )
+    if snapshot is not None and options.snapshot_path:
+        snapshot.write(Path(options.snapshot_path))
+        LOGGER.info("Instantané colonnaire écrit : %s", options.snapshot_path)
 
     LOGGER.debug(
         "Éléments traités : %d loadlib(s), %d loadmod(s), %d CSECT(s).",
-        len(vlm_list),
-        nb_loadmods,
-        nb_csects,
+        nb_loadlibs,
+        totals["loadmods"],
+        totals["csects"],
     )
 
-    # json.dump() sérialise la liste Python en JSON dans le fichier ouvert.
-    # - indent=2 : indentation de 2 espaces pour un fichier lisible.
-    # - ensure_ascii=False : conserve les caractères non-ASCII (accents, etc.)
-    #   tels quels au lieu de les encoder en \uXXXX.
-    with Path(json_path).open("w", encoding="utf-8") as f:
-        json.dump(vlm_list, f, indent=2, ensure_ascii=False)
-
-    LOGGER.info("JSON écrit avec succès : %s", json_path)
+    # Cache du processus principal et, avec `--workers`, des processus.
+    cache = tokenize_copt_options.cache_info()
+    LOGGER.info(
+        "JSON écrit avec succès : %s (cache COPT : %d succès, %d échecs)",
+        json_path,
+        cache.hits + totals["copt_cache_hits"],
+        cache.misses + totals["copt_cache_misses"],
+    )
+    if workers == 1:
+        # Le pool de valeurs des processus de `--workers` reste local.
+        LOGGER.debug("Valeurs distinctes partagées : %s.", VALUE_POOL.summary())
 
 
 def main() -> None:
@@ -397,18 +1210,28 @@ def main() -> None:
     1. Parse les arguments (fichiers d'entrée/sortie, encodage).
     2. Vérifie que le fichier XML source existe.
     3. Vérifie que le répertoire de sortie est accessible en écriture.
-    4. Vérifie que le XML est bien formé.
-    5. Lance la conversion XML → JSON.
+    4. Lance la conversion XML → JSON, qui valide le XML au passage : le
+       fichier n'est lu qu'une fois.
 
     Raises:
         SystemExit:
-            - Code 2 : fichier introuvable ou répertoire de sortie invalide.
+            - Code 2 : fichier introuvable, répertoire de sortie invalide ou
+              table ``[flags]`` de ``config.toml`` invalide.
+            - Code 3 : XML mal formé (aucun JSON n'est laissé).
 
     """
     args: argparse.Namespace = parse_args()
-    setup_logging(load_config(), "build_json")
+    config = load_config()
+    setup_logging(config, "build_json")
     input_path: Path = Path(args.file)
 
+    # Règles [flags] compilées une fois, avant toute lecture du XML.
+    try:
+        flag_matcher = load_flag_matcher(config)
+    except ValueError as e:
+        LOGGER.error("Table [flags] invalide dans config.toml : %s", e)
+        sys.exit(2)
+
     if not input_path.is_file():
         LOGGER.error("Fichier d'entrée '%s' introuvable.", args.file)
         sys.exit(2)
@@ -440,8 +1263,24 @@ def main() -> None:
         )
         sys.exit(2)
 
-    check_xml_well_formed(str(input_path))
-    xml_to_json(str(input_path), str(output_path), args.encoding)
+    # Une seule lecture : la conversion échoue au premier défaut de syntaxe.
+    try:
+        xml_to_json(
+            str(input_path),
+            str(output_path),
+            args.encoding,
+            args.engine,
+            ConvertOptions(
+                json_format=args.format,
+                copt_layout=args.copt_layout,
+                flag_matcher=flag_matcher,
+                snapshot_path=args.snapshot,
+                workers=args.workers,
+            ),
+        )
+    except ET.ParseError as e:
+        LOGGER.error("Erreur de syntaxe XML dans %s : %s", input_path, e)
+        sys.exit(3)
 
 
 # Ce bloc garantit que main() n'est appelé que si le script est exécuté
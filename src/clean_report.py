@@ -16,20 +16,66 @@ XML. Ce script filtre le contenu hétérogène pour ne conserver qu'un XML
 UTF-8 encapsulé dans une balise ``<root>``, enrichi des attributs ``loadlib``
 et ``memberCount``.
 
+Deux moteurs de nettoyage appliquent les mêmes règles :
+- ``bytes`` (défaut) : classe les lignes directement en octets, par gros
+  blocs d'un fichier projeté en mémoire ; les lignes ASCII conservées sont
+  recopiées sans décodage ni réencodage.
+- ``text``  : moteur de référence, ligne à ligne en ``str``.
+
+Le rapport peut être nettoyé en parallèle (``--workers N``) : chaque section
+``DSNIN=`` (une par loadlib) est confiée à un processus distinct et les
+fragments XML obtenus sont réassemblés dans l'ordre d'origine.
+
+Un transfert binaire du rapport (``--input-format vba``) est lu directement :
+les enregistrements RECFM=VBA sont découpés d'après leur RDW et décodés en
+bloc depuis la page de code EBCDIC indiquée par ``-e`` (cp1147, cp037…).
+
+Avec ``--shard-dir``, un XML bien formé est écrit par loadlib, accompagné
+d'un manifeste (comptes de membres, tailles, empreintes) : les étapes
+suivantes peuvent alors traiter les loadlibs séparément.
+
+Des points de reprise sont enregistrés régulièrement dans
+``<sortie>.ckpt`` : après une interruption, ``--resume`` tronque la sortie
+au dernier point de reprise et poursuit le traitement à partir de là.
+
 Exemple :
     python src/clean_report.py -f datas/vlm.xml -o datas/clean_vlm.xml -e iso8859-1
+    python src/clean_report.py -f datas/vlm.xml -o datas/clean_vlm.xml -w 8
+    python src/clean_report.py -f datas/vlm.xml -o datas/clean_vlm.xml --resume
+    python src/clean_report.py -f datas/vlm.xml --shard-dir datas/shards -w 0
+    python src/clean_report.py -f datas/vlm.bin -e cp1147 --input-format vba
 """
 
 from __future__ import annotations
 
 import argparse
+import io
+import json
 import logging
+import mmap
+import os
 import re
 import sys
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import partial
+from hashlib import sha256
+from itertools import compress, count, repeat
+from operator import itemgetter, not_
 from pathlib import Path
-
-from utils import load_config, setup_logging
+from typing import IO, BinaryIO, TextIO
+
+import ebcdic
+from utils import (
+    COMPRESSION_ERRORS,
+    detect_compression,
+    is_ascii_compatible,
+    load_config,
+    open_binary,
+    resolve_workers,
+    setup_logging,
+)
 
 # -------------------------------------------------------------------------------------
 # Constantes module
@@ -37,6 +83,9 @@ from utils import load_config, setup_logging
 
 LOGGER = logging.getLogger("clean_report")
 
+# Rend disponible la page de code cp1147 (France + euro) pour -e.
+ebcdic.register()
+
 # --- Expressions régulières (regex) pré-compilées ---
 # re.compile() compile la regex une seule fois au chargement du module,
 # ce qui est plus efficace que de la recompiler à chaque appel de fonction.
@@ -78,6 +127,86 @@ _NOISE_PREFIXES: frozenset[str] = frozenset(
     }
 )
 
+# --- Tables du moteur octets ---
+
+# Moteurs de nettoyage disponibles (voir convert_report).
+ENGINES: tuple[str, ...] = ("bytes", "text")
+
+# Formats du rapport en entrée : lignes de texte (transfert en mode texte)
+# ou enregistrements RECFM=VBA préfixés de leur RDW (transfert binaire).
+INPUT_FORMATS: tuple[str, ...] = ("text", "vba")
+
+# Taille du RDW (Record Descriptor Word) en tête de chaque enregistrement.
+_RDW_SIZE = 4
+
+# Taille des blocs lus par le moteur octets (alignés sur un saut de ligne).
+_BLOCK_SIZE = 8 * 1024 * 1024
+
+# Blancs ASCII retirés par str.strip() : bytes.strip() sans argument ignore
+# \x1c-\x1f, il faut donc les lister pour obtenir un résultat identique.
+_ASCII_WS = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Préfixes de bruit indexés par leur premier octet : une ligne XML (« < »)
+# est écartée par une seule recherche dans le dict, sans aucun startswith.
+_NOISE_TABLE: dict[int, tuple[bytes, ...]] = {
+    head: tuple(
+        prefix.encode("ascii")
+        for prefix in sorted(_NOISE_PREFIXES)
+        if prefix.encode("ascii")[0] == head
+    )
+    for head in {prefix.encode("ascii")[0] for prefix in _NOISE_PREFIXES}
+}
+
+# Alternance unique des marqueurs traités hors du chemin direct. Une ligne
+# sans aucun de ces motifs est recopiée telle quelle ; les autres sont
+# départagées par _RE_DSN / _RE_ERROR / _RE_EMPTY dans l'ordre habituel.
+_RE_EVENT_B: re.Pattern[bytes] = re.compile(rb"DSNIN=|FMNBF427|FMNBE329")
+
+# Motifs cherchés par bytes.find pour repérer ces lignes dans un bloc :
+# « FMNB » couvre FMNBF427 et FMNBE329 en un seul balayage.
+_EVENT_SCAN: tuple[bytes, ...] = (b"DSNIN=", b"FMNB")
+
+# Débuts de ligne (après ASA et blancs) qui excluent la recopie directe,
+# indexés sur leurs trois premiers octets : le repérage en masse ne fait
+# qu'un test d'appartenance par ligne (sur-ensemble vérifié ensuite).
+_LINE_HEADS: frozenset[bytes] = frozenset(
+    head.encode("ascii")[:3] for head in (*_NOISE_PREFIXES, "<vlm>", "</vlm>")
+)
+
+# En-tête et pied du XML produit (sortie unique ou fragment par loadlib).
+_XML_HEADER = b'<?xml version="1.0" encoding="UTF-8"?>\n<root>\n'
+_XML_FOOTER = b"</root>"
+
+# Compte de membres injecté par clean_lines, relu pour le manifeste des
+# fichiers par loadlib.
+_RE_MEMBER_COUNT_B: re.Pattern[bytes] = re.compile(
+    rb'<memberCount value="(\d+)"/>'
+)
+
+# --- Sortie par loadlib (--shard-dir) ---
+
+# Manifeste écrit dans le répertoire des fichiers par loadlib.
+MANIFEST_NAME = "manifest.json"
+
+# Nom du fichier recevant les blocs <vlm> rencontrés avant tout DSNIN=.
+_NO_LOADLIB_SHARD = "_sans_loadlib"
+
+# --- Points de reprise ---
+
+# Suffixe du fichier de points de reprise, écrit à côté de la sortie XML.
+_CHECKPOINT_SUFFIX = ".ckpt"
+
+# Volume d'entrée traité entre deux points de reprise.
+_CHECKPOINT_EVERY = 64 * 1024 * 1024
+
+# Extraient line[1:] et line[:3] sans boucle Python (utilisés via map()).
+_DROP_ASA = itemgetter(slice(1, None))
+_HEAD3 = itemgetter(slice(0, 3))
+
+
+class RecordFormatError(ValueError):
+    """Enregistrement RECFM=VBA illisible (RDW invalide ou tronqué)."""
+
 
 # -------------------------------------------------------------------------------------
 # Fonctions pures
@@ -145,7 +274,20 @@ def read_member_count(f_in: Iterator[str]) -> int:
     next_line = next(f_in, None)
     if next_line is None:
         return 0
-    match = _RE_COUNT.search(strip_asa_char(next_line))
+    return parse_member_count(next_line)
+
+
+def parse_member_count(line: str) -> int:
+    """Extrait le nombre de membres d'une ligne ``FMNBB437 N member(s) read``.
+
+    Args:
+        line: Ligne brute (avec caractère ASA).
+
+    Returns:
+        Nombre de membres lus, ou ``0`` si le message est absent.
+
+    """
+    match = _RE_COUNT.search(strip_asa_char(line))
     return int(match.group(1)) if match else 0
 
 
@@ -199,75 +341,1166 @@ def validate_output_dir(path: Path) -> None:
 # -------------------------------------------------------------------------------------
 
 
-def convert_report(input_path: Path, output_path: Path, encoding: str) -> None:
+def clean_lines(
+    f_in: Iterator[str], f_out: TextIO, current_loadlib: str = ""
+) -> str:
+    """Applique les règles de nettoyage à un flux de lignes du rapport.
+
+    Cœur commun au mode séquentiel et au mode parallèle : élimine le bruit,
+    mémorise la loadlib courante (``DSNIN=``), injecte les attributs
+    ``loadlib`` et ``memberCount`` dans les balises ``<vlm>`` et écrit les
+    autres lignes telles quelles.
+
+    Args:
+        f_in: Itérateur de lignes brutes (avec caractère ASA).
+        f_out: Flux texte de sortie.
+        current_loadlib: Loadlib active au début du flux.
+
+    Returns:
+        Loadlib active à la fin du flux.
+
+    Raises:
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    for line in f_in:
+        line_str = strip_asa_char(line)
+
+        if is_noise_line(line_str):
+            continue
+
+        dsn_match = _RE_DSN.search(line_str)
+        if dsn_match:
+            current_loadlib = dsn_match.group(1).rstrip(",")
+            LOGGER.debug("Loadlib détectée : %s", current_loadlib)
+            continue
+
+        error_match = _RE_ERROR.search(line_str)
+        if error_match:
+            LOGGER.error("Erreur métier FMNBF427 : %s", error_match.group(1))
+            sys.exit(1)
+
+        if _RE_EMPTY.search(line_str):
+            LOGGER.debug(
+                "Bibliothèque vide : %s (memberCount=0)", current_loadlib
+            )
+            f_out.write(f'<vlm loadlib="{current_loadlib}">\n')
+            f_out.write('  <memberCount value="0"/>\n')
+            f_out.write("</vlm>\n")
+            continue
+
+        if line_str.startswith("<vlm>"):
+            f_out.write(f'<vlm loadlib="{current_loadlib}">\n')
+        else:
+            if line_str.startswith("</vlm>"):
+                member_count = read_member_count(f_in)
+                f_out.write(f'<memberCount value="{member_count}"/>')
+            f_out.write(line_str + "\n")
+
+    return current_loadlib
+
+
+def iter_blocks(
+    data: bytes | mmap.mmap, start: int, end: int
+) -> Iterator[bytes]:
+    r"""Découpe ``data[start:end]`` en gros blocs (~8 Mo) de lignes entières.
+
+    Chaque bloc se termine sur un ``\n`` : aucune ligne ni séquence
+    ``\r\n`` n'est coupée. Un bloc ne se termine jamais par une ligne
+    ``</vlm>`` : la ligne ``FMNBB437`` qui la suit reste dans le même bloc,
+    ce qui rend chaque bloc autonome hormis la loadlib courante.
+    """
+    pos = start
+    while pos < end:
+        block_end = min(pos + _BLOCK_SIZE, end)
+        if block_end < end:
+            cut = data.rfind(b"\n", pos, block_end)
+            if cut == -1:
+                cut = data.find(b"\n", block_end)
+            block_end = end if cut == -1 else cut + 1
+        while block_end < end:
+            last_line = data.rfind(b"\n", pos, block_end - 1) + 1
+            if data.find(b"</vlm>", last_line, block_end) == -1:
+                break
+            cut = data.find(b"\n", block_end)
+            block_end = end if cut == -1 else cut + 1
+        yield data[pos:block_end]
+        pos = block_end
+
+
+def iter_stream_blocks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Variante de :func:`iter_blocks` pour un flux séquentiel.
+
+    Sert aux fichiers compressés et aux enregistrements RDW convertis
+    (:func:`iter_rdw_chunks`). Les blocs respectent les mêmes règles de
+    coupure ; la fin incomplète d'une lecture est reportée sur la suivante.
+    """
+    carry = b""
+    for chunk in chunks:
+        buf = carry + chunk
+        cut = buf.rfind(b"\n") + 1
+        while cut:
+            last_line = buf.rfind(b"\n", 0, cut - 1) + 1
+            if buf.find(b"</vlm>", last_line, cut) == -1:
+                break
+            cut = last_line
+        if cut:
+            yield buf[:cut]
+        carry = buf[cut:]
+    if carry:
+        yield carry
+
+
+def split_rdw_records(buf: bytes, base_offset: int) -> tuple[list[bytes], int]:
+    """Découpe les enregistrements complets d'un tampon RECFM=V(B)A.
+
+    Chaque enregistrement commence par son RDW (Record Descriptor Word) :
+    deux octets de longueur big-endian, RDW compris, puis deux octets nuls.
+    Le caractère ASA reste en tête des données, comme en mode texte.
+
+    Args:
+        buf: Octets bruts lus à partir d'un début d'enregistrement.
+        base_offset: Offset de ``buf`` dans le fichier (messages d'erreur).
+
+    Returns:
+        ``(enregistrements_sans_rdw, octets_consommés)`` ; un enregistrement
+        incomplet en fin de tampon n'est pas consommé.
+
+    Raises:
+        RecordFormatError: Si un RDW est invalide (longueur < 4, octets
+            réservés non nuls — enregistrements segmentés VBS compris).
+
+    """
+    records: list[bytes] = []
+    pos = 0
+    size = len(buf)
+    while pos + _RDW_SIZE <= size:
+        length = int.from_bytes(buf[pos : pos + 2], "big")
+        if length < _RDW_SIZE or buf[pos + 2 : pos + _RDW_SIZE] != b"\0\0":
+            raise RecordFormatError(
+                f"RDW invalide à l'octet {base_offset + pos} : "
+                f"{buf[pos : pos + _RDW_SIZE].hex()}"
+            )
+        if pos + length > size:
+            break
+        records.append(buf[pos + _RDW_SIZE : pos + length])
+        pos += length
+    return records, pos
+
+
+def iter_rdw_chunks(f_in: IO[bytes], encoding: str) -> Iterator[bytes]:
+    r"""Convertit un transfert binaire RECFM=VBA en lignes UTF-8, par gros blocs.
+
+    Les enregistrements d'un bloc lu sont joints par le saut de ligne de
+    la page de code puis décodés en un seul appel (``bytes.decode``), sans
+    boucle par ligne ; le résultat est réencodé en UTF-8 pour les moteurs.
+
+    Args:
+        f_in: Flux binaire du rapport (éventuellement décompressé).
+        encoding: Page de code EBCDIC, ex : ``cp1147`` ou ``cp037``.
+
+    Yields:
+        Blocs UTF-8 de lignes entières, chacune terminée par ``\n``.
+
+    Raises:
+        RecordFormatError: Si un RDW est invalide ou le dernier
+            enregistrement tronqué.
+
+    """
+    newline = "\n".encode(encoding)
+    carry = b""
+    offset = 0
+    while chunk := f_in.read(_BLOCK_SIZE):
+        buf = carry + chunk
+        records, consumed = split_rdw_records(buf, offset)
+        if records:
+            records.append(b"")
+            yield newline.join(records).decode(encoding).encode("utf-8")
+        carry = buf[consumed:]
+        offset += consumed
+    if carry:
+        raise RecordFormatError(
+            f"Enregistrement tronqué en fin de fichier (octet {offset})."
+        )
+
+
+def _skip_bytes(chunks: Iterable[bytes], count: int) -> Iterator[bytes]:
+    """Ignore les ``count`` premiers octets d'un flux de blocs (reprise)."""
+    for chunk in chunks:
+        if count >= len(chunk):
+            count -= len(chunk)
+            continue
+        yield chunk[count:]
+        count = 0
+
+
+def classify_raw_line(raw: bytes, encoding: str) -> tuple[bytes, str] | None:
+    """Classe une ligne brute du rapport en une seule passe.
+
+    Pour une ligne ASCII : suppression ASA et blancs en octets, premier
+    octet cherché dans ``_NOISE_TABLE``, puis une unique recherche
+    ``_RE_EVENT_B``. Une ligne non ASCII est décodée et suit les règles
+    ``str`` de :func:`strip_asa_char` et :func:`is_noise_line`.
+
+    Args:
+        raw: Ligne brute sans fin de ligne.
+        encoding: Encodage source, compatible ASCII.
+
+    Returns:
+        ``None`` pour une ligne de bruit, sinon ``(ligne_utf8, ligne_str)``
+        où ``ligne_str`` est vide si la ligne ne porte aucun marqueur
+        (``DSNIN=``, ``FMNBF427``, ``FMNBE329``).
+
+    """
+    if not raw.isascii():
+        line_str = strip_asa_char(raw.decode(encoding))
+        if is_noise_line(line_str):
+            return None
+        return line_str.encode("utf-8"), line_str
+
+    line = raw[1:].strip(_ASCII_WS)
+    if not line:
+        return None
+    prefixes = _NOISE_TABLE.get(line[0])
+    if (
+        prefixes
+        and line.startswith(prefixes)
+        and not line.startswith(b"$$FILEM VLM")
+    ):
+        return None
+    if _RE_EVENT_B.search(line):
+        return line, line.decode("ascii")
+    return line, ""
+
+
+def _candidate_lines(
+    block: bytes, lines: list[bytes], out: list[bytes]
+) -> list[int]:
+    r"""Retourne, triés, les indices des lignes exclues de la recopie directe.
+
+    Sur-ensemble calculé sans boucle Python par ligne : trois premiers
+    octets présents dans ``_LINE_HEADS``, lignes non ASCII et lignes contenant un
+    motif de ``_EVENT_SCAN``. Les motifs sont localisés par
+    ``bytes.find`` (plus rapide sur un gros bloc qu'une alternance regex)
+    et leurs positions converties en numéros de ligne par comptage
+    incrémental des ``\n``.
+    """
+    candidates = set(
+        compress(count(), map(_LINE_HEADS.__contains__, map(_HEAD3, out)))
+    )
+    if not block.isascii():
+        candidates.update(
+            compress(count(), map(not_, map(bytes.isascii, lines)))
+        )
+
+    offsets: list[int] = []
+    for marker in _EVENT_SCAN:
+        pos = block.find(marker)
+        while pos != -1:
+            offsets.append(pos)
+            pos = block.find(marker, pos + 1)
+
+    line_idx = 0
+    prev = 0
+    for pos in sorted(offsets):
+        line_idx += block.count(b"\n", prev, pos)
+        prev = pos
+        candidates.add(line_idx)
+    return sorted(candidates)
+
+
+def apply_rules(
+    line: bytes, line_str: str, current_loadlib: str
+) -> tuple[bytes, str, bool]:
+    """Applique à une ligne classée les règles de :func:`clean_lines`.
+
+    ``DSNIN=`` (mémorise la loadlib), ``FMNBF427`` (arrêt), ``FMNBE329``
+    (bloc vide) puis réécriture de ``<vlm>`` ; l'injection de
+    ``<memberCount>`` reste à l'appelant, qui seul accède à la ligne
+    suivante.
+
+    Args:
+        line: Ligne UTF-8 sans ASA ni blancs (voir :func:`classify_raw_line`).
+        line_str: Même ligne en ``str`` si elle porte un marqueur, sinon ``""``.
+        current_loadlib: Loadlib active.
+
+    Returns:
+        ``(ligne_à_écrire, loadlib_active, ferme_vlm)`` ; une ligne vide
+        n'est pas écrite, ``ferme_vlm`` signale une ligne ``</vlm>``.
+
+    Raises:
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    if line_str:
+        dsn_match = _RE_DSN.search(line_str)
+        if dsn_match:
+            current_loadlib = dsn_match.group(1).rstrip(",")
+            LOGGER.debug("Loadlib détectée : %s", current_loadlib)
+            return b"", current_loadlib, False
+
+        error_match = _RE_ERROR.search(line_str)
+        if error_match:
+            LOGGER.error("Erreur métier FMNBF427 : %s", error_match.group(1))
+            sys.exit(1)
+
+        if _RE_EMPTY.search(line_str):
+            LOGGER.debug(
+                "Bibliothèque vide : %s (memberCount=0)", current_loadlib
+            )
+            return _empty_vlm(current_loadlib), current_loadlib, False
+
+    if line.startswith(b"<vlm>"):
+        vlm_tag = f'<vlm loadlib="{current_loadlib}">'.encode()
+        return vlm_tag, current_loadlib, False
+    return line, current_loadlib, line.startswith(b"</vlm>")
+
+
+def clean_block(
+    block: bytes, f_out: BinaryIO, encoding: str, current_loadlib: str
+) -> str:
+    """Moteur octets : nettoie un bloc de lignes entières (voir :func:`iter_blocks`).
+
+    Toutes les lignes sont d'abord traitées en masse (suppression ASA et
+    blancs via ``map``, en C) ; seules les lignes candidates repérées par
+    :func:`_candidate_lines` passent par :func:`classify_raw_line` et les
+    règles de :func:`clean_lines`. Les autres — l'immense majorité — sont
+    recopiées en octets, l'ASCII étant identique en UTF-8. Le résultat est
+    identique au moteur texte.
+
+    Args:
+        block: Bloc brut (lignes entières).
+        f_out: Flux binaire de sortie (UTF-8).
+        encoding: Encodage source, compatible ASCII.
+        current_loadlib: Loadlib active au début du bloc.
+
+    Returns:
+        Loadlib active à la fin du bloc.
+
+    Raises:
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    if block.count(b"\r") != block.count(b"\r\n"):
+        # Fins de ligne « \r » isolées : découpage ligne à ligne requis.
+        return clean_bytes(
+            iter(block.splitlines()), f_out, encoding, current_loadlib
+        )
+
+    lines = block.split(b"\n")
+    if not lines[-1]:
+        lines.pop()
+    out = list(map(bytes.strip, map(_DROP_ASA, lines), repeat(_ASCII_WS)))
+
+    consumed = -1
+    for idx in _candidate_lines(block, lines, out):
+        if idx <= consumed:
+            continue
+        classified = classify_raw_line(lines[idx], encoding)
+        if classified is None:
+            out[idx] = b""
+            continue
+        out[idx], current_loadlib, closes_vlm = apply_rules(
+            *classified, current_loadlib
+        )
+        if closes_vlm:
+            # La ligne suivante (FMNBB437) est consommée, jamais recopiée.
+            consumed = idx + 1
+            count_line = lines[consumed] if consumed < len(lines) else b""
+            member_count = parse_member_count(count_line.decode(encoding))
+            out[idx] = _member_count_tag(member_count) + out[idx]
+            if consumed < len(lines):
+                out[consumed] = b""
+
+    _write_lines(f_out, out)
+    return current_loadlib
+
+
+def clean_bytes(
+    f_in: Iterator[bytes],
+    f_out: BinaryIO,
+    encoding: str,
+    current_loadlib: str = "",
+) -> str:
+    r"""Variante ligne à ligne du moteur octets, sans découpage en blocs.
+
+    Sert de repli à :func:`clean_block` pour les fins de ligne ``\r``
+    isolées. Même classement par :func:`classify_raw_line` et mêmes règles
+    que :func:`clean_lines`.
+
+    Args:
+        f_in: Itérateur de lignes brutes sans fin de ligne.
+        f_out: Flux binaire de sortie (UTF-8).
+        encoding: Encodage source, compatible ASCII.
+        current_loadlib: Loadlib active au début du flux.
+
+    Returns:
+        Loadlib active à la fin du flux.
+
+    Raises:
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    out: list[bytes] = []
+    for raw in f_in:
+        classified = classify_raw_line(raw, encoding)
+        if classified is None:
+            continue
+        line, current_loadlib, closes_vlm = apply_rules(
+            *classified, current_loadlib
+        )
+        if closes_vlm:
+            next_raw = next(f_in, b"")
+            member_count = parse_member_count(next_raw.decode(encoding))
+            line = _member_count_tag(member_count) + line
+        out.append(line)
+
+    _write_lines(f_out, out)
+    return current_loadlib
+
+
+def clean_range(
+    data: bytes | mmap.mmap,
+    start: int,
+    end: int,
+    f_out: BinaryIO,
+    encoding: str,
+) -> str:
+    """Nettoie ``data[start:end]`` bloc par bloc avec le moteur octets.
+
+    Returns:
+        Loadlib active à la fin de la plage.
+
+    """
+    current_loadlib = ""
+    for block in iter_blocks(data, start, end):
+        current_loadlib = clean_block(block, f_out, encoding, current_loadlib)
+    return current_loadlib
+
+
+def _write_lines(f_out: BinaryIO, lines: list[bytes]) -> None:
+    """Écrit les lignes non vides, chacune suivie d'un saut de ligne."""
+    body = b"\n".join(filter(None, lines))
+    if body:
+        f_out.write(body)
+        f_out.write(b"\n")
+
+
+def _member_count_tag(member_count: int) -> bytes:
+    """Balise ``<memberCount>`` injectée juste avant ``</vlm>``."""
+    return f'<memberCount value="{member_count}"/>'.encode()
+
+
+def _empty_vlm(loadlib: str) -> bytes:
+    """Bloc ``<vlm>`` produit pour une bibliothèque vide (FMNBE329)."""
+    return (
+        f'<vlm loadlib="{loadlib}">\n  <memberCount value="0"/>\n</vlm>'
+    ).encode()
+
+
+def find_sections(
+    input_path: Path, encoding: str, start: int = 0
+) -> list[tuple[int, int]]:
+    """Découpe le rapport en sections ``[début, fin)`` alignées sur ``DSNIN=``.
+
+    Balayage rapide en octets (``mmap``) : seules les lignes contenant
+    ``DSNIN=`` sont décodées, et une frontière n'est retenue que si la ligne
+    serait effectivement traitée comme une déclaration de loadlib par
+    :func:`clean_lines` (ni bruit, ni faux positif, ni ligne consommée après
+    ``</vlm>``). Chaque section commence donc par sa ligne ``DSNIN=``, ce
+    qui la rend autonome ; la première section couvre l'en-tête du rapport.
+
+    Args:
+        input_path: Rapport VLM brut.
+        encoding: Encodage du rapport (doit être mono-octet compatible
+            avec la recherche de ``DSNIN=`` et du saut de ligne).
+        start: Offset de départ du balayage (reprise sur point de reprise) ;
+            doit être un début de section.
+
+    Returns:
+        Liste ordonnée de couples d'offsets couvrant le fichier depuis
+        ``start``.
+
+    """
+    size = input_path.stat().st_size
+    if size <= start:
+        return [(start, start)]
+
+    marker = "DSNIN=".encode(encoding)
+    newline = "\n".encode(encoding)
+    starts: list[int] = [start]
+
+    with (
+        input_path.open("rb") as f_in,
+        mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        pos = data.find(marker, start)
+        while pos != -1:
+            line_start = data.rfind(newline, 0, pos) + 1
+            line_end = data.find(newline, pos)
+            if line_end == -1:
+                line_end = size
+            line_str = strip_asa_char(
+                data[line_start:line_end].decode(encoding)
+            )
+            if (
+                line_start > starts[-1]
+                and not is_noise_line(line_str)
+                and _RE_DSN.search(line_str)
+                and not _follows_vlm_end(data, line_start, encoding)
+            ):
+                starts.append(line_start)
+            pos = data.find(marker, line_end)
+
+    return list(zip(starts, [*starts[1:], size], strict=True))
+
+
+def _follows_vlm_end(data: mmap.mmap, line_start: int, encoding: str) -> bool:
+    """Indique si la ligne débutant à ``line_start`` suit une ligne ``</vlm>``.
+
+    :func:`clean_lines` consomme la ligne qui suit ``</vlm>`` comme message
+    ``FMNBB437``, quel que soit son contenu : une ligne ``DSNIN=`` placée là
+    ne change pas la loadlib et ne doit pas ouvrir de section. Une ligne
+    ``</vlm>`` ainsi consommée ne consomme pas la suivante : seule la parité
+    de la suite de lignes ``</vlm>`` qui précède compte.
+    """
+    newline = "\n".encode(encoding)
+    closing = 0
+    while line_start > 0:
+        prev_start = data.rfind(newline, 0, line_start - 1) + 1
+        prev_line = strip_asa_char(
+            data[prev_start : line_start - 1].decode(encoding)
+        )
+        if not prev_line.startswith("</vlm>"):
+            break
+        closing += 1
+        line_start = prev_start
+    return closing % 2 == 1
+
+
+def group_sections(
+    sections: list[tuple[int, int]], min_size: int
+) -> list[tuple[int, int]]:
+    """Regroupe des sections contiguës en plages d'au moins ``min_size`` octets.
+
+    Utilisé en mode séquentiel : une plage par point de reprise plutôt
+    qu'une par loadlib, ce qui garde de gros blocs au moteur octets.
+    """
+    groups: list[tuple[int, int]] = []
+    for start, end in sections:
+        if groups and groups[-1][1] - groups[-1][0] < min_size:
+            groups[-1] = (groups[-1][0], end)
+        else:
+            groups.append((start, end))
+    return groups
+
+
+def _clean_section(
+    input_path: Path, start: int, end: int, encoding: str, engine: str
+) -> tuple[bytes, str]:
+    """Nettoie une section du rapport et retourne le fragment XML (UTF-8).
+
+    Exécutée dans un processus du pool ou en séquentiel : la section est
+    relue depuis le fichier (seuls les offsets transitent entre processus).
+    Le moteur texte la décode avec les mêmes règles de fin de ligne qu'une
+    lecture en mode texte.
+
+    Returns:
+        ``(fragment_xml, loadlib)`` — loadlib active en fin de section.
+
+    """
+    if engine == "bytes":
+        f_bin = io.BytesIO()
+        # Syntaxe "with (...) as ..., ... as ...:" (Python 3.10+) :
+        # ouvre le fichier et sa projection mémoire et garantit leur
+        # fermeture automatique même en cas d'exception.
+        with (
+            input_path.open("rb") as f_raw,
+            mmap.mmap(f_raw.fileno(), 0, access=mmap.ACCESS_READ) as data,
+        ):
+            loadlib = clean_range(data, start, end, f_bin, encoding)
+        return f_bin.getvalue(), loadlib
+
+    with input_path.open("rb") as f_raw:
+        f_raw.seek(start)
+        raw = f_raw.read(end - start)
+    return _clean_chunk(raw, encoding, engine, "")
+
+
+def _clean_chunk(
+    raw: bytes, encoding: str, engine: str, current_loadlib: str
+) -> tuple[bytes, str]:
+    """Nettoie un bloc brut en mémoire (voir :func:`iter_stream_blocks`).
+
+    Returns:
+        ``(fragment_xml, loadlib)`` — loadlib active en fin de bloc.
+
+    """
+    if engine == "bytes":
+        f_bin = io.BytesIO()
+        loadlib = clean_block(raw, f_bin, encoding, current_loadlib)
+        return f_bin.getvalue(), loadlib
+
+    f_out = io.StringIO()
+    with io.TextIOWrapper(io.BytesIO(raw), encoding=encoding) as f_in:
+        loadlib = clean_lines(f_in, f_out, current_loadlib)
+    return f_out.getvalue().encode("utf-8"), loadlib
+
+
+def _iter_fragments(
+    input_path: Path,
+    sections: list[tuple[int, int]],
+    encoding: str,
+    engine: str,
+    workers: int,
+    group_size: int = _CHECKPOINT_EVERY,
+) -> Iterator[tuple[int, bytes, str]]:
+    """Nettoie les sections et restitue leurs fragments dans l'ordre d'origine.
+
+    Avec ``workers > 1``, une section ``DSNIN=`` par tâche du pool ; sinon
+    les sections sont regroupées par :func:`group_sections` (plages d'au
+    moins ``group_size`` octets, ``0`` = une par section) et nettoyées
+    dans le processus courant.
+
+    Yields:
+        ``(offset_fin, fragment_xml, loadlib)`` pour chaque plage nettoyée.
+
+    """
+    if workers <= 1 or len(sections) <= 1:
+        for start, end in group_sections(sections, group_size):
+            yield end, *_clean_section(input_path, start, end, encoding, engine)
+        return
+
+    nb_sections = len(sections)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() restitue les fragments dans l'ordre de soumission,
+        # quel que soit l'ordre de fin des processus.
+        results = pool.map(
+            _clean_section,
+            [input_path] * nb_sections,
+            [start for start, _ in sections],
+            [end for _, end in sections],
+            [encoding] * nb_sections,
+            [engine] * nb_sections,
+            chunksize=max(1, nb_sections // (workers * 4)),
+        )
+        for (_, end), (fragment, loadlib) in zip(
+            sections, results, strict=True
+        ):
+            yield end, fragment, loadlib
+
+
+def _iter_stream_fragments(
+    input_path: Path,
+    encoding: str,
+    engine: str,
+    checkpoint: Checkpoint,
+    input_format: str = "text",
+) -> Iterator[tuple[int, bytes, str]]:
+    """Nettoie un rapport en flux, bloc par bloc, sans parallélisme.
+
+    Cas d'un rapport compressé ou d'un transfert binaire RECFM=VBA, qui ne
+    permettent pas l'accès direct aux sections. Les offsets portent sur le
+    flux lu (décompressé, et converti en UTF-8 pour ``vba``) : la reprise
+    saute ``checkpoint.input_offset`` octets de ce flux et repart de la
+    loadlib enregistrée.
+
+    Yields:
+        ``(offset_fin, fragment_xml, loadlib)`` pour chaque bloc nettoyé.
+
+    """
+    offset = checkpoint.input_offset
+    loadlib = checkpoint.loadlib
+    with open_binary(input_path, "rb") as f_in:
+        chunks: Iterable[bytes]
+        if input_format == "vba":
+            chunks = _skip_bytes(iter_rdw_chunks(f_in, encoding), offset)
+            encoding = "utf-8"
+        else:
+            f_in.seek(offset)
+            chunks = iter(partial(f_in.read, _BLOCK_SIZE), b"")
+        for block in iter_stream_blocks(chunks):
+            offset += len(block)
+            fragment, loadlib = _clean_chunk(block, encoding, engine, loadlib)
+            yield offset, fragment, loadlib
+
+
+# -------------------------------------------------------------------------------------
+# Points de reprise
+# -------------------------------------------------------------------------------------
+
+
+@dataclass
+class Checkpoint:
+    """Point de reprise posé après une section, donc sur une frontière ``</vlm>``.
+
+    Attributs:
+        input_path: Rapport VLM brut traité (chemin absolu).
+        input_size: Taille du rapport, pour détecter une modification.
+        input_mtime_ns: Date de modification du rapport (nanosecondes).
+        encoding: Encodage du rapport.
+        input_offset: Offset du rapport où reprendre (début de section) ;
+            offset du flux décompressé ou converti pour une lecture en flux.
+        output_offset: Taille du XML de sortie valide à cet instant.
+        loadlib: Dernière loadlib nettoyée.
+        input_format: Format du rapport, ``text`` ou ``vba``.
+    """
+
+    input_path: str
+    input_size: int
+    input_mtime_ns: int
+    encoding: str
+    input_offset: int = 0
+    output_offset: int = 0
+    loadlib: str = ""
+    input_format: str = "text"
+
+
+def checkpoint_path(output_path: Path) -> Path:
+    """Chemin du fichier de points de reprise associé à une sortie XML."""
+    return output_path.with_name(output_path.name + _CHECKPOINT_SUFFIX)
+
+
+def new_checkpoint(
+    input_path: Path, encoding: str, input_format: str = "text"
+) -> Checkpoint:
+    """Crée un point de reprise vierge signé par l'état du rapport d'entrée."""
+    stat = input_path.stat()
+    return Checkpoint(
+        input_path=str(input_path.resolve()),
+        input_size=stat.st_size,
+        input_mtime_ns=stat.st_mtime_ns,
+        encoding=encoding,
+        input_format=input_format,
+    )
+
+
+def save_checkpoint(path: Path, checkpoint: Checkpoint) -> None:
+    """Enregistre le point de reprise de façon atomique (fichier temporaire).
+
+    ``Path.replace`` (renommage atomique) garantit qu'une interruption pendant l'écriture laisse
+    intact le point de reprise précédent.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(asdict(checkpoint)), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def load_checkpoint(
+    path: Path, expected: Checkpoint, output_path: Path
+) -> Checkpoint | None:
+    """Relit un point de reprise et vérifie qu'il s'applique à ce traitement.
+
+    Args:
+        path: Fichier de points de reprise.
+        expected: Point de reprise vierge du traitement courant
+            (voir :func:`new_checkpoint`).
+        output_path: Fichier XML de sortie à compléter.
+
+    Returns:
+        Le point de reprise, ou ``None`` s'il est absent, illisible, s'il
+        porte sur un autre rapport (chemin, taille, date, encodage, format)
+        ou si la sortie est plus courte que l'offset enregistré.
+
+    """
+    if not path.is_file():
+        LOGGER.info("Aucun point de reprise : traitement complet.")
+        return None
+    try:
+        checkpoint = Checkpoint(**json.loads(path.read_text(encoding="utf-8")))
+    except (ValueError, TypeError) as exc:
+        LOGGER.warning("Point de reprise illisible (%s) : ignoré.", exc)
+        return None
+
+    signature = (
+        checkpoint.input_path,
+        checkpoint.input_size,
+        checkpoint.input_mtime_ns,
+        checkpoint.encoding,
+        checkpoint.input_format,
+    )
+    if signature != (
+        expected.input_path,
+        expected.input_size,
+        expected.input_mtime_ns,
+        expected.encoding,
+        expected.input_format,
+    ):
+        LOGGER.warning(
+            "Point de reprise établi pour un autre rapport ou encodage : ignoré."
+        )
+        return None
+    if (
+        not output_path.is_file()
+        or output_path.stat().st_size < checkpoint.output_offset
+    ):
+        LOGGER.warning(
+            "Sortie absente ou tronquée sous le point de reprise : ignoré."
+        )
+        return None
+    return checkpoint
+
+
+def _open_output(output_path: Path, checkpoint: Checkpoint) -> IO[bytes]:
+    """Ouvre la sortie XML, tronquée au point de reprise s'il y en a un.
+
+    Sans reprise (``output_offset == 0``), le fichier est recréé et
+    l'en-tête XML écrit. Une sortie compressée est rouverte en ajout : le
+    nouveau flux compressé se concatène aux flux déjà terminés.
+    """
+    if checkpoint.output_offset == 0:
+        f_out: IO[bytes] = open_binary(output_path, "wb")
+        f_out.write(_XML_HEADER)
+        return f_out
+
+    os.truncate(output_path, checkpoint.output_offset)
+    f_append: IO[bytes] = open_binary(output_path, "ab")
+    return f_append
+
+
+def _write_fragments(
+    output_path: Path,
+    checkpoint: Checkpoint,
+    fragments: Iterator[tuple[int, bytes, str]],
+) -> None:
+    """Écrit les fragments XML et enregistre les points de reprise.
+
+    À chaque point de reprise, la sortie est fermée puis rouverte en
+    ajout : pour un fichier compressé, cela termine le flux en cours, si
+    bien que le fichier reste décompressible jusqu'à l'offset enregistré.
+    """
+    ckpt_path = checkpoint_path(output_path)
+    f_out = _open_output(output_path, checkpoint)
+    try:
+        pending = 0
+        for end, fragment, loadlib in fragments:
+            f_out.write(fragment)
+            pending += end - checkpoint.input_offset
+            checkpoint.input_offset = end
+            checkpoint.loadlib = loadlib or checkpoint.loadlib
+            if pending >= _CHECKPOINT_EVERY:
+                f_out.close()
+                checkpoint.output_offset = output_path.stat().st_size
+                save_checkpoint(ckpt_path, checkpoint)
+                f_out = open_binary(output_path, "ab")
+                pending = 0
+
+        f_out.write(_XML_FOOTER)
+    finally:
+        f_out.close()
+
+
+def _resolve_engine(engine: str, encoding: str, input_format: str) -> str:
+    """Retourne le moteur effectif : texte si l'encodage n'est pas ASCII.
+
+    Un rapport ``vba`` est converti en UTF-8 avant nettoyage : le moteur
+    ``bytes`` reste alors utilisable quelle que soit la page de code.
+    """
+    if (
+        engine == "bytes"
+        and input_format != "vba"
+        and not is_ascii_compatible(encoding)
+    ):
+        LOGGER.info(
+            "Encodage %s non compatible ASCII : moteur texte utilisé.", encoding
+        )
+        return "text"
+    return engine
+
+
+def _select_fragments(
+    input_path: Path,
+    encoding: str,
+    engine: str,
+    workers: int,
+    checkpoint: Checkpoint,
+    group_size: int = _CHECKPOINT_EVERY,
+) -> Iterator[tuple[int, bytes, str]]:
+    """Choisit le découpage du rapport : sections ``DSNIN=`` ou flux.
+
+    Un rapport compressé ou RECFM=VBA est lu en flux, séquentiellement ;
+    sinon les sections sont nettoyées à partir de ``checkpoint.input_offset``,
+    en parallèle si ``workers > 1`` (``group_size`` : voir
+    :func:`_iter_fragments`).
+    """
+    compression = detect_compression(input_path)
+    if compression is not None or checkpoint.input_format == "vba":
+        LOGGER.info(
+            "Entrée %s%s : nettoyage séquentiel en flux.",
+            "RECFM=VBA" if checkpoint.input_format == "vba" else "texte",
+            f" compressée ({compression})" if compression else "",
+        )
+        return _iter_stream_fragments(
+            input_path, encoding, engine, checkpoint, checkpoint.input_format
+        )
+    sections = find_sections(input_path, encoding, checkpoint.input_offset)
+    if workers > 1:
+        LOGGER.info(
+            "Nettoyage parallèle : %d section(s) DSNIN, %d processus.",
+            len(sections),
+            workers,
+        )
+    return _iter_fragments(
+        input_path, sections, encoding, engine, workers, group_size
+    )
+
+
+def iter_clean_xml(
+    input_path: Path,
+    encoding: str,
+    *,
+    workers: int = 1,
+    engine: str = "bytes",
+    input_format: str = "text",
+) -> Iterator[bytes]:
+    """Produit le XML nettoyé par morceaux, sans écrire de fichier.
+
+    Mêmes règles et même contenu que :func:`convert_report` (en-tête,
+    fragments, ``</root>``), pour les consommateurs en flux comme
+    ``report_to_json.py``. Pas de point de reprise dans ce mode : les
+    sections ne sont pas regroupées, un fragment ne dépasse donc pas une
+    section ``DSNIN=`` (ou un bloc de lecture en flux).
+
+    Args:
+        input_path: Rapport VLM brut (encodage mainframe).
+        encoding: Encodage du fichier source, ex : ``iso8859-1``.
+        workers: Nombre de processus de nettoyage (1 = séquentiel).
+        engine: Moteur de nettoyage, ``bytes`` ou ``text``.
+        input_format: ``text`` (lignes) ou ``vba`` (enregistrements RDW).
+
+    Yields:
+        Morceaux successifs du XML UTF-8.
+
+    Raises:
+        RecordFormatError: Si un enregistrement RDW est invalide.
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    engine = _resolve_engine(engine, encoding, input_format)
+    checkpoint = new_checkpoint(input_path, encoding, input_format)
+    yield _XML_HEADER
+    for _end, fragment, _loadlib in _select_fragments(
+        input_path, encoding, engine, workers, checkpoint, group_size=0
+    ):
+        yield fragment
+    yield _XML_FOOTER
+
+
+def convert_report(
+    input_path: Path,
+    output_path: Path,
+    encoding: str,
+    *,
+    workers: int = 1,
+    engine: str = "bytes",
+    resume: bool = False,
+    input_format: str = "text",
+) -> None:
     """Convertit le rapport VLM brut en XML propre.
 
-    Lit le rapport ligne par ligne, élimine le bruit, injecte les attributs
-    ``loadlib`` et ``memberCount`` dans les balises ``<vlm>``, et écrit
-    un XML UTF-8 bien formé encapsulé dans ``<root>``.
+    Élimine le bruit, injecte les attributs ``loadlib`` et ``memberCount``
+    dans les balises ``<vlm>``, et écrit un XML UTF-8 bien formé encapsulé
+    dans ``<root>``.
+
+    Le moteur ``bytes`` (défaut) projette le rapport en mémoire et le
+    nettoie par gros blocs de lignes entières (:func:`clean_block`) : seules
+    les lignes candidates sont décodées et classées, les autres sont
+    recopiées en octets. Le moteur ``text`` (:func:`clean_lines`) lit le
+    rapport ligne par ligne et produit le même XML ; il prend le relais si
+    l'encodage n'est pas compatible ASCII.
+
+    Le rapport est découpé par :func:`find_sections` ; avec ``workers > 1``,
+    chaque section est nettoyée dans un processus distinct et les fragments
+    sont écrits dans l'ordre d'origine : la sortie est identique au mode
+    séquentiel.
+
+    Un rapport ou une sortie compressés (gzip, bz2, xz — voir
+    :func:`utils.open_binary`) sont traités en flux ; une entrée
+    compressée est nettoyée séquentiellement, sans découpage en sections.
+
+    Avec ``input_format="vba"``, le rapport est un transfert binaire des
+    enregistrements RECFM=VBA (préfixes RDW) dans la page de code EBCDIC
+    ``encoding`` : il est converti en bloc par :func:`iter_rdw_chunks`,
+    sans conversion préalable côté z/OS.
+
+    Tous les ``_CHECKPOINT_EVERY`` octets d'entrée environ, un point de
+    reprise (:class:`Checkpoint`) est enregistré à côté de la sortie, après
+    la fin d'une section. Avec ``resume``, la sortie est tronquée au
+    dernier point de reprise et le traitement repart de là. Le fichier de
+    reprise est supprimé en fin de traitement réussi.
 
     Args:
         input_path: Rapport VLM brut (encodage mainframe).
         output_path: Fichier XML de sortie (UTF-8).
         encoding: Encodage du fichier source, ex : ``iso8859-1``.
+        workers: Nombre de processus de nettoyage (1 = séquentiel).
+        engine: Moteur de nettoyage, ``bytes`` ou ``text``.
+        resume: Reprendre au dernier point de reprise s'il est valide.
+        input_format: ``text`` (lignes) ou ``vba`` (enregistrements RDW).
 
     Raises:
+        RecordFormatError: Si un enregistrement RDW est invalide.
         SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
 
     """
     LOGGER.info("Début du traitement : %s → %s", input_path, output_path)
-    current_loadlib = ""
 
-    # Syntaxe "with (...) as ..., ... as ...:" (Python 3.10+) :
-    # ouvre les deux fichiers simultanément et garantit leur fermeture
-    # automatique même en cas d'exception, sans avoir à écrire try/finally.
-    with (
-        input_path.open("r", encoding=encoding) as f_in,
-        output_path.open("w", encoding="utf-8") as f_out,
-    ):
-        f_out.write('<?xml version="1.0" encoding="UTF-8"?>\n<root>\n')
-
-        for line in f_in:
-            line_str = strip_asa_char(line)
-
-            if is_noise_line(line_str):
-                continue
-
-            dsn_match = _RE_DSN.search(line_str)
-            if dsn_match:
-                current_loadlib = dsn_match.group(1).rstrip(",")
-                LOGGER.debug("Loadlib détectée : %s", current_loadlib)
-                continue
-
-            error_match = _RE_ERROR.search(line_str)
-            if error_match:
-                LOGGER.error(
-                    "Erreur métier FMNBF427 : %s", error_match.group(1)
-                )
-                sys.exit(1)
-
-            if _RE_EMPTY.search(line_str):
-                LOGGER.debug(
-                    "Bibliothèque vide : %s (memberCount=0)", current_loadlib
-                )
-                f_out.write(f'<vlm loadlib="{current_loadlib}">\n')
-                f_out.write('  <memberCount value="0"/>\n')
-                f_out.write("</vlm>\n")
-                continue
-
-            if line_str.startswith("<vlm>"):
-                f_out.write(f'<vlm loadlib="{current_loadlib}">\n')
-            else:
-                if line_str.startswith("</vlm>"):
-                    member_count = read_member_count(f_in)
-                    f_out.write(f'<memberCount value="{member_count}"/>')
-                f_out.write(line_str + "\n")
-
-        f_out.write("</root>")
+    engine = _resolve_engine(engine, encoding, input_format)
+    ckpt_path = checkpoint_path(output_path)
+    checkpoint = new_checkpoint(input_path, encoding, input_format)
+    resumed = (
+        load_checkpoint(ckpt_path, checkpoint, output_path) if resume else None
+    )
+    if resumed is not None:
+        checkpoint = resumed
+        LOGGER.info(
+            "Reprise à l'octet %d du rapport (après la loadlib %s).",
+            checkpoint.input_offset,
+            checkpoint.loadlib,
+        )
 
+    fragments = _select_fragments(
+        input_path, encoding, engine, workers, checkpoint
+    )
+    _write_fragments(output_path, checkpoint, fragments)
+    ckpt_path.unlink(missing_ok=True)
     LOGGER.info("XML écrit avec succès : %s", output_path)
 
 
+# -------------------------------------------------------------------------------------
+# Sortie par loadlib
+# -------------------------------------------------------------------------------------
+
+
+@dataclass
+class Shard:
+    """Fichier XML autonome produit pour une loadlib (mode ``--shard-dir``).
+
+    Attributs:
+        loadlib: Nom de la loadlib (valeur ``DSNIN=``).
+        file: Nom du fichier dans le répertoire de sortie.
+        member_count: Somme des ``memberCount`` de ses blocs ``<vlm>``.
+        size: Taille du fichier, en octets.
+        sha256: Empreinte du contenu, pour repérer les fichiers modifiés.
+    """
+
+    loadlib: str
+    file: str
+    member_count: int = 0
+    size: int = 0
+    sha256: str = ""
+
+
+def _write_shard(shard_dir: Path, shard: Shard, fragment: bytes) -> None:
+    """Crée le fichier d'une loadlib, ou le complète si elle réapparaît.
+
+    Une loadlib peut figurer dans plusieurs sections du rapport : le
+    fragment est alors inséré avant la balise ``</root>`` finale. Taille,
+    empreinte et compte de membres de ``shard`` sont mis à jour.
+    """
+    path = shard_dir / shard.file
+    if shard.size == 0:
+        content = _XML_HEADER + fragment + _XML_FOOTER
+    else:
+        body = path.read_bytes()[: -len(_XML_FOOTER)]
+        content = body + fragment + _XML_FOOTER
+    path.write_bytes(content)
+    shard.size = len(content)
+    shard.sha256 = sha256(content).hexdigest()
+    shard.member_count += sum(
+        int(count) for count in _RE_MEMBER_COUNT_B.findall(fragment)
+    )
+
+
+def write_manifest(shard_dir: Path, source: Path, shards: list[Shard]) -> Path:
+    """Écrit le manifeste JSON des fichiers par loadlib.
+
+    Args:
+        shard_dir: Répertoire des fichiers par loadlib.
+        source: Rapport VLM brut d'origine.
+        shards: Fichiers produits, dans l'ordre du rapport.
+
+    Returns:
+        Chemin du manifeste.
+
+    """
+    manifest = {
+        "source": str(source),
+        "loadlibs": len(shards),
+        "member_count": sum(shard.member_count for shard in shards),
+        "shards": [asdict(shard) for shard in shards],
+    }
+    path = shard_dir / MANIFEST_NAME
+    with path.open("w", encoding="utf-8") as f_out:
+        json.dump(manifest, f_out, indent=2, ensure_ascii=False)
+    return path
+
+
+def convert_report_shards(
+    input_path: Path,
+    shard_dir: Path,
+    encoding: str,
+    *,
+    workers: int = 1,
+    engine: str = "bytes",
+    input_format: str = "text",
+) -> list[Shard]:
+    """Nettoie le rapport en un XML bien formé par loadlib.
+
+    Chaque section ``DSNIN=`` (:func:`find_sections`) est nettoyée comme
+    par :func:`convert_report` ; son fragment est écrit dans
+    ``<shard_dir>/<loadlib>.xml``, encapsulé dans ``<root>``. Le
+    manifeste :data:`MANIFEST_NAME` récapitule les fichiers produits.
+    Les fichiers d'une exécution précédente absents du manifeste ne sont
+    pas supprimés.
+
+    Args:
+        input_path: Rapport VLM brut, non compressé (accès direct requis).
+        shard_dir: Répertoire de sortie, créé si besoin.
+        encoding: Encodage du fichier source, ex : ``iso8859-1``.
+        workers: Nombre de processus de nettoyage (1 = séquentiel).
+        engine: Moteur de nettoyage, ``bytes`` ou ``text``.
+        input_format: Format du rapport ; seul ``text`` est accepté.
+
+    Returns:
+        Fichiers produits, dans l'ordre du rapport.
+
+    Raises:
+        ValueError: Si le rapport est compressé ou au format ``vba``.
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    LOGGER.info("Début du traitement : %s → %s/", input_path, shard_dir)
+
+    if detect_compression(input_path) is not None or input_format != "text":
+        raise ValueError(
+            f"Rapport '{input_path}' compressé ou RECFM=VBA : --shard-dir "
+            "requiert un fichier texte non compressé."
+        )
+    if engine == "bytes" and not is_ascii_compatible(encoding):
+        engine = "text"
+
+    sections = find_sections(input_path, encoding)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    shards: dict[str, Shard] = {}
+    for _, fragment, loadlib in _iter_fragments(
+        input_path, sections, encoding, engine, workers, group_size=0
+    ):
+        if not fragment:
+            continue
+        name = loadlib or _NO_LOADLIB_SHARD
+        shard = shards.setdefault(name, Shard(loadlib, f"{name}.xml"))
+        _write_shard(shard_dir, shard, fragment)
+
+    manifest = write_manifest(shard_dir, input_path, list(shards.values()))
+    LOGGER.info(
+        "%d fichier(s) par loadlib écrit(s), manifeste : %s",
+        len(shards),
+        manifest,
+    )
+    return list(shards.values())
+
+
 # -------------------------------------------------------------------------------------
 # Point d'entrée CLI
 # -------------------------------------------------------------------------------------
@@ -277,7 +1510,8 @@ def parse_args() -> argparse.Namespace:
     """Lit et valide les arguments de ligne de commande.
 
     Returns:
-        Namespace contenant ``file``, ``output`` et ``encoding``.
+        Namespace contenant ``file``, ``output``, ``encoding``, ``workers``,
+        ``engine``, ``input_format``, ``shard_dir`` et ``resume``.
 
     """
     parser = argparse.ArgumentParser(
@@ -301,7 +1535,55 @@ def parse_args() -> argparse.Namespace:
         default="iso8859-1",
         help="Encodage du fichier source (défaut : iso8859-1)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Nombre de processus de nettoyage, une section DSNIN par tâche "
+            "(défaut : 1 = séquentiel, 0 = un par cœur)"
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        default="bytes",
+        choices=ENGINES,
+        help=(
+            "Moteur de nettoyage : bytes = classement direct des octets, "
+            "text = lecture ligne à ligne en str (défaut : bytes)"
+        ),
+    )
+    parser.add_argument(
+        "--input-format",
+        default="text",
+        choices=INPUT_FORMATS,
+        help=(
+            "Format du rapport : text = transfert en mode texte, vba = "
+            "transfert binaire RECFM=VBA avec RDW, décodé selon -e "
+            "(ex : -e cp1147) (défaut : text)"
+        ),
+    )
+    parser.add_argument(
+        "--shard-dir",
+        default=None,
+        help=(
+            "Écrire un XML par loadlib (nommé d'après DSNIN) et un "
+            f"{MANIFEST_NAME} dans ce répertoire, au lieu de --output"
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Reprendre au dernier point de reprise (fichier <sortie>.ckpt) "
+            "au lieu de repartir du début"
+        ),
+    )
+    args = parser.parse_args()
+    if args.resume and args.shard_dir:
+        parser.error("--resume n'est pas disponible avec --shard-dir")
+    return args
 
 
 def main() -> None:
@@ -310,8 +1592,11 @@ def main() -> None:
     Raises:
         SystemExit:
             - Code 1  : erreur métier FMNBF427 dans le rapport (détectée dans convert_report).
-            - Code 2  : répertoire de sortie invalide ou non accessible en écriture.
-            - Code 10 : fichier introuvable ou erreur I/O inattendue.
+            - Code 2  : répertoire de sortie invalide ou non accessible en écriture,
+              ou rapport compressé ou RECFM=VBA avec ``--shard-dir``.
+            - Code 3  : enregistrement RECFM=VBA invalide (RDW).
+            - Code 10 : fichier introuvable, erreur I/O inattendue ou fichier
+              compressé corrompu.
 
     """
     args = parse_args()
@@ -324,17 +1609,44 @@ def main() -> None:
 
     try:
         validate_input_file(input_path)
-        validate_output_dir(output_path)
-        convert_report(input_path, output_path, args.encoding)
+        if args.shard_dir:
+            shard_dir = Path(args.shard_dir)
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            validate_output_dir(shard_dir / MANIFEST_NAME)
+            convert_report_shards(
+                input_path,
+                shard_dir,
+                args.encoding,
+                workers=resolve_workers(args.workers),
+                engine=args.engine,
+                input_format=args.input_format,
+            )
+        else:
+            validate_output_dir(output_path)
+            convert_report(
+                input_path,
+                output_path,
+                args.encoding,
+                workers=resolve_workers(args.workers),
+                engine=args.engine,
+                resume=args.resume,
+                input_format=args.input_format,
+            )
     except FileNotFoundError as exc:
         LOGGER.error("%s", exc)
         sys.exit(10)
-    except (NotADirectoryError, PermissionError) as exc:
+    except RecordFormatError as exc:
+        LOGGER.error("Rapport RECFM=VBA illisible : %s", exc)
+        sys.exit(3)
+    except (NotADirectoryError, PermissionError, ValueError) as exc:
         LOGGER.error("%s", exc)
         sys.exit(2)
     except OSError as exc:
         LOGGER.error("Erreur E/S : %s", exc)
         sys.exit(10)
+    except COMPRESSION_ERRORS as exc:
+        LOGGER.error("Fichier compressé illisible : %s", exc)
+        sys.exit(10)
 
 
 if __name__ == "__main__":
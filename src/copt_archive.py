@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+
+"""Archive dédupliquée des fichiers détail d'``extract_copt.py``.
+
+``extract_copt.py`` écrit un fichier ``<load>_<csect>_<compilateur>.txt`` par
+CSECT, alors que la plupart portent la même liste d'options : des centaines
+de milliers d'inodes pour quelques milliers de contenus distincts. Avec
+``--archive``, ces fichiers sont remplacés par une archive zip :
+
+- ``blobs/<sha256>`` : chaque contenu distinct, une seule fois, nommé par
+  l'empreinte SHA-256 de ses octets ;
+- ``manifest.jsonl`` : une ligne ``{"path", "blob"}`` par fichier détail,
+  ``path`` relatif au répertoire du CSV (``loadlibs/<loadlib>/<fichier>``).
+
+L'archive est écrite au fil de l'eau : un contenu est ajouté dès sa première
+apparition, le manifeste est accumulé dans un fichier temporaire puis ajouté
+en dernier. Les dates des entrées sont fixes : deux extractions identiques
+produisent la même archive, octet pour octet.
+
+La commande ``extract`` restaure l'arborescence habituelle à la demande,
+``list`` affiche le manifeste.
+
+Usage :
+    python copt_archive.py extract -a datas/copt/copt.zip -o datas/copt
+    python copt_archive.py extract -a datas/copt/copt.zip -o /tmp/copt -l MY.LOAD.LIB
+    python copt_archive.py list -a datas/copt/copt.zip
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from collections.abc import Iterator, Sequence
+from hashlib import sha256
+from pathlib import Path, PurePosixPath
+from types import TracebackType
+
+from utils import load_config, setup_logging
+
+LOGGER = logging.getLogger("copt_archive")
+
+# Signature portée par le commentaire de l'archive.
+ARCHIVE_FORMAT = "vlm-copt-archive"
+ARCHIVE_VERSION = 1
+
+MANIFEST_NAME = "manifest.jsonl"
+BLOB_DIR = "blobs"
+
+# Date fixe des entrées (la plus ancienne permise par le format zip).
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+
+def _zip_info(name: str) -> zipfile.ZipInfo:
+    """Retourne l'en-tête d'une entrée compressée, à date fixe."""
+    info = zipfile.ZipInfo(name, date_time=_ZIP_DATE)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+class CoptArchiveWriter:
+    """Écriture des fichiers détail dans une archive dédupliquée.
+
+    Même interface que ``extract_copt.CoptFileWriter`` : ``write_csv()``
+    utilise l'une ou l'autre. L'écriture est séquentielle (une archive zip
+    s'écrit entrée par entrée).
+
+    Attributs:
+        path: Chemin de l'archive.
+        count: Nombre de fichiers détail archivés.
+        blobs: Nombre de contenus distincts.
+    """
+
+    __slots__ = (
+        "_depth",
+        "_digests",
+        "_manifest",
+        "_start",
+        "_zip",
+        "count",
+        "path",
+    )
+
+    def __init__(self, path: Path, base_dir: Path) -> None:
+        """Crée l'archive ``path``.
+
+        Args:
+            path: Chemin de l'archive à créer (écrasée si elle existe).
+            base_dir: Répertoire auquel les chemins du manifeste sont
+                relatifs (celui du CSV).
+
+        Raises:
+            OSError: Si l'archive ne peut pas être créée.
+
+        """
+        self.path = path
+        self.count = 0
+        # Les chemins du manifeste sont ceux des fichiers, privés des
+        # composants de base_dir (Path.relative_to est lent sur 3.12).
+        self._depth = len(base_dir.parts)
+        self._digests: set[str] = set()
+        # Fermés par close() ou __exit__() : ils vivent autant que l'écrivain.
+        self._manifest = tempfile.TemporaryFile()  # noqa: SIM115
+        self._zip = zipfile.ZipFile(path, "w")
+        self._start = time.perf_counter()
+
+    def __enter__(self) -> CoptArchiveWriter:
+        """Retourne l'écrivain lui-même."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Termine l'archive, ou la referme telle quelle en cas d'erreur."""
+        if exc_type is None:
+            self.close()
+        else:
+            self._manifest.close()
+            self._zip.close()
+
+    @property
+    def blobs(self) -> int:
+        """Retourne le nombre de contenus distincts archivés."""
+        return len(self._digests)
+
+    def write(self, output_file: Path, compiler_options: Sequence[str]) -> None:
+        """Archive le fichier détail ``output_file``.
+
+        Le contenu n'est ajouté qu'à sa première apparition ; le manifeste
+        reçoit une ligne dans tous les cas.
+
+        Raises:
+            OSError: Si l'écriture dans l'archive échoue.
+
+        """
+        content = "".join(f"{option}\n" for option in compiler_options)
+        data = content.encode("utf-8")
+        digest = sha256(data).hexdigest()
+        if digest not in self._digests:
+            self._zip.writestr(_zip_info(f"{BLOB_DIR}/{digest}"), data)
+            self._digests.add(digest)
+        entry = {
+            "path": "/".join(output_file.parts[self._depth :]),
+            "blob": digest,
+        }
+        self._manifest.write(
+            json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n"
+        )
+        self.count += 1
+
+    def close(self) -> None:
+        """Ajoute le manifeste et ferme l'archive.
+
+        Raises:
+            OSError: Si l'écriture dans l'archive échoue.
+
+        """
+        try:
+            self._manifest.seek(0)
+            with self._zip.open(_zip_info(MANIFEST_NAME), "w") as f_out:
+                shutil.copyfileobj(self._manifest, f_out)
+            self._zip.comment = f"{ARCHIVE_FORMAT} {ARCHIVE_VERSION}".encode()
+        finally:
+            self._manifest.close()
+            self._zip.close()
+
+    def summary(self) -> str:
+        """Retourne le bilan de l'écriture pour le journal."""
+        elapsed = time.perf_counter() - self._start
+        return (
+            f"{self.count} fichier(s) détail archivé(s) dans '{self.path}' : "
+            f"{self.blobs} contenu(s) distinct(s), en {elapsed:.2f} s "
+            f"({self.count / elapsed if elapsed else 0.0:.0f} fichiers/s)."
+        )
+
+
+def open_archive(path: Path) -> zipfile.ZipFile:
+    """Ouvre l'archive ``path`` en lecture après contrôle de sa signature.
+
+    Raises:
+        OSError: Si le fichier est illisible.
+        ValueError: Si ce n'est pas une archive d'options COPT.
+
+    """
+    try:
+        archive = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as exc:
+        raise ValueError(
+            f"'{path}' n'est pas une archive zip : {exc}"
+        ) from None
+    signature = archive.comment.decode("ascii", "replace").split()
+    if signature[:1] != [ARCHIVE_FORMAT] or MANIFEST_NAME not in (
+        archive.namelist()
+    ):
+        archive.close()
+        raise ValueError(f"'{path}' n'est pas une archive d'options COPT")
+    return archive
+
+
+def _check_path(name: str) -> PurePosixPath:
+    """Retourne le chemin ``name`` du manifeste, s'il reste relatif.
+
+    Raises:
+        ValueError: Si le chemin est absolu ou remonte d'un niveau (``..``).
+
+    """
+    path = PurePosixPath(name)
+    if path.is_absolute() or ".." in path.parts or not path.parts:
+        raise ValueError(f"chemin invalide dans le manifeste : {name!r}")
+    return path
+
+
+def iter_manifest(
+    archive: zipfile.ZipFile, loadlib: str | None = None
+) -> Iterator[tuple[PurePosixPath, str]]:
+    """Parcourt le manifeste de l'archive, dans l'ordre d'écriture.
+
+    Args:
+        archive: Archive ouverte par :func:`open_archive`.
+        loadlib: Si renseigné, seuls les fichiers de cette loadlib.
+
+    Yields:
+        ``(chemin relatif, empreinte du contenu)`` de chaque fichier détail.
+
+    Raises:
+        ValueError: Si une ligne du manifeste est invalide.
+
+    """
+    with (
+        archive.open(MANIFEST_NAME) as raw,
+        io.TextIOWrapper(raw, encoding="utf-8") as lines,
+    ):
+        for number, line in enumerate(lines, start=1):
+            try:
+                entry = json.loads(line)
+                path = _check_path(entry["path"])
+                digest = entry["blob"]
+            except (json.JSONDecodeError, KeyError, TypeError) as exc:
+                raise ValueError(
+                    f"ligne {number} du manifeste invalide : {exc}"
+                ) from None
+            if loadlib is None or path.parts[1:2] == (loadlib,):
+                yield path, digest
+
+
+def extract_archive(
+    archive_path: Path, output_dir: Path, loadlib: str | None = None
+) -> int:
+    """Restaure les fichiers détail de l'archive sous ``output_dir``.
+
+    L'arborescence est celle d'``extract_copt.py`` sans ``--archive`` :
+    ``<output_dir>/loadlibs/<loadlib>/<fichier>.txt``. Chaque répertoire
+    n'est créé qu'une fois ; un fichier existant est écrasé.
+
+    Args:
+        archive_path: Archive écrite par ``extract_copt.py --archive``.
+        output_dir: Répertoire de destination (celui du CSV d'origine).
+        loadlib: Si renseigné, seuls les fichiers de cette loadlib.
+
+    Returns:
+        Nombre de fichiers restaurés.
+
+    Raises:
+        OSError: En cas d'erreur de lecture ou d'écriture.
+        ValueError: Si l'archive ou son manifeste est invalide.
+
+    """
+    count = 0
+    created: set[Path] = set()
+    # Contenus déjà lus : peu nombreux, ils sont gardés décodés.
+    contents: dict[str, str] = {}
+    with open_archive(archive_path) as archive:
+        for path, digest in iter_manifest(archive, loadlib):
+            content = contents.get(digest)
+            if content is None:
+                try:
+                    data = archive.read(f"{BLOB_DIR}/{digest}")
+                except KeyError:
+                    raise ValueError(
+                        f"contenu {digest} absent de l'archive ({path})"
+                    ) from None
+                content = contents[digest] = data.decode("utf-8")
+            target = output_dir.joinpath(*path.parts)
+            if target.parent not in created:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                created.add(target.parent)
+            # Mode texte, comme extract_copt.write_copt_file() : mêmes fins
+            # de ligne que les fichiers écrits directement.
+            with target.open("w", encoding="utf-8") as f_out:
+                f_out.write(content)
+            count += 1
+    return count
+
+
+def list_archive(archive_path: Path, loadlib: str | None = None) -> int:
+    """Affiche le manifeste (``<chemin> <empreinte>``) sur la sortie standard.
+
+    Returns:
+        Nombre de fichiers listés.
+
+    Raises:
+        OSError: En cas d'erreur de lecture.
+        ValueError: Si l'archive ou son manifeste est invalide.
+
+    """
+    count = 0
+    with open_archive(archive_path) as archive:
+        for path, digest in iter_manifest(archive, loadlib):
+            sys.stdout.write(f"{path} {digest}\n")
+            count += 1
+    return count
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse et retourne les arguments passés sur la ligne de commande.
+
+    Returns:
+        Namespace argparse : ``command``, ``archive``, ``output`` et
+        ``loadlib``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Restaure ou liste les fichiers détail d'une archive écrite par "
+            "extract_copt.py --archive."
+        )
+    )
+    parser.add_argument(
+        "command",
+        choices=["extract", "list"],
+        help="extract : restaure l'arborescence ; list : affiche le manifeste.",
+    )
+    parser.add_argument(
+        "-a",
+        "--archive",
+        required=True,
+        help="Archive zip écrite par extract_copt.py (obligatoire).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help=(
+            "Répertoire de destination de extract, qui reçoit loadlibs/ "
+            "(obligatoire pour extract)."
+        ),
+    )
+    parser.add_argument(
+        "-l",
+        "--loadlib",
+        help="Ne traite que les fichiers de cette loadlib.",
+    )
+    args = parser.parse_args()
+    if args.command == "extract" and not args.output:
+        parser.error("extract exige -o/--output")
+    return args
+
+
+def main() -> None:
+    """Point d'entrée du script.
+
+    Raises:
+        SystemExit: code 2 si l'archive est absente, 3 si elle est invalide,
+            10 en cas d'erreur I/O.
+
+    """
+    args = parse_args()
+    setup_logging(load_config(), "copt_archive")
+
+    archive_path = Path(args.archive)
+    if not archive_path.is_file():
+        LOGGER.error("L'archive '%s' n'existe pas.", archive_path)
+        sys.exit(2)
+    try:
+        if args.command == "list":
+            count = list_archive(archive_path, args.loadlib)
+        else:
+            output_dir = Path(args.output)
+            LOGGER.info("Restauration : '%s' → '%s'.", archive_path, output_dir)
+            count = extract_archive(archive_path, output_dir, args.loadlib)
+            LOGGER.info(
+                "%d fichier(s) détail restauré(s) sous '%s'.",
+                count,
+                output_dir / "loadlibs",
+            )
+    except BrokenPipeError:
+        # Sortie refermée par le lecteur (ex. « list | head ») : arrêt sans
+        # erreur, stdout redirigée pour que sa fermeture n'échoue pas.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+    except (ValueError, zipfile.BadZipFile) as exc:
+        LOGGER.error("Archive invalide : %s", exc)
+        sys.exit(3)
+    except OSError as exc:
+        LOGGER.error("Erreur I/O sur '%s' : %s", archive_path, exc)
+        sys.exit(10)
+    if args.loadlib is not None and count == 0:
+        LOGGER.warning("Aucun fichier pour la loadlib '%s'.", args.loadlib)
+
+
+if __name__ == "__main__":
+    main()
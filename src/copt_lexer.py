@@ -0,0 +1,180 @@
+"""Analyseur lexical des chaînes d'options de compilation (``Copt@Val``).
+
+Grammaire commune à ``reformat_copt.py`` et ``build_json.py`` :
+
+- les options sont séparées par des blancs **hors parenthèses** ; un blanc à
+  l'intérieur de ``OPTION(A, B)`` ne coupe pas l'option ;
+- une ``)`` en excès ne fait pas descendre la profondeur sous zéro ;
+- une pseudo-option ``LEINFO=(...)`` / ``NON-LEINFO=(...)`` (casse
+  indifférente) va de sa tête à la parenthèse fermante correspondante, ou
+  jusqu'à la fin de la chaîne si elle manque.
+
+Aucune fonction ne parcourt la chaîne caractère par caractère : les
+frontières sont trouvées par expressions régulières et méthodes de ``str``
+(exécutées en C), les options extraites par découpage. Dans le cas courant
+— parenthèses équilibrées et non imbriquées — :func:`split_options` ne
+fait que trois passes en C, quelle que soit la longueur de la chaîne.
+
+La normalisation des blancs internes aux parenthèses est propre à chaque
+script : :func:`squeeze_token` pour ``reformat_copt.py``,
+:func:`compact_token` pour ``build_json.py``.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+
+# Tête d'une pseudo-option LEINFO / NON-LEINFO, jusqu'à sa « ( » incluse.
+LEINFO_HEAD_RE = re.compile(r"(?:NON-)?LEINFO=\(", re.IGNORECASE)
+
+_PAREN_RE = re.compile(r"[()]")
+_SPACE_RE = re.compile(r"\s+")
+_COMMA_SPACE_RE = re.compile(r",\s+")
+
+# Chaîne dont les parenthèses sont équilibrées et non imbriquées.
+_FLAT_RE = re.compile(r"[^()]*(?:\([^()]*\)[^()]*)*")
+# Groupe entre parenthèses contenant au moins un blanc.
+_SPACED_GROUP_RE = re.compile(r"\([^()\s]*\s[^()]*\)")
+# Remplace temporairement les espaces conservés dans un groupe, pour que
+# str.split() ne coupe pas l'option (U+0001 est interdit en XML).
+_MARK = "\x01"
+
+
+def collapse_token(token: str) -> str:
+    """Réduit chaque suite de blancs internes à un espace."""
+    return _SPACE_RE.sub(" ", token)
+
+
+def squeeze_token(token: str) -> str:
+    """Réduit les blancs internes à un espace, supprimés après une virgule.
+
+    Règle de ``reformat_copt.py`` : ``"CSECT(CODE,  ACCPRINT)"`` devient
+    ``"CSECT(CODE,ACCPRINT)"`` et ``"PARM(A  B)"`` devient ``"PARM(A B)"``.
+    """
+    return _COMMA_SPACE_RE.sub(",", _SPACE_RE.sub(" ", token))
+
+
+def compact_token(token: str) -> str:
+    """Supprime tous les blancs internes.
+
+    Règle de ``build_json.py`` : ``"CSECT(CODE, MCONFIG)"`` devient
+    ``"CSECT(CODE,MCONFIG)"``.
+    """
+    return _SPACE_RE.sub("", token)
+
+
+def closing_paren(text: str, open_index: int) -> int:
+    """Trouve la parenthèse fermante qui correspond à ``text[open_index]``.
+
+    Args:
+        text: Chaîne source complète.
+        open_index: Position de la parenthèse ouvrante ``(``.
+
+    Returns:
+        L'index juste après la parenthèse fermante correspondante, ou
+        ``len(text)`` si elle est introuvable.
+
+    """
+    depth = 0
+    for match in _PAREN_RE.finditer(text, open_index):
+        if match.group() == "(":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return len(text)
+
+
+def split_leinfo(val: str) -> tuple[list[str], list[str]]:
+    """Sépare les pseudo-options ``LEINFO`` du reste de la chaîne.
+
+    Args:
+        val: Chaîne d'options brute.
+
+    Returns:
+        ``(segments, tokens)`` : ``val`` vaut ``segments[0] + tokens[0] +
+        segments[1] + ...`` ; il y a toujours un segment de plus que de
+        tokens.
+
+    """
+    segments: list[str] = []
+    leinfo_tokens: list[str] = []
+    start = 0
+
+    while match := LEINFO_HEAD_RE.search(val, start):
+        end_index = closing_paren(val, match.end() - 1)
+        segments.append(val[start : match.start()])
+        leinfo_tokens.append(val[match.start() : end_index])
+        start = end_index
+
+    segments.append(val[start:])
+    return segments, leinfo_tokens
+
+
+def _paren_depth(piece: str, depth: int) -> int:
+    """Profondeur de parenthèses après ``piece``, partant de ``depth``."""
+    closing = piece.count(")")
+    if closing <= depth:
+        # Aucune « ) » ne peut faire passer la profondeur sous zéro.
+        return depth + piece.count("(") - closing
+    for match in _PAREN_RE.finditer(piece):
+        if match.group() == "(":
+            depth += 1
+        elif depth > 0:
+            depth -= 1
+    return depth
+
+
+def _split_pieces(val: str) -> list[str]:
+    """Cas général : regroupe les mots de ``val`` tant qu'une « ( » est ouverte.
+
+    Les mots d'une même option sont recollés par un espace.
+    """
+    tokens: list[str] = []
+    pieces: list[str] = []
+    depth = 0
+    for piece in val.split():
+        if not pieces and "(" not in piece and ")" not in piece:
+            tokens.append(piece)
+            continue
+        pieces.append(piece)
+        depth = _paren_depth(piece, depth)
+        if depth == 0:
+            tokens.append(" ".join(pieces))
+            pieces = []
+    if pieces:
+        tokens.append(" ".join(pieces))
+    return tokens
+
+
+def split_options(
+    val: str, normalize: Callable[[str], str] = collapse_token
+) -> list[str]:
+    """Découpe ``val`` en options, en respectant les parenthèses.
+
+    Args:
+        val: Chaîne d'options, normalisée ou non.
+        normalize: Traitement des blancs d'une option qui en contient
+            (internes aux parenthèses) ; sans effet sur un texte sans blanc.
+
+    Returns:
+        Les options, dans l'ordre, sans blanc de tête ni de fin.
+
+    """
+    if _MARK not in val and _FLAT_RE.fullmatch(val):
+        # Cas courant : seuls les groupes contenant un blanc sont
+        # normalisés, puis str.split() coupe sur les blancs restants, qui
+        # sont tous hors parenthèses.
+        marked = _SPACED_GROUP_RE.sub(
+            lambda match: normalize(match.group()).replace(" ", _MARK), val
+        )
+        return [
+            token.replace(_MARK, " ") if _MARK in token else token
+            for token in marked.split()
+        ]
+    return [
+        normalize(token) if " " in token else token
+        for token in _split_pieces(val)
+    ]
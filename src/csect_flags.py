@@ -0,0 +1,178 @@
+"""Indicateurs booléens dérivés du nom des CSECTs (``ThreadSafe``, ``DB2``…).
+
+Les règles sont lues dans la table ``[flags]`` de ``config.toml`` : chaque
+sous-table nomme un indicateur du JSON et liste des noms exacts
+(``equals``) et/ou des sous-chaînes (``contains``) ::
+
+    [flags.DB2]
+    contains = ["DSNCLI", "DSNELI", "DSNULI"]
+
+Sans table ``[flags]``, les règles historiques (:data:`DEFAULT_FLAG_RULES`)
+s'appliquent. Les règles sont compilées une seule fois par
+:func:`compile_flag_rules` :
+
+- les noms exacts forment un dictionnaire nom → indicateurs ;
+- toutes les sous-chaînes, tous indicateurs confondus, forment **une seule**
+  expression régulière : un passage sur le nom, exécuté en C, trouve chaque
+  position où commence l'une d'elles.
+
+Ajouter un indicateur ou une sous-chaîne ne demande donc ni modification du
+code, ni passage supplémentaire sur chaque nom.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+# Règles historiques de build_json.py, dans l'ordre des clés du JSON.
+DEFAULT_FLAG_RULES: dict[str, dict[str, list[str]]] = {
+    "ThreadSafe": {"equals": ["CEEUOPT"]},
+    "CICS": {"equals": ["DFHECI"]},
+    "DB2": {"contains": ["DSNCLI", "DSNELI", "DSNULI"]},
+    "WMQ": {
+        "contains": [
+            "DFHMQSTB",
+            "CSQBSTUB",
+            "CSQBRRSI",
+            "CSQBRSTB",
+            "CSQCSTUB",
+            "CSQQSTUB",
+            "CSQXSTUB",
+            "CSQASTUB",
+        ]
+    },
+}
+
+# Clés acceptées dans la règle d'un indicateur.
+RULE_KINDS = ("equals", "contains")
+
+
+@dataclass(frozen=True)
+class FlagMatcher:
+    """Règles d'indicateurs compilées, appliquées au nom d'un CSECT.
+
+    Attributs:
+        flags: Noms des indicateurs, dans l'ordre des clés du JSON.
+        exact: Nom de CSECT → indicateurs qu'il active par égalité.
+        pattern: Expression unique des sous-chaînes (``None`` sans règle
+            ``contains``) ; à chaque position, elle capture la plus longue
+            sous-chaîne qui y commence.
+        by_match: Sous-chaîne capturée → indicateurs de toutes les règles
+            qui en sont un préfixe (donc présentes à la même position).
+        unset: Résultat partagé d'un nom qui n'active aucun indicateur (le
+            cas courant), à ne pas modifier.
+    """
+
+    flags: tuple[str, ...]
+    exact: dict[str, frozenset[str]]
+    pattern: re.Pattern[str] | None
+    by_match: dict[str, frozenset[str]]
+    unset: dict[str, bool]
+
+    def match(self, name: str) -> dict[str, bool]:
+        """Retourne les indicateurs de ``name``, calculés en un passage.
+
+        Returns:
+            Indicateur → booléen, pour chaque indicateur de :attr:`flags` ;
+            le dictionnaire peut être partagé : le copier avant de le
+            modifier.
+
+        """
+        found: set[str] = set(self.exact.get(name, ()))
+        if self.pattern is not None:
+            for match in self.pattern.finditer(name):
+                found.update(self.by_match[match.group(1)])
+        if not found:
+            return self.unset
+        return {flag: flag in found for flag in self.flags}
+
+
+def _rule_values(flag: str, rule: Any, kind: str) -> list[str]:
+    """Retourne les chaînes ``kind`` de la règle ``flag``, vérifiées.
+
+    Raises:
+        ValueError: Si la valeur n'est pas une liste de chaînes non vides.
+
+    """
+    values = rule.get(kind, [])
+    if not isinstance(values, list) or not all(
+        isinstance(value, str) and value for value in values
+    ):
+        msg = f"[flags.{flag}] {kind} : liste de chaînes non vides attendue"
+        raise ValueError(msg)
+    return values
+
+
+def compile_flag_rules(rules: Mapping[str, Any]) -> FlagMatcher:
+    """Compile une table de règles en :class:`FlagMatcher`.
+
+    Args:
+        rules: Indicateur → ``{"equals": [...], "contains": [...]}``, dans
+            l'ordre voulu pour les clés du JSON.
+
+    Returns:
+        Les règles compilées.
+
+    Raises:
+        ValueError: Si une règle est mal formée (clé inconnue, valeur qui
+            n'est pas une liste de chaînes non vides).
+
+    """
+    exact: dict[str, set[str]] = {}
+    substrings: dict[str, set[str]] = {}
+    for flag, rule in rules.items():
+        if not isinstance(rule, Mapping) or set(rule) - set(RULE_KINDS):
+            msg = (
+                f"[flags.{flag}] : table attendue, avec les seules clés "
+                f"{', '.join(RULE_KINDS)}"
+            )
+            raise ValueError(msg)
+        for name in _rule_values(flag, rule, "equals"):
+            exact.setdefault(name, set()).add(flag)
+        for sub in _rule_values(flag, rule, "contains"):
+            substrings.setdefault(sub, set()).add(flag)
+
+    pattern = None
+    if substrings:
+        # Alternatives de la plus longue à la plus courte : à une position
+        # donnée, la capture est la plus longue sous-chaîne qui y commence ;
+        # les autres sont ses préfixes, repris par `by_match`. Le lookahead
+        # fait avancer la recherche d'un caractère à la fois ; la classe des
+        # premiers caractères, en tête, écarte d'un test la plupart des
+        # positions sans essayer chaque alternative.
+        ordered = sorted(substrings, key=len, reverse=True)
+        alternatives = "|".join(re.escape(sub) for sub in ordered)
+        firsts = "".join(sorted({re.escape(sub[0]) for sub in substrings}))
+        pattern = re.compile(f"(?=[{firsts}])(?=({alternatives}))")
+    by_match = {
+        sub: frozenset(
+            flag
+            for prefix, flags in substrings.items()
+            if sub.startswith(prefix)
+            for flag in flags
+        )
+        for sub in substrings
+    }
+    return FlagMatcher(
+        flags=tuple(rules),
+        exact={name: frozenset(flags) for name, flags in exact.items()},
+        pattern=pattern,
+        by_match=by_match,
+        unset=dict.fromkeys(rules, False),
+    )
+
+
+def load_flag_matcher(config: Mapping[str, Any]) -> FlagMatcher:
+    """Compile la table ``[flags]`` de ``config``, ou les règles par défaut.
+
+    Raises:
+        ValueError: Si la table ``[flags]`` est mal formée.
+
+    """
+    return compile_flag_rules(config.get("flags", DEFAULT_FLAG_RULES))
+
+
+DEFAULT_FLAG_MATCHER = compile_flag_rules(DEFAULT_FLAG_RULES)
@@ -0,0 +1,107 @@
+"""Pages de code EBCDIC absentes de la bibliothèque standard Python.
+
+Python fournit ``cp037`` (États-Unis) et ``cp1140`` mais pas ``cp1147``,
+la page de code France avec l'euro utilisée par les rapports File Manager
+des sites français. Ce module l'enregistre auprès de :mod:`codecs` ; une
+fois :func:`register` appelé, ``bytes.decode("cp1147")`` fonctionne comme
+pour toute page de code native.
+
+La table est dérivée de ``cp037`` : les deux pages ne diffèrent que par
+les 26 positions de ``_CP1147_OVERRIDES`` (table IBM CCSID 1147).
+"""
+
+from __future__ import annotations
+
+import codecs
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Buffer
+
+# Positions où CCSID 1147 (France + euro) diffère de CCSID 037.
+_CP1147_OVERRIDES: dict[int, str] = {
+    0x44: "@",
+    0x48: "\\",
+    0x4A: "°",
+    0x4F: "!",
+    0x51: "{",
+    0x54: "}",
+    0x5A: "§",
+    0x5F: "^",
+    0x6A: "ù",
+    0x79: "µ",
+    0x7B: "£",
+    0x7C: "à",
+    0x90: "[",
+    0x9F: "€",
+    0xA0: "`",
+    0xA1: "¨",
+    0xB0: "¢",
+    0xB1: "#",
+    0xB5: "]",
+    0xBA: "¬",
+    0xBB: "|",
+    0xBD: "~",
+    0xC0: "é",
+    0xD0: "è",
+    0xDD: "¦",
+    0xE0: "ç",
+}
+
+# Noms acceptés (normalisés par codecs : minuscules, « - » → « _ »).
+_CP1147_NAMES = frozenset({"cp1147", "ibm1147", "ibm_1147"})
+
+
+def _build_decoding_table() -> str:
+    """Construit la table de décodage cp1147 à partir de celle de cp037."""
+    table = list(bytes(range(256)).decode("cp037"))
+    for byte, char in _CP1147_OVERRIDES.items():
+        table[byte] = char
+    return "".join(table)
+
+
+_DECODING_TABLE = _build_decoding_table()
+_ENCODING_TABLE = codecs.charmap_build(_DECODING_TABLE)
+
+
+def _encode(text: str, errors: str = "strict") -> tuple[bytes, int]:
+    return codecs.charmap_encode(text, errors, _ENCODING_TABLE)
+
+
+def _decode(data: Buffer, errors: str = "strict") -> tuple[str, int]:
+    return codecs.charmap_decode(data, errors, _DECODING_TABLE)
+
+
+class _IncrementalEncoder(codecs.IncrementalEncoder):
+    def encode(self, input: str, final: bool = False) -> bytes:  # noqa: FBT001, FBT002
+        return _encode(input, self.errors)[0]
+
+
+class _IncrementalDecoder(codecs.IncrementalDecoder):
+    def decode(self, input: Buffer, final: bool = False) -> str:  # noqa: FBT001, FBT002
+        return _decode(input, self.errors)[0]
+
+
+def _search(name: str) -> codecs.CodecInfo | None:
+    """Fonction de recherche :mod:`codecs` pour les pages de ce module.
+
+    Les codecs incrémentaux sont nécessaires à :class:`io.TextIOWrapper`
+    (``open(..., encoding="cp1147")``).
+    """
+    if name not in _CP1147_NAMES:
+        return None
+    return codecs.CodecInfo(
+        name="cp1147",
+        encode=_encode,
+        decode=_decode,
+        incrementalencoder=_IncrementalEncoder,
+        incrementaldecoder=_IncrementalDecoder,
+    )
+
+
+def register() -> None:
+    """Enregistre les pages de code du module (appel idempotent)."""
+    try:
+        codecs.lookup("cp1147")
+    except LookupError:
+        codecs.register(_search)
@@ -39,23 +39,39 @@ import argparse
 import json
 import logging
 import sys
-from collections.abc import Iterator
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from types import TracebackType
 
-from utils import load_config, setup_logging
+from copt_archive import CoptArchiveWriter
+from utils import COMPRESSION_ERRORS, load_config, open_text, setup_logging
+from vlm_model import Loadlib
+from vlm_snapshot import Snapshot, is_snapshot
+from vlm_stream import iter_loadlibs
 
 # Alias de type : donne un nom lisible à la structure d'une ligne de sortie.
 # Un tuple nommé de 6 éléments : (préfixe, loadlib, load_name, csect_name,
-# compilateur, liste_options). La dernière colonne est une liste de chaînes
-# car un CSECT peut avoir plusieurs dizaines d'options de compilation.
-CsectRow = tuple[str, str, str, str, str, list[str]]
+# compilateur, liste_options). La dernière colonne est une séquence de
+# chaînes car un CSECT peut avoir plusieurs dizaines d'options.
+CsectRow = tuple[str, str, str, str, str, Sequence[str]]
 
 # Logger nommé "extract_copt" — le nom apparaît dans chaque ligne de log.
 # On utilise un logger nommé (plutôt que le root logger) pour que les messages
 # de ce script soient identifiables dans le fichier pipeline.log partagé.
 LOGGER = logging.getLogger("extract_copt")
 
+# Nombre de fils d'écriture des fichiers détail par défaut (--threads).
+# Les écritures attendent surtout le système de fichiers (NFS) : on peut
+# dépasser le nombre de cœurs.
+DEFAULT_THREADS = 8
+
+# Écritures en attente par fil : borne la mémoire des options en transit
+# quand le système de fichiers est plus lent que la lecture du JSON.
+_PENDING_PER_THREAD = 64
+
 # Correspondance nom complet du compilateur → code abrégé utilisé dans les
 # noms de fichiers générés. Les clés sont les chaînes exactes du champ
 # "Compiler1" du JSON produit par build_json.py (issu du rapport VLM IBM).
@@ -110,7 +126,9 @@ def parse_args() -> argparse.Namespace:
 
     Returns:
         Namespace argparse dont les attributs ``file`` et ``output``
-        contiennent les chemins fournis par l'utilisateur.
+        contiennent les chemins fournis par l'utilisateur, ``threads`` le
+        nombre de fils d'écriture des fichiers détail et ``archive`` le
+        chemin de l'archive qui les remplace (``None`` sans ``--archive``).
 
     """
     # ArgumentParser est l'objet central d'argparse ; description apparaît
@@ -124,7 +142,10 @@ def parse_args() -> argparse.Namespace:
         "-f",
         "--file",
         required=True,
-        help="Fichier JSON en entrée (obligatoire).",
+        help=(
+            "Fichier JSON en entrée, ou instantané de build_json.py "
+            "--snapshot (obligatoire)."
+        ),
     )
     parser.add_argument(
         "-o",
@@ -132,35 +153,69 @@ def parse_args() -> argparse.Namespace:
         required=True,
         help="Fichier CSV en sortie (obligatoire).",
     )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=DEFAULT_THREADS,
+        help=(
+            "Fils d'écriture des fichiers détail (défaut : "
+            f"{DEFAULT_THREADS}, 1 = écriture séquentielle)."
+        ),
+    )
+    parser.add_argument(
+        "-a",
+        "--archive",
+        help=(
+            "Archive zip dédupliquée des fichiers détail, à la place de "
+            "l'arborescence loadlibs/ (voir copt_archive.py)."
+        ),
+    )
     # parse_args() lit sys.argv, valide les arguments et retourne un Namespace.
-    # Accès aux valeurs : args.file, args.output.
-    return parser.parse_args()
+    # Accès aux valeurs : args.file, args.output, args.threads, args.archive.
+    args = parser.parse_args()
+    if args.threads < 1:
+        parser.error("--threads doit être supérieur ou égal à 1")
+    return args
 
 
-def load_json(path: Path) -> list[Any]:
-    """Ouvre le fichier JSON pointé par *path* et retourne son contenu analysé.
+def stream_json(path: Path) -> Iterator[Loadlib]:
+    """Parcourt les loadlibs du fichier JSON pointé par *path*, une à une.
 
     Le fichier VLM JSON est un tableau de loadlibs, chacune contenant une liste
     de loadmods, eux-mêmes contenant une liste de CSECTs avec leurs options.
+    En disposition ``table`` (``build_json.py --copt-layout table``), c'est un
+    objet ``{"CoptTable", "Loadlibs"}`` : les numéros de jeu ``Copt`` sont
+    remplacés par les options de la table au fil de la lecture. La sortie
+    JSON Lines est également acceptée.
+
+    Le fichier est lu en flux (voir vlm_stream.py) : chaque loadlib est
+    rendue dès qu'elle est lue, sans attendre la fin du fichier. Une erreur
+    de contenu peut donc survenir après que des loadlibs ont été rendues.
 
     Args:
         path: Chemin absolu ou relatif vers le fichier JSON à lire.
 
-    Returns:
-        Le contenu du fichier sous forme de liste Python (un élément par loadlib).
+    Yields:
+        Les loadlibs du fichier, converties en objets du modèle commun
+        (``vlm_model.Loadlib``), dans l'ordre du fichier.
 
     Raises:
         SystemExit:
             - code 2 si le fichier est absent ou si la lecture est refusée par l'OS
-            - code 3 si le contenu n'est pas du JSON valide
-            - code 10 en cas d'erreur I/O inattendue
+            - code 3 si le contenu n'est pas du JSON valide, ou si la table
+              des options est incohérente
+            - code 10 en cas d'erreur I/O inattendue ou de fichier compressé
+              corrompu
 
     """
+    count = 0
     try:
-        with path.open(encoding="utf-8") as f:
-            # json.load() lit le flux et convertit le JSON en objets Python
-            # (dict, list, str, int…). Lève JSONDecodeError si le format est invalide.
-            data: list[Any] = json.load(f)
+        # open_text() décompresse à la volée un fichier .gz/.bz2/.xz.
+        with open_text(path, "r", "utf-8") as f:
+            for lib in iter_loadlibs(f):
+                count += 1
+                yield lib
     except FileNotFoundError:
         # Le fichier n'existe pas à l'emplacement indiqué.
         LOGGER.error("Fichier '%s' introuvable.", path)
@@ -174,22 +229,63 @@ def load_json(path: Path) -> list[Any]:
         # exc contient le détail de l'erreur (ligne, colonne).
         LOGGER.error("'%s' n'est pas un JSON valide : %s", path, exc)
         sys.exit(3)
+    except ValueError as exc:
+        # JSON valide, mais numéro de jeu Copt sans table correspondante.
+        LOGGER.error("'%s' : %s", path, exc)
+        sys.exit(3)
     except OSError as exc:
         # OSError est la classe parente de la plupart des erreurs système
         # (disque plein, fichier verrouillé…). Filet de sécurité pour les cas
         # non couverts par FileNotFoundError et PermissionError.
         LOGGER.error("Erreur I/O lors de la lecture de '%s' : %s", path, exc)
         sys.exit(10)
+    except COMPRESSION_ERRORS as exc:
+        # Flux compressé tronqué ou corrompu (non couvert par OSError).
+        LOGGER.error("Fichier compressé '%s' illisible : %s", path, exc)
+        sys.exit(10)
+    LOGGER.debug("JSON lu depuis '%s' : %d loadlib(s).", path, count)
+
+
+def load_snapshot(path: Path) -> Snapshot:
+    """Ouvre l'instantané colonnaire pointé par *path* (voir vlm_snapshot.py).
+
+    Args:
+        path: Chemin de l'instantané écrit par ``build_json.py --snapshot``.
+
+    Returns:
+        L'instantané ouvert, à fermer par l'appelant.
+
+    Raises:
+        SystemExit:
+            - code 2 si le fichier est absent ou si la lecture est refusée par l'OS
+            - code 3 si le contenu n'est pas un instantané valide
+            - code 10 en cas d'erreur I/O inattendue
+
+    """
+    try:
+        snapshot = Snapshot(path)
+    except FileNotFoundError:
+        LOGGER.error("Fichier '%s' introuvable.", path)
+        sys.exit(2)
+    except PermissionError:
+        LOGGER.error("Accès refusé en lecture sur '%s'.", path)
+        sys.exit(2)
+    except ValueError as exc:
+        LOGGER.error("Instantané invalide : %s", exc)
+        sys.exit(3)
+    except OSError as exc:
+        LOGGER.error("Erreur I/O lors de la lecture de '%s' : %s", path, exc)
+        sys.exit(10)
     else:
         LOGGER.debug(
-            "JSON chargé depuis '%s' : %d loadlib(s) présente(s).",
+            "Instantané ouvert depuis '%s' : %d loadlib(s) présente(s).",
             path,
-            len(data),
+            snapshot.counts["loadlib"],
         )
-        return data
+        return snapshot
 
 
-def iter_csect_copt(data: list[Any]) -> Iterator[CsectRow]:
+def iter_csect_copt(data: Iterable[Loadlib]) -> Iterator[CsectRow]:
     """Parcourt le JSON VLM et génère une ligne par CSECT ayant des options COPT.
 
     Le JSON VLM est structuré sur trois niveaux imbriqués :
@@ -205,7 +301,7 @@ def iter_csect_copt(data: list[Any]) -> Iterator[CsectRow]:
     DB2, CICS, sous-programmes inclus…).
 
     Args:
-        data: Contenu JSON analysé, tel que retourné par ``load_json``.
+        data: Loadlibs, telles que rendues par :func:`stream_json`.
 
     Yields:
         ``CsectRow`` — tuple à 6 éléments dans l'ordre :
@@ -220,26 +316,26 @@ def iter_csect_copt(data: list[Any]) -> Iterator[CsectRow]:
 
     """
     for lib in data:
-        # .get("Loadlib") retourne None si la clé est absente ;
-        # `or ""` la remplace par une chaîne vide pour éviter des erreurs de
+        # Un champ absent du JSON vaut None dans le modèle ;
+        # `or ""` le remplace par une chaîne vide pour éviter des erreurs de
         # concaténation ou de comparaison plus loin dans le code.
-        loadlib: str = lib.get("Loadlib") or ""
+        loadlib: str = lib.name or ""
 
-        # .get("Loadmods", []) retourne une liste vide si la clé manque,
-        # ce qui évite un crash lorsqu'un nœud de la hiérarchie est absent.
-        for module in lib.get("Loadmods", []):
-            load_name: str = module.get("Name") or ""
+        # Une liste absente du JSON est vide dans le modèle, ce qui évite
+        # un crash lorsqu'un nœud de la hiérarchie est absent.
+        for module in lib.loadmods:
+            load_name: str = module.name or ""
 
-            for csect in module.get("CSECTs", []):
-                copt = csect.get("Copt")
-                # `not copt` est True pour None (clé absente) ET pour [] (liste
+            for csect in module.csects:
+                copt = csect.copt
+                # `not copt` est True pour None (clé absente) ET pour () (liste
                 # vide) : dans les deux cas le CSECT n'a pas d'options COPT et
                 # on passe silencieusement au suivant.
                 if not copt:
                     continue
 
-                csect_name: str = csect.get("Name") or ""
-                compiler: str = csect.get("Compiler1") or ""
+                csect_name: str = csect.name or ""
+                compiler: str = csect.compiler1 or ""
                 # Préfixe "1" = CSECT principal (même nom que le module, cas normal
                 # en IBM COBOL). Préfixe "0" = CSECT secondaire (stub DB2, CICS…).
                 prefix = "1" if load_name == csect_name else "0"
@@ -251,24 +347,60 @@ def iter_csect_copt(data: list[Any]) -> Iterator[CsectRow]:
                 yield prefix, loadlib, load_name, csect_name, compiler, copt
 
 
-def generate_copt_file(output_file: Path, compiler_options: list[str]) -> None:
+def iter_snapshot_copt(snapshot: Snapshot) -> Iterator[CsectRow]:
+    """Génère les lignes de :func:`iter_csect_copt` depuis un instantané.
+
+    Seules les colonnes utiles sont lues : noms, compilateur, jeu d'options
+    de chaque CSECT et index des parents. Les CSECTs sont rangés dans
+    l'ordre du JSON : les lignes sont les mêmes, dans le même ordre.
+
+    Args:
+        snapshot: Instantané ouvert par ``load_snapshot``.
+
+    Yields:
+        ``CsectRow``, comme :func:`iter_csect_copt`.
+
+    """
+    lib_names = snapshot.strings("loadlib.name")
+    mod_names = snapshot.strings("loadmod.name")
+    mod_libs = snapshot.column("loadmod.loadlib")
+    csect_mods = snapshot.column("csect.loadmod")
+    csect_names = snapshot.strings("csect.name")
+    compilers = snapshot.strings("csect.compiler1")
+    # Un jeu d'options n'est décodé qu'une fois, quel que soit le nombre de
+    # CSECTs qui le partagent.
+    copt_sets: dict[int, tuple[str, ...]] = {}
+    for row, set_id in enumerate(snapshot.column("csect.copt")):
+        # -1 : CSECT sans <Copt>.
+        if set_id < 0:
+            continue
+        copt = copt_sets.get(set_id)
+        if copt is None:
+            copt = copt_sets[set_id] = snapshot.copt(set_id)
+        if not copt:
+            continue
+        mod = csect_mods[row]
+        load_name = mod_names[mod] or ""
+        csect_name = csect_names[row] or ""
+        prefix = "1" if load_name == csect_name else "0"
+        loadlib = lib_names[mod_libs[mod]] or ""
+        compiler = compilers[row] or ""
+        yield prefix, loadlib, load_name, csect_name, compiler, copt
+
+
+def write_copt_file(output_file: Path, compiler_options: Sequence[str]) -> None:
     """Écrit les options de compilation dans un fichier texte dédié au CSECT.
 
-    Le fichier est créé ainsi que tous les répertoires parents manquants.
-    Chaque option occupe une ligne dans le fichier.
+    Le répertoire du fichier doit exister. Chaque option occupe une ligne
+    dans le fichier.
 
     Args:
         output_file: Chemin complet du fichier à créer.
         compiler_options: Liste des options de compilation à écrire.
 
     """
-    # parents=True : crée tous les sous-répertoires manquants (équivalent mkdir -p).
-    # exist_ok=True : ne lève pas d'erreur si le répertoire existe déjà.
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-
     with output_file.open(mode="w", encoding="utf-8") as f:
-        for option in compiler_options:
-            f.write(f"{option}\n")
+        f.write("".join(f"{option}\n" for option in compiler_options))
 
     LOGGER.debug(
         "Fichier détail créé : %s (%d option(s)).",
@@ -277,7 +409,148 @@ def generate_copt_file(output_file: Path, compiler_options: list[str]) -> None:
     )
 
 
-def write_csv(rows: Iterator[CsectRow], output_path: Path) -> int:
+class CoptFileWriter:
+    """Écriture groupée des fichiers détail, confiée à un pool de fils.
+
+    Chaque répertoire ``loadlibs/<loadlib>`` n'est créé qu'une fois : les
+    répertoires déjà créés sont mémorisés, au lieu d'un ``mkdir`` par
+    fichier. Les écritures sont soumises à un pool de ``threads`` fils ;
+    au plus 64 par fil restent en attente, l'appelant attendant la
+    plus ancienne au-delà. Deux écritures du même fichier gardent l'ordre
+    de soumission (la dernière l'emporte, comme en séquentiel).
+
+    Une erreur d'écriture est relevée par :meth:`write` ou :meth:`close`
+    dans le fil appelant.
+
+    Attributs:
+        threads: Nombre de fils d'écriture (1 = écriture séquentielle).
+        count: Nombre de fichiers soumis.
+        directories: Nombre de répertoires créés.
+    """
+
+    __slots__ = (
+        "_created",
+        "_executor",
+        "_in_flight",
+        "_max_pending",
+        "_pending",
+        "_start",
+        "count",
+        "threads",
+    )
+
+    def __init__(self, threads: int = DEFAULT_THREADS) -> None:
+        """Prépare le pool (aucun fil si ``threads`` vaut 1)."""
+        self.threads = threads
+        self.count = 0
+        self._created: set[Path] = set()
+        self._executor = (
+            ThreadPoolExecutor(threads, thread_name_prefix="copt")
+            if threads > 1
+            else None
+        )
+        self._max_pending = threads * _PENDING_PER_THREAD
+        self._pending: deque[tuple[Path, Future[None]]] = deque()
+        # Dernière écriture en attente de chaque fichier.
+        self._in_flight: dict[Path, Future[None]] = {}
+        self._start = time.perf_counter()
+
+    def __enter__(self) -> CoptFileWriter:
+        """Retourne l'écrivain lui-même."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Termine les écritures, ou les abandonne si une erreur est en cours."""
+        if exc_type is None:
+            self.close()
+        elif self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+    @property
+    def directories(self) -> int:
+        """Retourne le nombre de répertoires créés."""
+        return len(self._created)
+
+    def summary(self) -> str:
+        """Retourne le bilan de l'écriture pour le journal."""
+        elapsed = time.perf_counter() - self._start
+        return (
+            f"{self.count} fichier(s) détail écrit(s) dans "
+            f"{self.directories} répertoire(s) en {elapsed:.2f} s "
+            f"({self.count / elapsed if elapsed else 0.0:.0f} fichiers/s, "
+            f"{self.threads} fil(s))."
+        )
+
+    def _wait_oldest(self) -> None:
+        """Attend la plus ancienne écriture en attente."""
+        path, future = self._pending.popleft()
+        if self._in_flight.get(path) is future:
+            del self._in_flight[path]
+        future.result()
+
+    def write(self, output_file: Path, compiler_options: Sequence[str]) -> None:
+        """Écrit (ou soumet au pool) le fichier détail ``output_file``.
+
+        Raises:
+            OSError: Si la création du répertoire ou une écriture déjà
+                soumise a échoué.
+
+        """
+        directory = output_file.parent
+        if directory not in self._created:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created.add(directory)
+        self.count += 1
+        if self._executor is None:
+            write_copt_file(output_file, compiler_options)
+            return
+        previous = self._in_flight.get(output_file)
+        if previous is not None:
+            previous.result()
+        if len(self._pending) >= self._max_pending:
+            self._wait_oldest()
+        future = self._executor.submit(
+            write_copt_file, output_file, compiler_options
+        )
+        self._pending.append((output_file, future))
+        self._in_flight[output_file] = future
+
+    def close(self) -> None:
+        """Attend la fin de toutes les écritures et arrête le pool.
+
+        Raises:
+            OSError: Si une écriture a échoué.
+
+        """
+        if self._executor is None:
+            return
+        try:
+            while self._pending:
+                self._wait_oldest()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+
+
+def _detail_writer(
+    basedir: Path, threads: int, archive: Path | None
+) -> CoptFileWriter | CoptArchiveWriter:
+    """Retourne l'écrivain des fichiers détail choisi par ``write_csv()``."""
+    if archive is None:
+        return CoptFileWriter(threads)
+    return CoptArchiveWriter(archive, basedir)
+
+
+def write_csv(
+    rows: Iterator[CsectRow],
+    output_path: Path,
+    threads: int = DEFAULT_THREADS,
+    archive: Path | None = None,
+) -> int:
     """Écrit les lignes COPT dans un fichier texte délimité par des points-virgules.
 
     Chaque ligne du fichier de sortie suit le format ::
@@ -292,6 +565,12 @@ def write_csv(rows: Iterator[CsectRow], output_path: Path) -> int:
             Un itérateur est consommé une seule fois ; cette fonction en épuise
             le contenu ligne par ligne sans stocker toutes les lignes en mémoire.
         output_path: Chemin du fichier CSV de sortie.
+        threads: Fils d'écriture des fichiers détail (voir
+            ``CoptFileWriter``). Le CSV est écrit par le fil appelant,
+            dans l'ordre de ``rows``, quel que soit ce nombre.
+        archive: Si renseigné, les fichiers détail sont écrits dans cette
+            archive dédupliquée (voir copt_archive.py) au lieu de
+            l'arborescence ``loadlibs/`` ; ``threads`` est alors ignoré.
 
     Returns:
         Nombre total de lignes écrites dans le fichier CSV.
@@ -308,7 +587,14 @@ def write_csv(rows: Iterator[CsectRow], output_path: Path) -> int:
         basedir = output_path.parent
         # mode="w" crée le fichier s'il n'existe pas (ou l'écrase). Les fins de
         # ligne sont écrites explicitement via f.write(f"...\n").
-        with output_path.open(mode="w", encoding="utf-8") as f:
+        # open_text() compresse à la volée si le nom finit par .gz/.bz2/.xz.
+        # Les fichiers détail sont confiés à CoptFileWriter (un mkdir par
+        # loadlib, écritures parallèles) ou à CoptArchiveWriter (archive
+        # dédupliquée) ; le CSV reste écrit ici, dans l'ordre des lignes.
+        with (
+            open_text(output_path, "w", "utf-8") as f,
+            _detail_writer(basedir, threads, archive) as files,
+        ):
             for prefix, loadlib, load_name, csect_name, compiler, copt in rows:
                 # len(copt) = nombre total d'options de compilation du CSECT.
                 f.write(
@@ -340,7 +626,7 @@ def write_csv(rows: Iterator[CsectRow], output_path: Path) -> int:
                     / loadlib
                     / f"{load_name}_{csect_name}_{compiler_short}.txt"
                 )
-                generate_copt_file(output_file, copt)
+                files.write(output_file, copt)
                 count += 1
     except OSError as exc:
         LOGGER.error(
@@ -348,6 +634,7 @@ def write_csv(rows: Iterator[CsectRow], output_path: Path) -> int:
         )
         sys.exit(10)
     else:
+        LOGGER.info("%s", files.summary())
         return count
 
 
@@ -360,7 +647,7 @@ def main() -> None:
     2. Vérifie que le fichier d'entrée existe.
     3. Vérifie que le fichier de sortie n'existe pas déjà.
     4. Vérifie que le répertoire de sortie est accessible en écriture.
-    5. Charge le JSON.
+    5. Lit le JSON en flux (ou ouvre l'instantané).
     6. Parcourt la hiérarchie et écrit le CSV et les fichiers détail.
     7. Affiche le bilan.
 
@@ -395,6 +682,17 @@ def main() -> None:
         LOGGER.error("Le fichier de sortie '%s' existe déjà.", output_path)
         sys.exit(2)
 
+    # Même règle pour l'archive des fichiers détail (--archive).
+    archive_path = Path(args.archive) if args.archive else None
+    if archive_path is not None and (
+        archive_path.exists() or not archive_path.parent.is_dir()
+    ):
+        LOGGER.error(
+            "L'archive '%s' existe déjà ou son répertoire est absent.",
+            archive_path,
+        )
+        sys.exit(2)
+
     # output_path.parent vaut Path('.') pour un nom de fichier sans répertoire
     # (ex. "out.csv" → parent = ".").
     output_dir = output_path.parent
@@ -416,13 +714,39 @@ def main() -> None:
 
     LOGGER.info("Début de l'extraction : '%s' → '%s'.", input_path, output_path)
 
-    data = load_json(input_path)
-    LOGGER.info("JSON chargé : %d loadlib(s) à traiter.", len(data))
-
-    # iter_csect_copt() est passé directement à write_csv() sans stocker les
-    # lignes dans une liste intermédiaire : elles sont générées et écrites une
-    # par une, ce qui limite la consommation mémoire sur de grands fichiers.
-    count = write_csv(iter_csect_copt(data), output_path)
+    if is_snapshot(input_path):
+        # Instantané de build_json.py --snapshot : projeté en mémoire, seules
+        # les colonnes utiles à l'extraction sont lues.
+        with load_snapshot(input_path) as snapshot:
+            LOGGER.info(
+                "Instantané ouvert : %d loadlib(s) à traiter.",
+                snapshot.counts["loadlib"],
+            )
+            count = write_csv(
+                iter_snapshot_copt(snapshot),
+                output_path,
+                args.threads,
+                archive_path,
+            )
+    else:
+        # Lecture en flux : chaque loadlib est décodée puis écrite avant la
+        # lecture de la suivante. iter_csect_copt() est passé directement à
+        # write_csv() sans liste intermédiaire : la mémoire ne dépend que de
+        # la plus grosse loadlib, pas de la taille du fichier.
+        try:
+            count = write_csv(
+                iter_csect_copt(stream_json(input_path)),
+                output_path,
+                args.threads,
+                archive_path,
+            )
+        except SystemExit:
+            # JSON invalide découvert en cours de lecture : on ne laisse pas
+            # un CSV ou une archive partiels derrière soi.
+            output_path.unlink(missing_ok=True)
+            if archive_path is not None:
+                archive_path.unlink(missing_ok=True)
+            raise
     LOGGER.info(
         "Extraction terminée : %d CSECT(s) écrits dans '%s'.",
         count,
@@ -19,6 +19,8 @@ import sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
 
+from utils import open_binary
+
 
 def parse_args() -> argparse.Namespace:
     """Analyse et valide les arguments de ligne de commande.
@@ -80,9 +82,9 @@ def main() -> None:
         # ET.parse() charge le XML en mémoire sous forme d'arbre d'objets.
         # ET.XMLParser(encoding=...) force l'encodage indiqué en argument.
         # Lève ET.ParseError si le XML est syntaxiquement invalide.
-        tree = ET.parse(
-            str(input_path), parser=ET.XMLParser(encoding=args.encoding)
-        )
+        # open_binary() décompresse à la volée un fichier .gz/.bz2/.xz.
+        with open_binary(input_path, "rb") as f_in:
+            tree = ET.parse(f_in, parser=ET.XMLParser(encoding=args.encoding))
     except ET.ParseError as exc:
         # exc contient le détail de l'erreur (ligne, colonne, message).
         print(f"Erreur XML : {exc}", file=sys.stderr)
@@ -16,9 +16,16 @@ Usage :
     python src/pipeline.py --steps 3        # étape 3 uniquement
     python src/pipeline.py --steps 3-4      # étapes 3 et 4
     python src/pipeline.py --steps 2-4      # étapes 2 à 4
+    python src/pipeline.py --resume         # reprise du nettoyage interrompu
+    python src/pipeline.py --fused          # étapes 1-3 en une passe
+
+Avec ``--fused``, les étapes 1 à 3 sont exécutées en une seule passe par
+report_to_json.py, sans fichier intermédiaire.
 
 Les chemins configurables (entrée/sorties) sont définis dans config.toml.
-Les fichiers intermédiaires sont câblés dans ce script.
+Les fichiers intermédiaires sont câblés dans ce script ; la clé
+``compression`` de config.toml les compresse (gzip, bz2 ou xz). Entrée et
+sorties finales sont compressées si leur nom finit par .gz, .bz2 ou .xz.
 """
 
 from __future__ import annotations
@@ -50,10 +57,26 @@ VLM_INPUT = PROJECT_ROOT / _settings["vlm_input"]
 FINAL_JSON = PROJECT_ROOT / _settings["final_json"]
 COPT_CSV = PROJECT_ROOT / _settings["copt_csv"]
 
+# Archive des fichiers détail de l'étape 4 (optionnelle, "" = arborescence).
+_COPT_ARCHIVE: str = _settings.get("copt_archive", "")
+COPT_ARCHIVE = PROJECT_ROOT / _COPT_ARCHIVE if _COPT_ARCHIVE else None
+
+# Nombre de processus transmis aux étapes parallélisables (0 = un par cœur).
+WORKERS: int = _settings.get("workers", 1)
+
+# Fils d'écriture des fichiers détail de l'étape 4 (extract_copt.py -t).
+IO_THREADS: int = _settings.get("io_threads", 8)
+
+# Compression des fichiers intermédiaires : "" (aucune), "gz", "bz2" ou "xz".
+# Les scripts détectent le format à l'extension : seul le suffixe change.
+COMPRESSION: str = _settings.get("compression", "")
+COMPRESSION_CHOICES = ("", "gz", "bz2", "xz")
+_SUFFIX = f".{COMPRESSION}" if COMPRESSION else ""
+
 # Fichiers intermédiaires — codés en dur, non configurables dans config.toml.
 # Chaque étape produit exactement un fichier passé en entrée à l'étape suivante.
-CLEAN_XML = PROJECT_ROOT / "datas/clean_vlm.xml"  # Sortie de l'étape 1
-COPT_XML = PROJECT_ROOT / "datas/clean_vlm_copt.xml"  # Sortie de l'étape 2
+CLEAN_XML = PROJECT_ROOT / f"datas/clean_vlm.xml{_SUFFIX}"  # Sortie étape 1
+COPT_XML = PROJECT_ROOT / f"datas/clean_vlm_copt.xml{_SUFFIX}"  # Sortie étape 2
 COPT_IGNORED = PROJECT_ROOT / "datas/copt_ignored.txt"  # Trace LEINFO (étape 2)
 
 STEP_COUNT = 4
@@ -147,6 +170,8 @@ def build_parser() -> argparse.ArgumentParser:
             "  pipeline.py 2-4         # étapes 2 à 4\n"
             "  pipeline.py extract     # étape 4 par alias\n"
             "  pipeline.py copt-json   # étapes 2-3 par alias\n"
+            "  pipeline.py --resume    # reprise du nettoyage interrompu\n"
+            "  pipeline.py --fused     # étapes 1-3 en une passe\n"
         ),
         formatter_class=argparse.RawDescriptionHelpFormatter,
     )
@@ -161,9 +186,81 @@ def build_parser() -> argparse.ArgumentParser:
             "Par défaut : toutes les étapes (1-4)."
         ),
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "Étape 1 : reprendre le nettoyage au dernier point de reprise "
+            "au lieu de repartir du début."
+        ),
+    )
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help=(
+            "Étapes 1 à 3 : nettoyage, reformatage et conversion JSON en une "
+            "seule passe (report_to_json.py), sans fichier intermédiaire."
+        ),
+    )
     return parser
 
 
+FUSED_STEPS = (1, 2, 3)
+
+
+def check_fused_args(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> None:
+    """Refuse ``--fused`` sans les étapes 1 à 3 ou avec ``--resume``.
+
+    Raises:
+        SystemExit: Code 2 (``parser.error``) si la combinaison est invalide.
+
+    """
+    if not args.fused:
+        return
+    if not set(FUSED_STEPS) <= set(args.steps):
+        parser.error("--fused requiert les étapes 1 à 3 (ex : 1-3 ou 1-4)")
+    if args.resume:
+        parser.error("--resume n'est pas disponible avec --fused")
+
+
+def run_fused(idx: int, total: int) -> None:
+    """Exécute les étapes 1 à 3 en une passe avec ``report_to_json.py``.
+
+    Args:
+        idx: Rang de l'étape fusionnée dans l'exécution (pour l'affichage).
+        total: Nombre d'étapes de l'exécution.
+
+    """
+    print(f"[{idx}/{total}] Nettoyage, reformatage COPT et conversion JSON...")
+    LOGGER.info(
+        "[%d/%d] Moteur fusionné : '%s' → '%s'.",
+        idx,
+        total,
+        VLM_INPUT,
+        FINAL_JSON,
+    )
+    run_step(
+        [
+            sys.executable,
+            str(SRC_DIR / "report_to_json.py"),
+            "-f",
+            str(VLM_INPUT),
+            "-o",
+            str(FINAL_JSON),
+            "-e",
+            "iso8859-1",
+            "-w",
+            str(WORKERS),
+            "--ignored-file",
+            str(COPT_IGNORED),
+        ],
+        step_num=1,
+        label="report_to_json.py",
+    )
+
+
 def run_step(cmd: list[str], step_num: int, label: str) -> None:
     """Exécute une commande subprocess et interrompt le pipeline en cas d'échec.
 
@@ -191,12 +288,40 @@ def run_step(cmd: list[str], step_num: int, label: str) -> None:
     LOGGER.info("Étape %d (%s) terminée avec succès.", step_num, label)
 
 
+def extract_options() -> list[str]:
+    """Retourne les options de l'étape 4 qui dépendent de la configuration.
+
+    L'archive ``copt_archive`` éventuelle est supprimée au préalable :
+    comme pour le CSV, ``extract_copt.py`` refuse de l'écraser.
+    """
+    options = ["-t", str(IO_THREADS)]
+    if COPT_ARCHIVE is not None:
+        if COPT_ARCHIVE.exists():
+            LOGGER.debug(
+                "Suppression de l'archive existante : '%s'.", COPT_ARCHIVE
+            )
+            COPT_ARCHIVE.unlink()
+        options += ["-a", str(COPT_ARCHIVE)]
+    return options
+
+
 def main() -> None:
     """Point d'entrée principal du pipeline."""
     parser = build_parser()
     args = parser.parse_args()
+    check_fused_args(parser, args)
     steps: list[int] = args.steps
 
+    if COMPRESSION not in COMPRESSION_CHOICES:
+        LOGGER.error(
+            "Valeur 'compression' invalide dans config.toml : '%s' "
+            "(attendu : %s).",
+            COMPRESSION,
+            ", ".join(repr(c) for c in COMPRESSION_CHOICES),
+        )
+        print(f"Erreur : compression '{COMPRESSION}' invalide (config.toml)")
+        sys.exit(2)
+
     LOGGER.info(
         "Démarrage du pipeline — étapes %s : entrée='%s', JSON='%s', COPT='%s'.",
         steps,
@@ -205,10 +330,14 @@ def main() -> None:
         COPT_CSV,
     )
 
-    total = len(steps)
+    # Les étapes 1 à 3 fusionnées comptent pour une seule à l'affichage.
+    total = len(steps) - (len(FUSED_STEPS) - 1 if args.fused else 0)
+
+    if args.fused:
+        run_fused(1, total)
 
     # --- Étape 1 : Nettoyage du rapport VLM ---
-    if 1 in steps:
+    if 1 in steps and not args.fused:
         idx = steps.index(1) + 1
         print(f"[{idx}/{total}] Nettoyage du rapport VLM...")
         LOGGER.info(
@@ -224,13 +353,16 @@ def main() -> None:
                 str(CLEAN_XML),
                 "-e",
                 "iso8859-1",
+                "-w",
+                str(WORKERS),
+                *(["--resume"] if args.resume else []),
             ],
             step_num=1,
             label="clean_report.py",
         )
 
     # --- Étape 2 : Reformatage des balises COPT ---
-    if 2 in steps:
+    if 2 in steps and not args.fused:
         idx = steps.index(2) + 1
         print(f"[{idx}/{total}] Reformatage des balises Copt...")
         LOGGER.info(
@@ -250,6 +382,8 @@ def main() -> None:
                 str(COPT_XML),
                 "-e",
                 "utf-8",
+                "-w",
+                str(WORKERS),
                 "--ignored-file",
                 str(COPT_IGNORED),
             ],
@@ -258,7 +392,7 @@ def main() -> None:
         )
 
     # --- Étape 3 : Conversion XML → JSON ---
-    if 3 in steps:
+    if 3 in steps and not args.fused:
         idx = steps.index(3) + 1
         print(f"[{idx}/{total}] Conversion XML → JSON...")
         LOGGER.info(
@@ -278,6 +412,8 @@ def main() -> None:
                 str(FINAL_JSON),
                 "-e",
                 "utf-8",
+                "-w",
+                str(WORKERS),
             ],
             step_num=3,
             label="build_json.py",
@@ -285,7 +421,7 @@ def main() -> None:
 
     # --- Étape 4 : Extraction COPT par CSECT → CSV ---
     if 4 in steps:
-        idx = steps.index(4) + 1
+        idx = total
         print(f"[{idx}/{total}] Extraction des options COPT par CSECT...")
         LOGGER.info(
             "[%d/%d] Extraction : '%s' → '%s'.",
@@ -306,6 +442,7 @@ def main() -> None:
                 str(FINAL_JSON),
                 "-o",
                 str(COPT_CSV),
+                *extract_options(),
             ],
             step_num=4,
             label="extract_copt.py",
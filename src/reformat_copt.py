@@ -23,7 +23,9 @@ Les pseudo-options `LEINFO`/`NON-LEINFO` peuvent être:
 - conservées (`keep`),
 - supprimées (`remove`),
 - remplacées par `LEINFO=(N)` avec traçabilité dans un fichier annexe
-    (`placeholder`).
+    (`placeholder`),
+- remplacées par `LEINFO=(<empreinte>)`, chaque contenu distinct n'étant
+    écrit qu'une fois dans le fichier annexe (`hash`).
 
 Exemple:
 python src/reformat_copt.py -f datas/clean_vlm.xml -o datas/clean_vlm_copt.xml
@@ -32,18 +34,106 @@ python src/reformat_copt.py -f datas/clean_vlm.xml -o datas/clean_vlm_copt.xml
 from __future__ import annotations
 
 import argparse
+import codecs
+import functools
+import hashlib
+import io
+import itertools
 import logging
 import re
 import sys
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import TextIO
-
-from utils import load_config, setup_logging
+from typing import IO, TextIO, cast
+from xml.sax.saxutils import escape
+
+from copt_lexer import split_leinfo, split_options, squeeze_token
+from utils import (
+    COMPRESSION_ERRORS,
+    is_ascii_compatible,
+    load_config,
+    open_binary,
+    resolve_workers,
+    setup_logging,
+    split_vlm_chunks,
+)
 
 LOGGER = logging.getLogger("reformat_copt")
-LEINFO_HEAD_RE = re.compile(r"(?:NON-)?LEINFO=\(", re.IGNORECASE)
+
+# Nombre de `Copt@Val` distincts mémorisés par `compile_copt_value()`. Les
+# CSECTs d'une même loadlib partagent le plus souvent la même chaîne.
+COPT_CACHE_SIZE = 4096
+
+# Emplacement d'un numéro de placeholder dans un `CoptTemplate` (U+0000 ne
+# peut pas figurer dans un document XML).
+_SLOT = "\x00"
+
+# Traitements des `LEINFO` (`--leinfo-mode`) ; `placeholder` et `hash`
+# écrivent le fichier annexe `--ignored-file`.
+LEINFO_MODES = ("placeholder", "hash", "remove", "keep")
+TRACED_LEINFO_MODES = ("placeholder", "hash")
+
+# Longueur (en caractères hexadécimaux) de l'empreinte SHA-256 des `LEINFO`
+# en mode `hash` : 64 bits, sans collision réaliste sur un rapport.
+LEINFO_HASH_LENGTH = 16
+
+# Token `LEINFO` qui est déjà un placeholder (numéro ou empreinte).
+_PLACEHOLDER_RE = re.compile(r"(?:NON-)?LEINFO=\([0-9a-f]+\)")
+
+# Modes de traitement : `stream` (flux, mémoire bornée), `tree` (arbre
+# complet en mémoire, `ET.parse` puis `tree.write`) ou `splice` (seuls les
+# `Copt@Val` sont réécrits, le reste du fichier est recopié tel quel).
+ENGINES = ("stream", "tree", "splice")
+
+# Profondeur de <root> et de ses enfants (<vlm>) dans le document.
+_ROOT_DEPTH = 1
+_CHILD_DEPTH = 2
+
+# Taille des tranches transmises à l'analyseur en flux : borne le nombre
+# d'éléments créés avant leur traitement.
+_FEED_SIZE = 1024 * 1024
+
+# Déclaration écrite par `tree.write(encoding="utf-8")`.
+_XML_DECLARATION = b"<?xml version='1.0' encoding='utf-8'?>\n"
+
+# Mode `--workers` : nombre de morceaux en attente par processus (mémoire
+# bornée).
+_PENDING_PER_WORKER = 2
+
+# Moteur `splice` : balises repérées dans les octets bruts. Commentaires,
+# sections CDATA et instructions de traitement sont reconnus pour que leur
+# contenu ne soit jamais réécrit ; coupés par la fin du tampon, seule leur
+# ouverture est reconnue. Une balise `Copt` sans `Val` est seulement comptée.
+_SPLICE_RE = re.compile(
+    rb"<(?:!--(?:.*?-->)?|!\[CDATA\[(?:.*?\]\]>)?|\?(?:.*?\?>)?"
+    rb"|Copt(?:\s+[^\s=/>]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*?"
+    rb"\s+Val\s*=\s*(?:\"(?P<dq>[^\"]*)\"|'(?P<sq>[^']*)')"
+    rb"|(?P<bare>Copt)(?:\s+[^\s=/>]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*\s*/?>)",
+    re.DOTALL,
+)
+_SPLICE_CLOSERS = (b"-->", b"]]>", b"?>")
+
+# Normalisation XML d'une valeur d'attribut : blancs littéraux → espace
+# (table d'octets, valable pour un encodage compatible ASCII).
+_ATTRIBUTE_BLANKS = bytes.maketrans(b"\t\n\r", b"   ")
+_ENTITY_RE = re.compile(r"&(#x[0-9A-Fa-f]+|#[0-9]+|[A-Za-z_][\w.-]*);")
+_PREDEFINED_ENTITIES = {
+    "lt": "<",
+    "gt": ">",
+    "amp": "&",
+    "quot": '"',
+    "apos": "'",
+}
+# Échappements d'une valeur réécrite, selon le délimiteur d'origine.
+_NEEDS_ESCAPE_RE = re.compile(r"[&<>\"'\t\n\r]")
+_ATTRIBUTE_ESCAPES = {
+    b'"': {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"},
+    b"'": {"'": "&apos;", "\n": "&#10;", "\r": "&#13;", "\t": "&#9;"},
+}
 
 
 @dataclass
@@ -55,12 +145,27 @@ class ReformatStats:
         modified_copt: Nombre de balises dont `Val` a été modifié.
         empty_after_reformat: Nombre de `Val` devenus vides après nettoyage.
         leinfo_replaced: Nombre total de `LEINFO`/`NON-LEINFO` traités.
+        worker_cache_hits: Succès du cache de `compile_copt_value()` dans
+            les processus de `--workers`, que le cache du processus
+            principal ne voit pas.
+        worker_cache_misses: Échecs de ce même cache.
     """
 
     total_copt: int = 0
     modified_copt: int = 0
     empty_after_reformat: int = 0
     leinfo_replaced: int = 0
+    worker_cache_hits: int = 0
+    worker_cache_misses: int = 0
+
+    def add(self, other: ReformatStats) -> None:
+        """Ajoute les métriques de `other` (morceau traité à part)."""
+        for metric in fields(self):
+            setattr(
+                self,
+                metric.name,
+                getattr(self, metric.name) + getattr(other, metric.name),
+            )
 
 
 @dataclass
@@ -69,9 +174,20 @@ class ReformatState:
 
     Le compteur `leinfo_counter` est global à l'exécution afin de garantir
     des identifiants uniques pour les placeholders `LEINFO=(N)`.
+
+    En mode `hash`, `leinfo_hashes` contient les empreintes déjà présentes
+    dans le fichier annexe : chaque contenu n'y est écrit qu'une fois.
+
+    Dans un processus de `--workers`, `deferred` reçoit les tokens à tracer
+    et leurs placeholders portent `_SLOT` : le processus principal les
+    numérote ensuite dans l'ordre du document. `deferred_checks` note les
+    `Copt` dont la valeur pourrait, une fois numérotée, être inchangée.
     """
 
     leinfo_counter: int = 0
+    leinfo_hashes: set[str] = field(default_factory=set)
+    deferred: list[str] | None = None
+    deferred_checks: list[tuple[int, str, str]] = field(default_factory=list)
 
 
 def parse_args() -> argparse.Namespace:
@@ -110,16 +226,17 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--ignored-file",
         required=True,
-        help="File used to persist original LEINFO/NON-LEINFO when using placeholder mode.",
+        help="File used to persist original LEINFO/NON-LEINFO when using placeholder or hash mode.",
     )
     parser.add_argument(
         "--leinfo-mode",
         required=False,
         default="placeholder",
-        choices=["placeholder", "remove", "keep"],
+        choices=LEINFO_MODES,
         help=(
-            "LEINFO handling: placeholder=LEINFO=(N), remove=drop LEINFO token, "
-            "keep=keep original token"
+            "LEINFO handling: placeholder=LEINFO=(N), hash=LEINFO=(<hash>) "
+            "with each distinct token stored once, remove=drop LEINFO "
+            "token, keep=keep original token"
         ),
     )
     parser.add_argument(
@@ -127,68 +244,33 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Append ignored-file instead of truncating it at start",
     )
-    return parser.parse_args()
-
-
-def normalize_whitespace(val: str) -> str:
-    """Normalise tous les blancs (espace, tabulation, saut de ligne).
-
-    Args:
-        val: Valeur brute de `Copt@Val`.
-
-    Returns:
-        Une chaîne avec un seul espace entre les éléments.
-
-    """
-    return re.sub(r"\s+", " ", val).strip()
-
-
-def _consume_balanced_parentheses(text: str, open_index: int) -> int:
-    """Trouve la parenthèse fermante qui correspond à `text[open_index]`.
-
-    Args:
-    text: Chaîne source complète.
-    open_index: Position de la parenthèse ouvrante `(`.
-
-    Returns:
-    L'index juste après la parenthèse fermante correspondante.
-    Si la fermeture est introuvable, renvoie `len(text)`.
-
-    """
-    depth = 0
-    idx = open_index
-    while idx < len(text):
-        ch = text[idx]
-        if ch == "(":
-            depth += 1
-        elif ch == ")":
-            depth -= 1
-            if depth == 0:
-                return idx + 1
-        idx += 1
-    return len(text)
-
-
-def _extract_leinfo_token_at(
-    text: str, start_index: int
-) -> tuple[str, int] | None:
-    """Extrait `LEINFO`/`NON-LEINFO` à partir d'un index donné.
-
-    Args:
-        text: Chaîne d'origine.
-        start_index: Position où tenter la détection.
+    parser.add_argument(
+        "--engine",
+        required=False,
+        default="stream",
+        choices=ENGINES,
+        help=(
+            "Processing engine: stream=one <vlm> at a time, bounded memory; "
+            "tree=whole document in memory; splice=rewrite Copt@Val in "
+            "place, copy every other byte unchanged (default: stream)"
+        ),
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Worker processes for the stream engine "
+            "(default: 1 = sequential, 0 = one per core)"
+        ),
+    )
+    args = parser.parse_args()
+    if args.workers != 1 and args.engine != "stream":
+        parser.error("--workers requires --engine stream")
+    return args
 
-    Returns:
-        `(token, end_index)` si un token est détecté.
-        `None` sinon.
 
-    """
-    match = LEINFO_HEAD_RE.match(text, start_index)
-    if not match:
-        return None
-    open_index = match.end() - 1
-    end_index = _consume_balanced_parentheses(text, open_index)
-    return text[start_index:end_index], end_index
 
 
 def replace_leinfo_with_placeholder(
@@ -203,15 +285,18 @@ def replace_leinfo_with_placeholder(
     - `keep`: conserve les tokens sans modification.
     - `remove`: supprime entièrement ces tokens.
     - `placeholder`: remplace par `LEINFO=(N)` ou `NON-LEINFO=(N)`.
+    - `hash`: remplace par `LEINFO=(<empreinte>)` ou
+      `NON-LEINFO=(<empreinte>)`.
 
-    En mode `placeholder`, la valeur originale est écrite dans
+    En mode `placeholder` ou `hash`, la valeur originale est écrite dans
     `ignored_writer` pour permettre une résolution ultérieure.
 
     Args:
         val: Valeur `Copt@Val` brute.
         state: État global contenant le compteur des placeholders.
         ignored_writer: Flux texte pour tracer les valeurs remplacées.
-        mode: Mode de traitement (`keep`, `remove`, `placeholder`).
+        mode: Mode de traitement (`keep`, `remove`, `placeholder`,
+            `hash`).
 
     Returns:
         Un tuple `(valeur_transformée, nombre_de_remplacements)`.
@@ -220,93 +305,91 @@ def replace_leinfo_with_placeholder(
     if mode == "keep":
         return val, 0
 
-    out: list[str] = []
-    idx = 0
-    replacements = 0
+    segments, leinfo_tokens = split_leinfo(val)
+    if leinfo_tokens and mode not in (*TRACED_LEINFO_MODES, "remove"):
+        raise ValueError(f"Unsupported leinfo mode: {mode}")
+
+    out = [segments[0]]
+    for original_token, segment in zip(
+        leinfo_tokens, segments[1:], strict=True
+    ):
+        if mode in TRACED_LEINFO_MODES:
+            leinfo_id = store_leinfo(
+                original_token, state, ignored_writer, mode
+            )
+            out.append(leinfo_placeholder(original_token, leinfo_id))
+        # En mode `remove`, le token LEINFO/NON-LEINFO est supprimé.
+        out.append(segment)
 
-    while idx < len(val):
-        extracted = _extract_leinfo_token_at(val, idx)
-        if extracted is None:
-            out.append(val[idx])
-            idx += 1
-            continue
+    return "".join(out), len(leinfo_tokens)
 
-        original_token, end_index = extracted
-        replacements += 1
 
-        if mode == "placeholder":
-            state.leinfo_counter += 1
-            num = state.leinfo_counter
-            if ignored_writer is not None:
-                ignored_writer.write(f"{num}\t{original_token}\n")
-            if original_token.upper().startswith("NON-LEINFO="):
-                out.append(f"NON-LEINFO=({num})")
-            else:
-                out.append(f"LEINFO=({num})")
-        elif mode == "remove":
-            # Supprime totalement le token LEINFO/NON-LEINFO.
-            pass
-        else:
-            raise ValueError(f"Unsupported leinfo mode: {mode}")
+def leinfo_digest(original_token: str) -> str:
+    """Retourne l'empreinte courte (SHA-256 tronqué) d'un token `LEINFO`."""
+    digest = hashlib.sha256(original_token.encode("utf-8")).hexdigest()
+    return digest[:LEINFO_HASH_LENGTH]
 
-        idx = end_index
 
-    return "".join(out), replacements
+def store_leinfo(
+    original_token: str,
+    state: ReformatState,
+    ignored_writer: TextIO | None,
+    mode: str,
+) -> str:
+    """Trace un token `LEINFO` et retourne l'identifiant de son placeholder.
 
+    - `placeholder`: numéro `N` suivant du compteur global, une ligne
+      `N<TAB>VALEUR` par occurrence.
+    - `hash`: empreinte du contenu, une ligne `EMPREINTE<TAB>VALEUR` à la
+      première occurrence seulement. L'identifiant ne dépend pas de
+      l'ordre de traitement.
 
-def tokenize_options(val: str) -> list[str]:
-    """Découpe une chaîne d'options en respectant les parenthèses imbriquées.
+    Si `state.deferred` est défini (processus de `--workers`), le token y
+    est seulement mis de côté et l'identifiant retourné est `_SLOT`.
+    """
+    if state.deferred is not None:
+        state.deferred.append(original_token)
+        return _SLOT
+    if mode == "hash":
+        leinfo_id = leinfo_digest(original_token)
+        if leinfo_id in state.leinfo_hashes:
+            return leinfo_id
+        state.leinfo_hashes.add(leinfo_id)
+    else:
+        state.leinfo_counter += 1
+        leinfo_id = str(state.leinfo_counter)
+    if ignored_writer is not None:
+        ignored_writer.write(f"{leinfo_id}\t{original_token}\n")
+    return leinfo_id
+
+
+def load_leinfo_hashes(ignored_path: Path) -> set[str]:
+    """Retourne les empreintes déjà présentes dans un fichier annexe.
+
+    Utilisé avec `--append-ignored` en mode `hash` : un contenu déjà tracé
+    par une exécution précédente n'est pas réécrit. Les lignes numérotées
+    du mode `placeholder` sont ignorées.
+    """
+    if not ignored_path.is_file():
+        return set()
+    hashes: set[str] = set()
+    with ignored_path.open(encoding="utf-8") as f_in:
+        for line in f_in:
+            leinfo_id, sep, _ = line.partition("\t")
+            if sep and len(leinfo_id) == LEINFO_HASH_LENGTH:
+                hashes.add(leinfo_id)
+    return hashes
+
+
+def leinfo_placeholder(original_token: str, num: str) -> str:
+    """Retourne `LEINFO=(num)` ou `NON-LEINFO=(num)` selon le token."""
+    if original_token.upper().startswith("NON-LEINFO="):
+        return f"NON-LEINFO=({num})"
+    return f"LEINFO=({num})"
 
-    Principe:
-    - un espace coupe le token uniquement quand `depth == 0`,
-    - dans `OPTION(A, B)`, l'espace après la virgule est donc conservé dans
-      le même token jusqu'à l'étape de normalisation fine.
 
-    Args:
-        val: Chaîne d'options déjà normalisée en espaces.
 
-    Returns:
-        La liste des tokens d'options.
 
-    """
-    tokens: list[str] = []
-    current: list[str] = []
-    depth = 0
-
-    for ch in val:
-        if ch == "(":
-            depth += 1
-            current.append(ch)
-            continue
-
-        if ch == ")":
-            if depth > 0:
-                depth -= 1
-            current.append(ch)
-            continue
-
-        if ch == " " and depth == 0:
-            token = "".join(current).strip()
-            if token:
-                tokens.append(token)
-            current = []
-            continue
-
-        current.append(ch)
-
-    token = "".join(current).strip()
-    if token:
-        tokens.append(token)
-    return tokens
-
-
-def normalize_token(token: str) -> str:
-    """Supprime les espaces inutiles après virgule dans les parenthèses.
-
-    Exemple:
-        `CSECT(CODE, ACCPRINT)` devient `CSECT(CODE,ACCPRINT)`.
-    """
-    return re.sub(r",\s+", ",", token)
 
 
 def reformat_copt_value(
@@ -324,6 +407,10 @@ def reformat_copt_value(
     4. normaliser chaque token,
     5. reconstruire une chaîne à espaces simples.
 
+    Les étapes 2 à 5 sont mémorisées par `compile_copt_value()`, hors
+    contenu des `LEINFO` : seule la numérotation des placeholders est
+    refaite à chaque occurrence.
+
     Args:
         raw_val: Valeur originale de l'attribut `Val`.
         state: État partagé du traitement.
@@ -334,16 +421,138 @@ def reformat_copt_value(
         `(valeur_reformatée, nombre_de_leinfo_traites)`.
 
     """
-    value, replacements = replace_leinfo_with_placeholder(
-        val=raw_val,
+    if leinfo_mode == "keep":
+        return compile_copt_value(raw_val).render(), 0
+
+    segments, leinfo_tokens = split_leinfo(raw_val)
+    if leinfo_tokens and leinfo_mode not in (*TRACED_LEINFO_MODES, "remove"):
+        raise ValueError(f"Unsupported leinfo mode: {leinfo_mode}")
+
+    # Clé du cache : `raw_val` dont chaque LEINFO est remplacé par son
+    # placeholder non numéroté (ou supprimé en mode `remove`).
+    traced = leinfo_mode in TRACED_LEINFO_MODES
+    key = [segments[0]]
+    for original_token, segment in zip(
+        leinfo_tokens, segments[1:], strict=True
+    ):
+        if traced:
+            key.append(leinfo_placeholder(original_token, _SLOT))
+        key.append(segment)
+    template = compile_copt_value("".join(key))
+    if not traced:
+        return template.render(), len(leinfo_tokens)
+
+    leinfo_ids = [
+        store_leinfo(original_token, state, ignored_writer, leinfo_mode)
+        for original_token in leinfo_tokens
+    ]
+    return template.render(leinfo_ids), len(leinfo_tokens)
+
+
+@dataclass(frozen=True)
+class CoptTemplate:
+    """`Copt@Val` reformaté, avec un emplacement par placeholder `LEINFO`.
+
+    Attributs:
+        parts: Texte reformaté, découpé aux emplacements des identifiants
+            `N` de `LEINFO=(N)` (un élément de plus que de placeholders).
+    """
+
+    parts: tuple[str, ...]
+
+    def render(self, numbers: Iterable[str] = ()) -> str:
+        """Insère les identifiants des placeholders, dans l'ordre."""
+        if len(self.parts) == 1:
+            return self.parts[0]
+        out = [self.parts[0]]
+        for num, part in zip(numbers, self.parts[1:], strict=True):
+            out.append(num)
+            out.append(part)
+        return "".join(out)
+
+
+@functools.lru_cache(maxsize=COPT_CACHE_SIZE)
+def compile_copt_value(value: str) -> CoptTemplate:
+    """Normalise, tokenise et reconstruit `value` (étapes 2 à 5, cache LRU).
+
+    `value` est un `Copt@Val` dont les `LEINFO` ont déjà été traités, les
+    placeholders portant `_SLOT` au lieu de leur numéro : deux valeurs qui
+    ne diffèrent que par le contenu de leurs `LEINFO` partagent donc la
+    même entrée. Ni les blancs, ni les parenthèses, ni les virgules ne
+    touchent `_SLOT` ; le résultat est découpé à chaque `_SLOT`.
+
+    Args:
+        value: Valeur à reformater, placeholders non numérotés.
+
+    Returns:
+        Le gabarit à numéroter par `CoptTemplate.render()`.
+
+    """
+    # Lexeur commun : `squeeze_token()` réduit les blancs internes de
+    # chaque option à un espace et supprime ceux qui suivent une virgule.
+    normalized = " ".join(split_options(value, squeeze_token))
+    return CoptTemplate(parts=tuple(normalized.split(_SLOT)))
+
+
+def reformat_copt_element(
+    copt_elem: ET.Element,
+    state: ReformatState,
+    ignored_writer: TextIO | None,
+    leinfo_mode: str,
+    stats: ReformatStats,
+) -> None:
+    """Reformate en place le `Val` d'une balise `Copt` et met à jour `stats`.
+
+    Appelée dans l'ordre du document, par `reformat_tree()` comme par le
+    moteur fusionné `report_to_json.py` : les numéros de placeholders
+    `LEINFO=(N)` sont donc identiques dans les deux cas.
+    """
+    stats.total_copt += 1
+    original_val = copt_elem.get("Val")
+
+    if original_val is None:
+        return
+
+    reformatted_val, replacements = reformat_copt_value(
+        raw_val=original_val,
         state=state,
         ignored_writer=ignored_writer,
-        mode=leinfo_mode,
+        leinfo_mode=leinfo_mode,
     )
-    value = normalize_whitespace(value)
-    tokens = tokenize_options(value)
-    normalized_tokens = [normalize_token(t) for t in tokens]
-    return " ".join(normalized_tokens), replacements
+    stats.leinfo_replaced += replacements
+
+    if reformatted_val != original_val:
+        copt_elem.set("Val", reformatted_val)
+        stats.modified_copt += 1
+        if state.deferred is not None and _SLOT in reformatted_val:
+            _defer_check(state, state.deferred, original_val, reformatted_val)
+
+    if not reformatted_val:
+        stats.empty_after_reformat += 1
+
+
+def _defer_check(
+    state: ReformatState,
+    deferred: list[str],
+    original_val: str,
+    slotted_val: str,
+) -> None:
+    """Note un `Copt` que la numérotation différée pourrait laisser inchangé.
+
+    Seul un `Val` dont les `LEINFO` sont déjà des placeholders (relecture
+    d'un XML reformaté) peut l'être : les autres ne sont pas notés.
+    """
+    first = len(deferred) - slotted_val.count(_SLOT)
+    if all(_PLACEHOLDER_RE.fullmatch(token) for token in deferred[first:]):
+        state.deferred_checks.append((first, original_val, slotted_val))
+
+
+def log_stats(stats: ReformatStats, logger: logging.Logger) -> None:
+    """Journalise les métriques de reformattage en DEBUG."""
+    logger.debug("Total Copt processed: %d", stats.total_copt)
+    logger.debug("Copt modified: %d", stats.modified_copt)
+    logger.debug("LEINFO/NON-LEINFO replaced: %d", stats.leinfo_replaced)
+    logger.debug("Copt empty after reformat: %d", stats.empty_after_reformat)
 
 
 def reformat_tree(
@@ -351,42 +560,654 @@ def reformat_tree(
     leinfo_mode: str,
     ignored_writer: TextIO | None,
     logger: logging.Logger,
+    state: ReformatState | None = None,
 ) -> ReformatStats:
     """Reformate en place tous les `Copt@Val` de l'arbre XML.
 
     Cette fonction parcourt les balises `.//Copt`, applique le pipeline
     de reformattage, met à jour l'attribut `Val` si nécessaire, puis
-    agrège les statistiques de traitement.
+    agrège les statistiques de traitement. `state` permet de reprendre
+    les empreintes d'un fichier annexe existant (mode `hash`).
     """
     stats = ReformatStats()
-    state = ReformatState()
+    state = state or ReformatState()
 
     for copt_elem in tree.findall(".//Copt"):
-        stats.total_copt += 1
-        original_val = copt_elem.get("Val")
+        reformat_copt_element(
+            copt_elem, state, ignored_writer, leinfo_mode, stats
+        )
+
+    log_stats(stats, logger)
+    return stats
 
-        if original_val is None:
-            continue
 
-        reformatted_val, replacements = reformat_copt_value(
-            raw_val=original_val,
-            state=state,
-            ignored_writer=ignored_writer,
-            leinfo_mode=leinfo_mode,
+def _serialize_root(root: ET.Element, text: str | None) -> str:
+    """Sérialise la racine sans ses enfants, attributs compris, comme `write()`.
+
+    Avec un texte, même vide, la balise fermante est écrite séparément :
+    l'appelant peut la retirer pour ne garder que l'ouverture et le texte.
+    """
+    shell = ET.Element(root.tag, root.attrib)
+    shell.text = text
+    return ET.tostring(
+        shell, encoding="unicode", short_empty_elements=text is None
+    )
+
+
+class CoptXmlWriter:
+    """Réécrit le XML reformaté au fil de l'eau, comme `tree.write()`.
+
+    `ElementTree.write` sérialise la racine, son texte, puis chaque enfant
+    suivi de sa « queue » (`tail`, texte jusqu'à l'enfant suivant). La
+    queue d'un enfant n'est connue qu'à l'ouverture du suivant : l'enfant
+    est donc gardé en attente jusque-là.
+    """
+
+    def __init__(self, f_out: IO[bytes]) -> None:
+        """Écrit la déclaration XML dans `f_out`."""
+        self._f_out = f_out
+        self._pending: ET.Element | None = None
+        self._opened = False
+        f_out.write(_XML_DECLARATION)
+
+    def child_started(self, root: ET.Element) -> None:
+        """Un enfant de la racine commence : écrit ce qui précède."""
+        if not self._opened:
+            start_tag = _serialize_root(root, root.text or "").removesuffix(
+                f"</{root.tag}>"
+            )
+            self._f_out.write(start_tag.encode())
+            self._opened = True
+        self._flush()
+
+    def child_ended(self, child: ET.Element) -> None:
+        """Un enfant de la racine est complet : attend sa queue."""
+        self._pending = child
+
+    def root_ended(self, root: ET.Element) -> None:
+        """Fin du document : écrit le dernier enfant et ferme la racine."""
+        if not self._opened:
+            self._f_out.write(_serialize_root(root, root.text or None).encode())
+            return
+        self._flush()
+        self._f_out.write(f"</{root.tag}>".encode())
+
+    def _flush(self) -> None:
+        if self._pending is not None:
+            # tostring() inclut la queue de l'élément, comme write().
+            self._f_out.write(
+                ET.tostring(self._pending, encoding="unicode").encode()
+            )
+            self._pending = None
+
+
+class VlmStream:
+    """Analyseur incrémental du XML nettoyé, un bloc `<vlm>` à la fois.
+
+    `on_copt` est appliquée à chaque `<Copt>` dès sa fermeture, dans
+    l'ordre du document. Les enfants de `<root>` en sont détachés dès
+    qu'ils sont complets : seul le bloc courant reste en mémoire.
+    """
+
+    def __init__(
+        self,
+        on_copt: Callable[[ET.Element], None],
+        copt_writer: CoptXmlWriter | None = None,
+    ) -> None:
+        """Prépare l'analyseur (événements d'ouverture et de fermeture)."""
+        self._parser: ET.XMLPullParser[ET.Element] = ET.XMLPullParser(
+            events=("start", "end")
+        )
+        self._on_copt = on_copt
+        self._copt_writer = copt_writer
+        self._root: ET.Element | None = None
+        self._depth = 0
+
+    def feed(self, chunk: bytes | str) -> Iterator[ET.Element]:
+        """Analyse un morceau et produit les `<vlm>` qu'il complète.
+
+        Le morceau est transmis par tranches de `_FEED_SIZE` : les éléments
+        d'une tranche sont libérés avant l'analyse de la suivante. Un
+        morceau `str` est analysé comme de l'UTF-8, quel que soit
+        l'encodage déclaré (même effet que `XMLParser(encoding=...)`).
+        """
+        for start in range(0, len(chunk), _FEED_SIZE):
+            self._parser.feed(chunk[start : start + _FEED_SIZE])
+            yield from self._events()
+
+    def close(self) -> Iterator[ET.Element]:
+        """Termine l'analyse (lève `ET.ParseError` si le XML est incomplet)."""
+        self._parser.close()
+        return self._events()
+
+    @property
+    def root_tag(self) -> str | None:
+        """Balise de la racine, dès son ouverture (`None` avant)."""
+        return self._root.tag if self._root is not None else None
+
+    def _events(self) -> Iterator[ET.Element]:
+        events = cast(
+            "Iterator[tuple[str, ET.Element]]", self._parser.read_events()
         )
-        stats.leinfo_replaced += replacements
+        for event, elem in events:
+            if event == "start":
+                self._start(elem)
+            elif (vlm := self._end(elem)) is not None:
+                yield vlm
+
+    def _start(self, elem: ET.Element) -> None:
+        self._depth += 1
+        if self._depth == _ROOT_DEPTH:
+            self._root = elem
+        elif (
+            self._depth == _CHILD_DEPTH
+            and self._copt_writer is not None
+            and self._root is not None
+        ):
+            self._copt_writer.child_started(self._root)
+
+    def _end(self, elem: ET.Element) -> ET.Element | None:
+        self._depth -= 1
+        if elem.tag == "Copt":
+            self._on_copt(elem)
+        if self._depth == 0:
+            if self._copt_writer is not None:
+                self._copt_writer.root_ended(elem)
+            return None
+        if self._depth != _ROOT_DEPTH or self._root is None:
+            return None
+        self._root.remove(elem)
+        if self._copt_writer is not None:
+            self._copt_writer.child_ended(elem)
+        return elem if elem.tag == "vlm" else None
+
+
+def iter_vlm_elements(
+    chunks: Iterable[bytes | str],
+    on_copt: Callable[[ET.Element], None],
+    copt_writer: CoptXmlWriter | None = None,
+) -> Iterator[ET.Element]:
+    """Analyse le XML en flux et produit chaque `<vlm>` complet.
 
-        if reformatted_val != original_val:
-            copt_elem.set("Val", reformatted_val)
-            stats.modified_copt += 1
+    Args:
+        chunks: Morceaux successifs du XML (octets, ou texte déjà décodé).
+        on_copt: Traitement d'une balise `<Copt>` (reformatage en place).
+        copt_writer: Réécriture facultative du XML reformaté.
 
-        if not reformatted_val:
-            stats.empty_after_reformat += 1
+    Yields:
+        Les éléments `<vlm>` fils de la racine, dans l'ordre du document.
 
-    logger.debug("Total Copt processed: %d", stats.total_copt)
-    logger.debug("Copt modified: %d", stats.modified_copt)
-    logger.debug("LEINFO/NON-LEINFO replaced: %d", stats.leinfo_replaced)
-    logger.debug("Copt empty after reformat: %d", stats.empty_after_reformat)
+    Raises:
+        ET.ParseError: Si le XML est mal formé.
+
+    """
+    stream = VlmStream(on_copt, copt_writer)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+def _decode(data: bytes, encoding: str) -> str:
+    """Décode un morceau complet ; un octet invalide lève `ET.ParseError`."""
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError as exc:
+        raise ET.ParseError(f"invalid {encoding} data: {exc}") from exc
+
+
+def _iter_decoded(f_in: IO[bytes], encoding: str) -> Iterator[str]:
+    """Lit `f_in` par blocs de `_FEED_SIZE` et les décode avec `encoding`.
+
+    Un octet invalide lève `ET.ParseError`, comme avec `XMLParser`.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        while chunk := f_in.read(_FEED_SIZE):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise ET.ParseError(f"invalid {encoding} data: {exc}") from exc
+
+
+def reformat_stream(
+    f_in: IO[bytes],
+    f_out: IO[bytes],
+    encoding: str,
+    leinfo_mode: str,
+    ignored_writer: TextIO | None,
+    logger: logging.Logger,
+    state: ReformatState | None = None,
+) -> ReformatStats:
+    """Reformate un XML en flux, sans construire l'arbre complet.
+
+    Chaque `Copt` est traité par `reformat_copt_element()` à sa fermeture,
+    dans l'ordre du document, puis chaque `<vlm>` terminé est écrit dans
+    `f_out` et libéré. Sortie, statistiques et numérotation `LEINFO=(N)`
+    sont identiques à `reformat_tree()` suivi de `tree.write()` ; la
+    mémoire est bornée par la plus grosse loadlib.
+
+    Args:
+        f_in: XML nettoyé, en binaire.
+        f_out: XML reformaté, en binaire (UTF-8).
+        encoding: Encodage imposé à la lecture (comme `XMLParser`).
+        leinfo_mode: Mode appliqué aux pseudo-options `LEINFO`.
+        ignored_writer: Flux pour tracer les `LEINFO` remplacés.
+        logger: Logger des métriques.
+        state: État initial (empreintes déjà tracées en mode `hash`).
+
+    Returns:
+        Les métriques du traitement.
+
+    Raises:
+        ET.ParseError: Si le XML est mal formé (sortie alors incomplète).
+
+    """
+    stats = ReformatStats()
+    state = state or ReformatState()
+
+    def on_copt(copt_elem: ET.Element) -> None:
+        reformat_copt_element(
+            copt_elem, state, ignored_writer, leinfo_mode, stats
+        )
+
+    writer = CoptXmlWriter(f_out)
+    for _vlm in iter_vlm_elements(
+        _iter_decoded(f_in, encoding), on_copt, writer
+    ):
+        pass
+
+    log_stats(stats, logger)
+    return stats
+
+
+class _HeadWriter(CoptXmlWriter):
+    """Écrit l'en-tête du document sans fermer la racine (mode `--workers`).
+
+    Les blocs `<vlm>` reformatés par les processus sont écrits à la suite,
+    puis la balise fermante de la racine.
+    """
+
+    def root_ended(self, root: ET.Element) -> None:
+        """Ouvre la racine si besoin et écrit le dernier enfant en attente."""
+        self.child_started(root)
+
+
+@dataclass
+class _ChunkResult:
+    """Morceau du XML reformaté par un processus de `--workers`.
+
+    Attributs:
+        body: Blocs `<vlm>` reformatés (UTF-8), l'identifiant de chaque
+            placeholder `LEINFO` remplacé par `_SLOT`.
+        leinfo_tokens: Tokens `LEINFO` à tracer, dans l'ordre de `body`.
+        stats: Métriques du morceau.
+        checks: `ReformatState.deferred_checks` du morceau.
+    """
+
+    body: bytes
+    leinfo_tokens: list[str]
+    stats: ReformatStats
+    checks: list[tuple[int, str, str]]
+
+
+def _reformat_chunk(
+    chunk: bytes,
+    root_tag: str,
+    encoding: str,
+    leinfo_mode: str,
+    *,
+    final: bool,
+) -> _ChunkResult:
+    """Reformate un morceau de `split_vlm_chunks()` (processus de `--workers`).
+
+    Le morceau est analysé comme un document encadré par `<root_tag>` ; le
+    dernier (`final`) contient déjà la balise fermante. Les `LEINFO` ne
+    sont pas numérotés ici mais mis de côté (`ReformatState.deferred`).
+    """
+    open_tag = f"<{root_tag}>"
+    close_tag = f"</{root_tag}>"
+    document = open_tag + _decode(chunk, encoding)
+    if not final:
+        document += close_tag
+
+    cache_before = compile_copt_value.cache_info()
+    stats = ReformatStats()
+    deferred: list[str] = []
+    state = ReformatState(deferred=deferred)
+
+    def on_copt(copt_elem: ET.Element) -> None:
+        reformat_copt_element(copt_elem, state, None, leinfo_mode, stats)
+
+    f_out = io.BytesIO()
+    for _vlm in iter_vlm_elements([document], on_copt, CoptXmlWriter(f_out)):
+        pass
+    start = len(_XML_DECLARATION) + len(open_tag.encode())
+    body = f_out.getvalue()[start : -len(close_tag.encode())]
+    # Le cache du processus sert à plusieurs morceaux : seul l'écart compte.
+    cache_after = compile_copt_value.cache_info()
+    stats.worker_cache_hits = cache_after.hits - cache_before.hits
+    stats.worker_cache_misses = cache_after.misses - cache_before.misses
+    return _ChunkResult(body, deferred, stats, state.deferred_checks)
+
+
+def _iter_chunk_results(
+    pool: ProcessPoolExecutor,
+    chunks: Iterator[bytes],
+    root_tag: str,
+    encoding: str,
+    leinfo_mode: str,
+    max_pending: int,
+) -> Iterator[_ChunkResult]:
+    """Soumet les morceaux au pool et restitue leurs résultats dans l'ordre.
+
+    Au plus `max_pending` morceaux sont en cours : la lecture de l'entrée
+    suit le rythme des processus.
+    """
+    pending: deque[Future[_ChunkResult]] = deque()
+    chunk = next(chunks)
+    for following in itertools.chain(chunks, [None]):
+        pending.append(
+            pool.submit(
+                _reformat_chunk,
+                chunk,
+                root_tag,
+                encoding,
+                leinfo_mode,
+                final=following is None,
+            )
+        )
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        if following is None:
+            break
+        chunk = following
+    while pending:
+        yield pending.popleft().result()
+
+
+def _merge_chunk(
+    result: _ChunkResult,
+    f_out: IO[bytes],
+    state: ReformatState,
+    ignored_writer: TextIO | None,
+    leinfo_mode: str,
+) -> None:
+    """Numérote les `LEINFO` d'un morceau et l'écrit dans `f_out`.
+
+    Les tokens sont tracés par `store_leinfo()` dans l'ordre du document,
+    comme en traitement séquentiel ; les métriques de `result` sont
+    corrigées des `Copt` finalement inchangés.
+    """
+    leinfo_ids = [
+        store_leinfo(token, state, ignored_writer, leinfo_mode)
+        for token in result.leinfo_tokens
+    ]
+    parts = result.body.split(_SLOT.encode())
+    out = [parts[0]]
+    for leinfo_id, part in zip(leinfo_ids, parts[1:], strict=True):
+        out.append(leinfo_id.encode())
+        out.append(part)
+    f_out.write(b"".join(out))
+
+    for first, original_val, slotted_val in result.checks:
+        template = CoptTemplate(parts=tuple(slotted_val.split(_SLOT)))
+        count = len(template.parts) - 1
+        if template.render(leinfo_ids[first : first + count]) == original_val:
+            result.stats.modified_copt -= 1
+
+
+def reformat_parallel(
+    f_in: IO[bytes],
+    f_out: IO[bytes],
+    encoding: str,
+    leinfo_mode: str,
+    ignored_writer: TextIO | None,
+    logger: logging.Logger,
+    workers: int,
+    state: ReformatState | None = None,
+) -> ReformatStats:
+    """Reformate un XML en flux, les blocs `<vlm>` répartis entre processus.
+
+    Le XML est découpé par `split_vlm_chunks()` ; chaque morceau est
+    analysé, reformaté et sérialisé par un processus du pool, puis les
+    résultats sont fusionnés dans l'ordre du document. Seuls l'en-tête,
+    la numérotation des `LEINFO` et le fichier annexe restent dans le
+    processus principal : sortie, statistiques et fichier annexe sont
+    identiques à `reformat_stream()`.
+
+    Args:
+        f_in: XML nettoyé, en binaire (encodage compatible ASCII).
+        f_out: XML reformaté, en binaire (UTF-8).
+        encoding: Encodage imposé à la lecture (comme `XMLParser`).
+        leinfo_mode: Mode appliqué aux pseudo-options `LEINFO`.
+        ignored_writer: Flux pour tracer les `LEINFO` remplacés.
+        logger: Logger des métriques.
+        workers: Nombre de processus.
+        state: État initial (empreintes déjà tracées en mode `hash`).
+
+    Returns:
+        Les métriques du traitement.
+
+    Raises:
+        ET.ParseError: Si le XML est mal formé, ou si un `<vlm>` n'est pas
+            un enfant direct de la racine (sortie alors incomplète).
+
+    """
+    state = state or ReformatState()
+    chunks = split_vlm_chunks(f_in)
+    head = next(chunks)
+    first = next(chunks, None)
+    if first is None:
+        # Aucun bloc `<vlm>` : rien à répartir.
+        return reformat_stream(
+            io.BytesIO(head),
+            f_out,
+            encoding,
+            leinfo_mode,
+            ignored_writer,
+            logger,
+            state,
+        )
+
+    stats = ReformatStats()
+
+    def on_copt(copt_elem: ET.Element) -> None:
+        reformat_copt_element(
+            copt_elem, state, ignored_writer, leinfo_mode, stats
+        )
+
+    # En-tête : déclaration, ouverture de la racine, son texte et les
+    # éventuels enfants qui précèdent le premier `<vlm>`.
+    head_stream = VlmStream(on_copt, _HeadWriter(f_out))
+    for _vlm in head_stream.feed(_decode(head, encoding)):
+        pass
+    root_tag = head_stream.root_tag
+    if root_tag is None:
+        raise ET.ParseError("<vlm> blocks must be children of the root element")
+    for _vlm in head_stream.feed(f"</{root_tag}>"):
+        pass
+    for _vlm in head_stream.close():
+        pass
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in _iter_chunk_results(
+            pool,
+            itertools.chain([first], chunks),
+            root_tag,
+            encoding,
+            leinfo_mode,
+            workers * _PENDING_PER_WORKER,
+        ):
+            _merge_chunk(result, f_out, state, ignored_writer, leinfo_mode)
+            stats.add(result.stats)
+    f_out.write(f"</{root_tag}>".encode())
+
+    log_stats(stats, logger)
+    return stats
+
+
+def _resolve_entity(match: re.Match[str]) -> str:
+    """Remplace une référence d'entité ou de caractère par sa valeur."""
+    name = match.group(1)
+    try:
+        if name.startswith("#x"):
+            return chr(int(name[2:], 16))
+        if name.startswith("#"):
+            return chr(int(name[1:]))
+    except (ValueError, OverflowError) as exc:
+        raise ET.ParseError(f"invalid character reference &{name};") from exc
+    if name not in _PREDEFINED_ENTITIES:
+        raise ET.ParseError(f"undefined entity &{name};")
+    return _PREDEFINED_ENTITIES[name]
+
+
+def _attribute_value(raw: bytes, encoding: str) -> str:
+    """Décode une valeur d'attribut brute comme le ferait `XMLParser`.
+
+    Sauts de ligne et tabulations littéraux deviennent des espaces, puis
+    les références d'entités et de caractères sont résolues.
+
+    Raises:
+        ET.ParseError: Si la valeur est mal formée (octet invalide, `<` ou
+            `&` isolé, entité inconnue).
+
+    """
+    text = _decode(
+        raw.replace(b"\r\n", b" ").translate(_ATTRIBUTE_BLANKS), encoding
+    )
+    if "<" in text:
+        raise ET.ParseError("'<' in Copt@Val attribute value")
+    if "&" not in text:
+        return text
+    value, count = _ENTITY_RE.subn(_resolve_entity, text)
+    if count != text.count("&"):
+        raise ET.ParseError("invalid '&' in Copt@Val attribute value")
+    return value
+
+
+def _splice_buffer(
+    buffer: bytes,
+    on_copt: Callable[[bytes | None, bytes], bytes | None],
+    *,
+    final: bool,
+) -> tuple[list[bytes], int]:
+    """Réécrit les `Copt@Val` de `buffer` (moteur `splice`).
+
+    Args:
+        buffer: Octets bruts du XML, à partir d'une frontière de balise.
+        on_copt: Appelée pour chaque `Copt`, avec la valeur brute de `Val`
+            (`None` sans attribut `Val`) et son délimiteur ; retourne la
+            nouvelle valeur encodée, ou `None` si elle est inchangée.
+        final: `buffer` contient la fin du document.
+
+    Returns:
+        `(morceaux, fin)` : les octets à écrire pour `buffer[:fin]`. Hors
+        `final`, `buffer[fin:]` commence par une balise, un commentaire ou
+        une section incomplets et doit être complété par la suite du flux.
+
+    Raises:
+        ET.ParseError: Si le document se termine dans un commentaire, une
+            section CDATA ou une instruction de traitement.
+
+    """
+    out: list[bytes] = []
+    pos = last_end = 0
+    for match in _SPLICE_RE.finditer(buffer):
+        last_end = match.end()
+        quote = b'"' if match.group("dq") is not None else b"'"
+        group = "dq" if quote == b'"' else "sq"
+        if match.group(group) is not None:
+            start, end = match.span(group)
+            value = on_copt(buffer[start:end], quote)
+            if value is not None:
+                out.append(buffer[pos:start])
+                out.append(value)
+                pos = end
+        elif match.group("bare") is not None:
+            on_copt(None, quote)
+        elif not match.group().endswith(_SPLICE_CLOSERS):
+            if final:
+                raise ET.ParseError(
+                    "unclosed comment, CDATA section or processing instruction"
+                )
+            out.append(buffer[pos : match.start()])
+            return out, match.start()
+    cut = len(buffer) if final else buffer.rfind(b"<", last_end)
+    if cut < 0:
+        cut = len(buffer)
+    out.append(buffer[pos:cut])
+    return out, cut
+
+
+def reformat_splice(
+    f_in: IO[bytes],
+    f_out: IO[bytes],
+    encoding: str,
+    leinfo_mode: str,
+    ignored_writer: TextIO | None,
+    logger: logging.Logger,
+    state: ReformatState | None = None,
+) -> ReformatStats:
+    """Réécrit les seuls `Copt@Val` modifiés, sans analyser le document.
+
+    Les balises `<Copt ... Val="...">` sont repérées dans les octets bruts ;
+    chaque valeur est décodée comme par `XMLParser`, reformatée par
+    `reformat_copt_element()` dans l'ordre du document, puis réécrite à sa
+    place avec le même délimiteur si elle change. Tous les autres octets
+    (déclaration, indentation, autres attributs) sont recopiés tels quels,
+    par blocs de `_FEED_SIZE`.
+
+    Les valeurs reformatées, la numérotation `LEINFO=(N)`, le fichier
+    annexe et les statistiques sont ceux de `reformat_stream()` ; seule la
+    sérialisation diffère (encodage et mise en forme de l'entrée gardés).
+
+    Args:
+        f_in: XML nettoyé, en binaire (encodage compatible ASCII).
+        f_out: XML reformaté, dans l'encodage de l'entrée.
+        encoding: Encodage des valeurs `Val`, en lecture comme en écriture.
+        leinfo_mode: Mode appliqué aux pseudo-options `LEINFO`.
+        ignored_writer: Flux pour tracer les `LEINFO` remplacés.
+        logger: Logger des métriques.
+        state: État initial (empreintes déjà tracées en mode `hash`).
+
+    Returns:
+        Les métriques du traitement.
+
+    Raises:
+        ET.ParseError: Si une valeur `Val` est mal formée ou si le document
+            se termine dans un commentaire (sortie alors incomplète). Le
+            reste du document n'est pas validé.
+
+    """
+    stats = ReformatStats()
+    state = state or ReformatState()
+
+    def on_copt(raw: bytes | None, quote: bytes) -> bytes | None:
+        if raw is None:
+            stats.total_copt += 1
+            return None
+        value = _attribute_value(raw, encoding)
+        copt_elem = ET.Element("Copt", Val=value)
+        reformat_copt_element(
+            copt_elem, state, ignored_writer, leinfo_mode, stats
+        )
+        reformatted_val = copt_elem.get("Val", "")
+        if reformatted_val == value:
+            return None
+        if _NEEDS_ESCAPE_RE.search(reformatted_val):
+            reformatted_val = escape(reformatted_val, _ATTRIBUTE_ESCAPES[quote])
+        return reformatted_val.encode(encoding, "xmlcharrefreplace")
+
+    buffer = b""
+    while block := f_in.read(_FEED_SIZE):
+        buffer += block
+        out, cut = _splice_buffer(buffer, on_copt, final=False)
+        f_out.write(b"".join(out))
+        buffer = buffer[cut:]
+    out, _cut = _splice_buffer(buffer, on_copt, final=True)
+    f_out.write(b"".join(out))
+
+    log_stats(stats, logger)
     return stats
 
 
@@ -416,15 +1237,127 @@ def validate_output_dir(output_path: Path) -> None:
         ) from exc
 
 
+def _resolve_stream_workers(workers: int, encoding: str) -> int:
+    """Retourne le nombre de processus effectif du moteur `stream`.
+
+    Le découpage de `split_vlm_chunks()` exige un encodage compatible
+    ASCII : sinon, le traitement reste séquentiel.
+    """
+    workers = resolve_workers(workers)
+    if workers > 1 and not is_ascii_compatible(encoding):
+        LOGGER.info(
+            "Encoding %s is not ASCII-compatible: sequential processing.",
+            encoding,
+        )
+        return 1
+    if workers > 1:
+        LOGGER.info("Parallel reformat: %d worker processes.", workers)
+    return workers
+
+
+def _resolve_splice_engine(engine: str, encoding: str) -> str:
+    """Retourne le moteur effectif : `splice` exige un encodage ASCII.
+
+    Les balises sont recherchées octet par octet : avec un autre encodage,
+    le moteur `stream` prend le relais.
+    """
+    if engine == "splice" and not is_ascii_compatible(encoding):
+        LOGGER.info(
+            "Encoding %s is not ASCII-compatible: stream engine used.",
+            encoding,
+        )
+        return "stream"
+    return engine
+
+
+def reformat_file(
+    input_path: Path,
+    output_path: Path,
+    args: argparse.Namespace,
+    ignored_writer: TextIO | None,
+) -> ReformatStats:
+    """Reformate `input_path` dans `output_path` avec le moteur choisi.
+
+    En modes `stream` et `splice`, la sortie est écrite au fil de la
+    lecture : elle est supprimée si le traitement échoue, pour ne pas
+    laisser un XML tronqué.
+    En mode `tree`, rien n'est écrit avant la fin du reformatage. Avec
+    `--workers`, les blocs `<vlm>` sont répartis entre plusieurs processus
+    (`reformat_parallel()`), pour une sortie identique. En mode `splice`,
+    seuls les `Copt@Val` modifiés sont réécrits (`reformat_splice()`).
+
+    Returns:
+        Les métriques du traitement.
+
+    """
+    state = ReformatState()
+    if args.leinfo_mode == "hash" and args.append_ignored:
+        state.leinfo_hashes = load_leinfo_hashes(Path(args.ignored_file))
+    if args.engine == "tree":
+        # open_binary() décompresse à la volée une entrée gzip/bz2/xz.
+        with open_binary(input_path, "rb") as f_in:
+            tree = ET.parse(f_in, parser=ET.XMLParser(encoding=args.encoding))
+        stats = reformat_tree(
+            tree=tree,
+            leinfo_mode=args.leinfo_mode,
+            ignored_writer=ignored_writer,
+            logger=LOGGER,
+            state=state,
+        )
+        with open_binary(output_path, "wb") as f_out:
+            tree.write(f_out, encoding="utf-8", xml_declaration=True)
+        return stats
+
+    engine = _resolve_splice_engine(args.engine, args.encoding)
+    workers = _resolve_stream_workers(args.workers, args.encoding)
+    try:
+        with (
+            open_binary(input_path, "rb") as f_in,
+            open_binary(output_path, "wb") as f_out,
+        ):
+            if engine == "splice":
+                return reformat_splice(
+                    f_in,
+                    f_out,
+                    encoding=args.encoding,
+                    leinfo_mode=args.leinfo_mode,
+                    ignored_writer=ignored_writer,
+                    logger=LOGGER,
+                    state=state,
+                )
+            if workers > 1:
+                return reformat_parallel(
+                    f_in,
+                    f_out,
+                    encoding=args.encoding,
+                    leinfo_mode=args.leinfo_mode,
+                    ignored_writer=ignored_writer,
+                    logger=LOGGER,
+                    workers=workers,
+                    state=state,
+                )
+            return reformat_stream(
+                f_in,
+                f_out,
+                encoding=args.encoding,
+                leinfo_mode=args.leinfo_mode,
+                ignored_writer=ignored_writer,
+                logger=LOGGER,
+                state=state,
+            )
+    except BaseException:
+        output_path.unlink(missing_ok=True)
+        raise
+
+
 def main() -> None:
     """Point d'entrée CLI.
 
     Orchestration globale:
     - lecture des arguments,
     - validations d'entrée/sortie,
-    - parsing XML,
-    - reformattage des balises `Copt`,
-    - écriture du fichier XML final,
+    - parsing XML et reformattage des balises `Copt` (`reformat_file()`),
+    - écriture du fichier XML final (au fil de l'eau en mode `stream`),
     - gestion centralisée des erreurs et codes de retour.
     """
     args = parse_args()
@@ -440,12 +1373,8 @@ def main() -> None:
         validate_input_file(input_path)
         validate_output_dir(output_path)
 
-        tree = ET.parse(
-            str(input_path), parser=ET.XMLParser(encoding=args.encoding)
-        )
-
         ignored_writer: TextIO | None = None
-        if args.leinfo_mode == "placeholder":
+        if args.leinfo_mode in TRACED_LEINFO_MODES:
             ignored_path.parent.mkdir(parents=True, exist_ok=True)
             # Les modes littéraux "a"/"w" garantissent à mypy un retour
             # TextIO (et non IO[Any] comme avec un mode dynamique).
@@ -455,18 +1384,18 @@ def main() -> None:
                 ignored_writer = ignored_path.open("w", encoding="utf-8")
 
         try:
-            reformat_tree(
-                tree=tree,
-                leinfo_mode=args.leinfo_mode,
-                ignored_writer=ignored_writer,
-                logger=LOGGER,
-            )
+            stats = reformat_file(input_path, output_path, args, ignored_writer)
         finally:
             if ignored_writer is not None:
                 ignored_writer.close()
-
-        tree.write(str(output_path), encoding="utf-8", xml_declaration=True)
-        LOGGER.info("Output written: %s", output_path)
+        # Cache du processus principal et, avec `--workers`, des processus.
+        cache = compile_copt_value.cache_info()
+        LOGGER.info(
+            "Output written: %s (Copt cache: %d hits, %d misses)",
+            output_path,
+            cache.hits + stats.worker_cache_hits,
+            cache.misses + stats.worker_cache_misses,
+        )
 
     except (FileNotFoundError, NotADirectoryError, PermissionError) as exc:
         LOGGER.error("%s", exc)
@@ -477,6 +1406,9 @@ def main() -> None:
     except OSError as exc:
         LOGGER.error("I/O error: %s", exc)
         sys.exit(10)
+    except COMPRESSION_ERRORS as exc:
+        LOGGER.error("Corrupted compressed file: %s", exc)
+        sys.exit(10)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+
+r"""Moteur fusionné : rapport VLM brut → JSON structuré, en une seule passe.
+
+Enchaîne en flux les règles des étapes 1 à 3 du pipeline, sans fichier
+intermédiaire :
+
+1. nettoyage du rapport (``clean_report.iter_clean_xml``),
+2. reformatage des ``Copt@Val`` (``reformat_copt.reformat_copt_element``),
+3. conversion JSON (``build_json.loadlib_from_xml`` et ``write_json_array``).
+
+Le XML nettoyé n'est jamais chargé en entier : un analyseur incrémental
+(``ET.XMLPullParser``) reçoit les fragments au fil du nettoyage, chaque
+``<Copt>`` est reformaté à sa fermeture et chaque bloc ``<vlm>`` est
+converti, écrit dans le JSON puis libéré. La mémoire est bornée par la plus
+grosse loadlib, et le rapport est lu une seule fois.
+
+Le JSON, le fichier des LEINFO remplacés et les fichiers de débogage
+facultatifs (``--clean-xml``, ``--copt-xml``) sont identiques aux sorties
+des étapes 1 à 3 exécutées séparément.
+
+Exemple :
+    python src/report_to_json.py -f datas/vlm.xml -o datas/vlm.json \
+        --ignored-file datas/copt_ignored.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TextIO
+
+from build_json import (
+    VALUE_POOL,
+    loadlib_from_xml,
+    tokenize_copt_options,
+    write_json_array,
+)
+from clean_report import (
+    ENGINES,
+    INPUT_FORMATS,
+    RecordFormatError,
+    iter_clean_xml,
+    validate_input_file,
+    validate_output_dir,
+)
+from csect_flags import DEFAULT_FLAG_MATCHER, FlagMatcher, load_flag_matcher
+from reformat_copt import (
+    LEINFO_MODES,
+    TRACED_LEINFO_MODES,
+    CoptXmlWriter,
+    ReformatState,
+    ReformatStats,
+    compile_copt_value,
+    iter_vlm_elements,
+    load_leinfo_hashes,
+    log_stats,
+    reformat_copt_element,
+)
+from utils import (
+    COMPRESSION_ERRORS,
+    load_config,
+    open_binary,
+    open_text,
+    resolve_workers,
+    setup_logging,
+)
+
+LOGGER = logging.getLogger("report_to_json")
+
+# Loggers des étapes réutilisées : leurs messages rejoignent le journal.
+_STEP_LOGGERS = ("clean_report", "reformat_copt", "build_json")
+
+
+@dataclass
+class FusedOptions:
+    """Options du moteur fusionné, reprises des scripts des étapes 1 et 2.
+
+    Attributs:
+        encoding: Encodage du rapport brut.
+        workers: Processus de nettoyage (1 = séquentiel).
+        engine: Moteur de nettoyage, ``bytes`` ou ``text``.
+        input_format: ``text`` ou ``vba`` (enregistrements RDW).
+        leinfo_mode: Traitement des ``LEINFO`` (``placeholder``, ``hash``,
+            ``remove``, ``keep``).
+        clean_xml: Copie facultative du XML nettoyé (sortie de l'étape 1).
+        copt_xml: Copie facultative du XML reformaté (sortie de l'étape 2).
+        flag_matcher: Règles compilées des champs booléens des CSECTs
+            (table ``[flags]`` de ``config.toml``).
+    """
+
+    encoding: str = "iso8859-1"
+    workers: int = 1
+    engine: str = "bytes"
+    input_format: str = "text"
+    leinfo_mode: str = "placeholder"
+    clean_xml: Path | None = None
+    copt_xml: Path | None = None
+    flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+
+
+def _tee(chunks: Iterable[bytes], f_out: IO[bytes] | None) -> Iterator[bytes]:
+    """Recopie les morceaux dans ``f_out`` (XML nettoyé de débogage)."""
+    for chunk in chunks:
+        if f_out is not None:
+            f_out.write(chunk)
+        yield chunk
+
+
+def report_to_json(
+    input_path: Path,
+    json_path: Path,
+    options: FusedOptions,
+    ignored_writer: TextIO | None = None,
+    state: ReformatState | None = None,
+) -> int:
+    """Convertit le rapport VLM brut en JSON, en une seule passe.
+
+    Args:
+        input_path: Rapport VLM brut (encodage mainframe).
+        json_path: Fichier JSON de sortie (compressé selon son extension).
+        options: Options de nettoyage, de reformatage et de débogage.
+        ignored_writer: Flux des ``LEINFO`` remplacés (modes placeholder et
+            hash).
+        state: État initial (empreintes déjà tracées en mode ``hash``).
+
+    Returns:
+        Nombre de loadlibs écrites dans le JSON.
+
+    Raises:
+        RecordFormatError: Si un enregistrement RDW est invalide.
+        ET.ParseError: Si le XML nettoyé est mal formé.
+        SystemExit: Code 1 si l'erreur métier FMNBF427 est détectée.
+
+    """
+    LOGGER.info("Début du traitement fusionné : %s → %s", input_path, json_path)
+    stats = ReformatStats()
+    state = state or ReformatState()
+
+    def on_copt(copt_elem: ET.Element) -> None:
+        reformat_copt_element(
+            copt_elem, state, ignored_writer, options.leinfo_mode, stats
+        )
+
+    chunks = iter_clean_xml(
+        input_path,
+        options.encoding,
+        workers=options.workers,
+        engine=options.engine,
+        input_format=options.input_format,
+    )
+    with ExitStack() as stack:
+        clean_out = (
+            stack.enter_context(open_binary(options.clean_xml, "wb"))
+            if options.clean_xml is not None
+            else None
+        )
+        copt_writer = (
+            CoptXmlWriter(
+                stack.enter_context(open_binary(options.copt_xml, "wb"))
+            )
+            if options.copt_xml is not None
+            else None
+        )
+        f_json = stack.enter_context(open_text(json_path, "w", "utf-8"))
+        vlms = iter_vlm_elements(_tee(chunks, clean_out), on_copt, copt_writer)
+        loadlibs: int = write_json_array(
+            (loadlib_from_xml(vlm, options.flag_matcher) for vlm in vlms),
+            f_json,
+        )
+
+    log_stats(stats, LOGGER)
+    copt_cache = compile_copt_value.cache_info()
+    json_cache = tokenize_copt_options.cache_info()
+    LOGGER.info(
+        "JSON écrit avec succès : %s (%d loadlib(s) ; cache COPT : "
+        "%d/%d succès à l'étape 2, %d/%d à l'étape 3).",
+        json_path,
+        loadlibs,
+        copt_cache.hits,
+        copt_cache.hits + copt_cache.misses,
+        json_cache.hits,
+        json_cache.hits + json_cache.misses,
+    )
+    LOGGER.debug("Valeurs distinctes partagées : %s.", VALUE_POOL.summary())
+    return loadlibs
+
+
+def parse_args() -> argparse.Namespace:
+    """Analyse les arguments de ligne de commande.
+
+    Returns:
+        Namespace argparse : options des étapes 1 (``file``, ``encoding``,
+        ``workers``, ``engine``, ``input_format``), 2 (``ignored_file``,
+        ``leinfo_mode``, ``append_ignored``) et 3 (``output``), plus les
+        sorties de débogage ``clean_xml`` et ``copt_xml``.
+
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Convertit un rapport VLM brut en JSON en une seule passe "
+            "(nettoyage, reformatage COPT et conversion JSON fusionnés)."
+        )
+    )
+    parser.add_argument(
+        "-f",
+        "--file",
+        default="vlm.xml",
+        help="Fichier rapport VLM en entrée (défaut : vlm.xml)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="vlm.json",
+        help="Fichier JSON en sortie (défaut : vlm.json)",
+    )
+    parser.add_argument(
+        "-e",
+        "--encoding",
+        default="iso8859-1",
+        help="Encodage du fichier source (défaut : iso8859-1)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Nombre de processus de nettoyage "
+            "(défaut : 1 = séquentiel, 0 = un par cœur)"
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        default="bytes",
+        choices=ENGINES,
+        help="Moteur de nettoyage (défaut : bytes)",
+    )
+    parser.add_argument(
+        "--input-format",
+        default="text",
+        choices=INPUT_FORMATS,
+        help="Format du rapport : text ou vba (défaut : text)",
+    )
+    parser.add_argument(
+        "--ignored-file",
+        required=True,
+        help="Fichier des LEINFO/NON-LEINFO remplacés (placeholder, hash)",
+    )
+    parser.add_argument(
+        "--leinfo-mode",
+        default="placeholder",
+        choices=LEINFO_MODES,
+        help="Traitement des LEINFO (défaut : placeholder)",
+    )
+    parser.add_argument(
+        "--append-ignored",
+        action="store_true",
+        help="Compléter --ignored-file au lieu de le vider au démarrage",
+    )
+    parser.add_argument(
+        "--clean-xml",
+        default=None,
+        help="Débogage : écrire aussi le XML nettoyé (sortie de l'étape 1)",
+    )
+    parser.add_argument(
+        "--copt-xml",
+        default=None,
+        help="Débogage : écrire aussi le XML reformaté (sortie de l'étape 2)",
+    )
+    return parser.parse_args()
+
+
+def run(
+    args: argparse.Namespace, flag_matcher: FlagMatcher = DEFAULT_FLAG_MATCHER
+) -> None:
+    """Exécute :func:`report_to_json` selon ``args``, chemins vérifiés.
+
+    En cas d'échec, le JSON et les XML de débogage partiels sont supprimés.
+
+    Raises:
+        FileNotFoundError: Si le rapport est introuvable.
+        NotADirectoryError: Si un répertoire de sortie est invalide.
+        PermissionError: Si un répertoire de sortie est en lecture seule.
+
+    """
+    input_path = Path(args.file)
+    output_path = Path(args.output)
+    ignored_path = Path(args.ignored_file)
+    options = FusedOptions(
+        encoding=args.encoding,
+        workers=resolve_workers(args.workers),
+        engine=args.engine,
+        input_format=args.input_format,
+        leinfo_mode=args.leinfo_mode,
+        clean_xml=Path(args.clean_xml) if args.clean_xml else None,
+        copt_xml=Path(args.copt_xml) if args.copt_xml else None,
+        flag_matcher=flag_matcher,
+    )
+
+    validate_input_file(input_path)
+    for path in (output_path, options.clean_xml, options.copt_xml):
+        if path is not None:
+            validate_output_dir(path)
+    state = ReformatState()
+    if args.leinfo_mode == "hash" and args.append_ignored:
+        state.leinfo_hashes = load_leinfo_hashes(ignored_path)
+    with ExitStack() as stack:
+        ignored_writer: TextIO | None = None
+        if args.leinfo_mode in TRACED_LEINFO_MODES:
+            ignored_path.parent.mkdir(parents=True, exist_ok=True)
+            # Modes littéraux : mypy type alors le retour en TextIO.
+            ignored_writer = stack.enter_context(
+                ignored_path.open("a", encoding="utf-8")
+                if args.append_ignored
+                else ignored_path.open("w", encoding="utf-8")
+            )
+        try:
+            report_to_json(
+                input_path, output_path, options, ignored_writer, state
+            )
+        except BaseException:
+            # Pas de sortie tronquée (FMNBF427, XML mal formé…) : un JSON
+            # partiel serait inexploitable par jq.
+            for path in (output_path, options.clean_xml, options.copt_xml):
+                if path is not None:
+                    path.unlink(missing_ok=True)
+            raise
+
+
+def main() -> None:
+    """Point d'entrée CLI — configure le logging et lance le moteur fusionné.
+
+    Raises:
+        SystemExit:
+            - Code 1  : erreur métier FMNBF427 dans le rapport.
+            - Code 2  : répertoire de sortie invalide ou non accessible en
+              écriture, ou table ``[flags]`` de ``config.toml`` invalide.
+            - Code 3  : enregistrement RECFM=VBA invalide ou XML nettoyé
+              mal formé.
+            - Code 10 : fichier introuvable, erreur I/O inattendue ou fichier
+              compressé corrompu.
+
+    """
+    args = parse_args()
+    config = load_config()
+    setup_logging(config, "report_to_json")
+    for name in _STEP_LOGGERS:
+        setup_logging(config, name)
+
+    try:
+        run(args, load_flag_matcher(config))
+    except FileNotFoundError as exc:
+        LOGGER.error("%s", exc)
+        sys.exit(10)
+    except RecordFormatError as exc:
+        LOGGER.error("Rapport RECFM=VBA illisible : %s", exc)
+        sys.exit(3)
+    except ET.ParseError as exc:
+        LOGGER.error("XML nettoyé mal formé : %s", exc)
+        sys.exit(3)
+    except (NotADirectoryError, PermissionError, ValueError) as exc:
+        LOGGER.error("%s", exc)
+        sys.exit(2)
+    except OSError as exc:
+        LOGGER.error("Erreur E/S : %s", exc)
+        sys.exit(10)
+    except COMPRESSION_ERRORS as exc:
+        LOGGER.error("Fichier compressé illisible : %s", exc)
+        sys.exit(10)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 
-"""Utilitaires partagés : configuration et logging du pipeline VLM.
+"""Utilitaires partagés : configuration, logging et E/S du pipeline VLM.
 
 VLM = View Load Module — fonction d'IBM File Manager qui analyse les load
 modules d'une bibliothèque z/OS (loadlib). Le rapport produit (vlm.xml)
@@ -11,6 +11,15 @@ de tous les scripts du pipeline. Il garantit que clean_report.py, reformat_copt.
 et build_json.py écrivent dans le même fichier ``pipeline.log`` avec un format
 uniforme identifiant le script source via ``%(name)s``.
 
+Il fournit aussi l'ouverture transparente des fichiers compressés (gzip,
+bz2, xz) : :func:`open_binary` et :func:`open_text` détectent le format à
+l'extension ou aux octets magiques et décompressent à la volée, sans
+fichier temporaire.
+
+Il regroupe enfin les briques du traitement parallèle (``--workers``)
+communes aux scripts : :func:`resolve_workers`, :func:`is_ascii_compatible`
+et :func:`split_vlm_chunks`.
+
 Exemple :
     from utils import load_config, setup_logging
 
@@ -18,21 +27,64 @@ Exemple :
     logger = setup_logging(config, "vlm")
     logger.info("Démarrage du traitement")
     logger.error("Fichier introuvable : %s", path)
+
+    with open_text(Path("datas/vlm.json.gz"), "r", "utf-8") as f_in:
+        ...
 """
 
 from __future__ import annotations
 
+import bz2
+import gzip
+import io
 import logging
+import lzma
+import os
+import re
 import sys
 import tomllib
+import zlib
+from collections.abc import Iterator
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, Literal, TextIO, cast
 
 # Racine du projet : deux niveaux au-dessus de src/utils.py
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent
 _DEFAULT_CONFIG = _PROJECT_ROOT / "config.toml"
 
+# Formats de compression reconnus, indexés par extension de fichier.
+COMPRESSION_SUFFIXES: dict[str, str] = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+}
+
+# Octets magiques en tête de fichier : priment sur l'extension en lecture.
+_COMPRESSION_MAGIC: tuple[tuple[bytes, str], ...] = (
+    (b"\x1f\x8b", "gzip"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+)
+
+# Erreurs levées par un flux compressé corrompu ou tronqué, hors OSError
+# (gzip.BadGzipFile et les erreurs bz2 dérivent déjà d'OSError).
+COMPRESSION_ERRORS: tuple[type[Exception], ...] = (
+    EOFError,
+    zlib.error,
+    lzma.LZMAError,
+)
+
+# gzip : niveau 6 (celui de la commande gzip), bien plus rapide que le
+# niveau 9 par défaut de Python pour un gain de taille marginal.
+_GZIP_LEVEL = 6
+
+# `--workers` : taille visée des morceaux de :func:`split_vlm_chunks`.
+VLM_CHUNK_SIZE = 1024 * 1024
+
+# Début d'un bloc `<vlm>` : point de découpe des morceaux.
+_VLM_START_RE = re.compile(rb"<vlm[\s/>]")
+
 
 def load_config(config_path: Path = _DEFAULT_CONFIG) -> dict[str, Any]:
     """Charge et valide le fichier de configuration TOML.
@@ -133,3 +185,160 @@ def setup_logging(config: dict[str, Any], logger_name: str) -> logging.Logger:
     logger.propagate = False
 
     return logger
+
+
+def detect_compression(path: Path) -> str | None:
+    """Détermine le format de compression d'un fichier.
+
+    Les octets magiques d'un fichier existant priment ; à défaut (fichier
+    absent ou vide), l'extension (``.gz``, ``.bz2``, ``.xz``) décide.
+
+    Args:
+        path: Chemin du fichier.
+
+    Returns:
+        ``"gzip"``, ``"bz2"``, ``"xz"`` ou ``None`` pour un fichier non
+        compressé.
+
+    """
+    try:
+        with path.open("rb") as fh:
+            head = fh.read(6)
+    except OSError:
+        head = b""
+    if head:
+        for magic, compression in _COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                return compression
+        return None
+    return COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+
+def open_binary(path: Path, mode: Literal["rb", "wb", "ab"]) -> IO[bytes]:
+    """Ouvre un fichier en binaire, compressé ou non, de façon transparente.
+
+    En lecture, le format est détecté par :func:`detect_compression` ; en
+    écriture, par l'extension seule. Le flux (dé)compresse à la volée :
+    rien n'est écrit sur disque en dehors du fichier lui-même. En ajout
+    (``"ab"``), un fichier compressé reçoit un nouveau flux concaténé, que
+    gzip, bz2 et xz relisent comme la suite du précédent.
+
+    Args:
+        path: Chemin du fichier.
+        mode: ``"rb"``, ``"wb"`` ou ``"ab"``.
+
+    Returns:
+        Flux binaire à fermer par l'appelant (utilisable avec ``with``).
+
+    """
+    if mode == "rb":
+        compression = detect_compression(path)
+    else:
+        compression = COMPRESSION_SUFFIXES.get(path.suffix.lower())
+
+    if compression == "gzip":
+        return cast("IO[bytes]", gzip.open(path, mode, _GZIP_LEVEL))
+    if compression == "bz2":
+        return cast("IO[bytes]", bz2.open(path, mode))
+    if compression == "xz":
+        return cast("IO[bytes]", lzma.open(path, mode))
+    return path.open(mode)
+
+
+def open_text(
+    path: Path,
+    mode: Literal["r", "w", "a"],
+    encoding: str,
+    newline: str | None = None,
+) -> TextIO:
+    """Ouvre un fichier texte, compressé ou non (voir :func:`open_binary`).
+
+    Args:
+        path: Chemin du fichier.
+        mode: ``"r"``, ``"w"`` ou ``"a"``.
+        encoding: Encodage du texte.
+        newline: Traitement des fins de ligne, comme pour :func:`open`.
+
+    Returns:
+        Flux texte à fermer par l'appelant (utilisable avec ``with``).
+
+    """
+    binary_mode: Literal["rb", "wb", "ab"] = (
+        "rb" if mode == "r" else "wb" if mode == "w" else "ab"
+    )
+    return io.TextIOWrapper(
+        open_binary(path, binary_mode), encoding=encoding, newline=newline
+    )
+
+
+def resolve_workers(workers: int) -> int:
+    """Convertit la valeur ``--workers`` en nombre de processus effectif.
+
+    Args:
+        workers: Valeur saisie ; ``0`` signifie « un par cœur ».
+
+    Returns:
+        Nombre de processus, au minimum 1.
+
+    """
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def is_ascii_compatible(encoding: str) -> bool:
+    """Indique si l'encodage code les 128 caractères ASCII sur eux-mêmes.
+
+    Condition d'emploi des traitements qui recherchent marqueurs, balises
+    et sauts de ligne directement dans les octets bruts (moteur ``bytes``
+    de clean_report.py, :func:`split_vlm_chunks`).
+    """
+    ascii_bytes = bytes(range(128))
+    try:
+        return ascii_bytes.decode(encoding) == ascii_bytes.decode("ascii")
+    except (LookupError, UnicodeDecodeError):
+        return False
+
+
+def _last_vlm_start(buffer: bytes) -> int:
+    """Position du dernier début de ``<vlm>`` de ``buffer`` (0 si aucun)."""
+    pos = len(buffer)
+    while (pos := buffer.rfind(b"<vlm", 1, pos)) > 0:
+        if _VLM_START_RE.match(buffer, pos):
+            return pos
+    return 0
+
+
+def split_vlm_chunks(
+    f_in: IO[bytes], chunk_size: int = VLM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Découpe le XML brut en morceaux de blocs ``<vlm>`` entiers.
+
+    Les octets ne sont pas analysés : les ``<vlm`` sont recherchés tels
+    quels, ce qui suppose un encodage compatible ASCII et des ``<vlm>``
+    enfants directs de la racine, hors commentaire ou section CDATA (XML
+    produit par clean_report.py). L'entrée est lue par blocs de
+    ``chunk_size`` octets.
+
+    Yields:
+        L'en-tête, jusqu'au premier ``<vlm`` ; puis des morceaux commençant
+        chacun par un ``<vlm`` et regroupant environ ``chunk_size`` octets ;
+        le dernier contient la fin du document. Sans ``<vlm``, le document
+        entier est produit en un seul morceau.
+
+    """
+    buffer = b""
+    in_head = True
+    while block := f_in.read(chunk_size):
+        buffer += block
+        if in_head:
+            match = _VLM_START_RE.search(buffer)
+            if match is None:
+                continue
+            yield buffer[: match.start()]
+            buffer = buffer[match.start() :]
+            in_head = False
+        if len(buffer) >= chunk_size and (cut := _last_vlm_start(buffer)):
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+    yield buffer
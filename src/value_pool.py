@@ -0,0 +1,71 @@
+"""Pools de chaînes partagées pour les champs à faible cardinalité.
+
+Chaque attribut lu par ElementTree est une nouvelle chaîne, même quand sa
+valeur se répète : ``Compiler1``, ``Type``, ``Class``, les dates ou les
+options ``Copt`` ne prennent que quelques centaines de valeurs distinctes
+sur des centaines de milliers de CSECTs. :class:`ValuePool` garde une
+instance par valeur distincte et par champ ; les dictionnaires du modèle
+pointent tous vers elle au lieu d'en porter chacun une copie.
+
+Contrairement à :func:`sys.intern`, les pools sont séparés par champ :
+leur taille, journalisée en fin de traitement, montre la cardinalité réelle
+de chaque champ.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+
+class ValuePool:
+    """Tables champ → valeur → instance partagée de cette valeur.
+
+    Les tables ne font que grandir : le pool ne convient qu'aux champs dont
+    le nombre de valeurs distinctes reste faible (pas aux noms de loadmods
+    ou de CSECTs).
+    """
+
+    __slots__ = ("_tables",)
+
+    def __init__(self) -> None:
+        """Crée un pool vide."""
+        self._tables: dict[str, dict[str, str]] = {}
+
+    def intern(self, field: str, value: str | None) -> str | None:
+        """Retourne l'instance partagée de ``value`` pour le champ ``field``.
+
+        Args:
+            field: Nom du champ (une table par champ).
+            value: Valeur lue ; ``None`` (attribut absent) est rendu tel quel.
+
+        Returns:
+            La première instance rencontrée égale à ``value``, ou ``None``.
+
+        """
+        if value is None:
+            return None
+        table = self._tables.get(field)
+        if table is None:
+            table = self._tables[field] = {}
+        return table.setdefault(value, value)
+
+    def intern_all(self, field: str, values: Iterable[str]) -> tuple[str, ...]:
+        """Applique :meth:`intern` à chaque valeur de ``values``."""
+        table = self._tables.get(field)
+        if table is None:
+            table = self._tables[field] = {}
+        return tuple([table.setdefault(value, value) for value in values])
+
+    def sizes(self) -> dict[str, int]:
+        """Retourne le nombre de valeurs distinctes de chaque champ."""
+        return {field: len(table) for field, table in self._tables.items()}
+
+    def summary(self) -> str:
+        """Résume :meth:`sizes` pour le journal (``Type=3, Class=2…``)."""
+        return ", ".join(
+            f"{field}={size}" for field, size in self.sizes().items()
+        )
+
+    def clear(self) -> None:
+        """Vide toutes les tables."""
+        self._tables.clear()
@@ -0,0 +1,458 @@
+"""Modèle du parc VLM : loadlibs, loadmods et CSECTs.
+
+Classes à ``__slots__`` (``dataclass(slots=True)``) partagées par les
+scripts qui produisent ou lisent ``vlm.json`` :
+
+- ``build_json.py`` et ``report_to_json.py`` les construisent depuis le XML
+  (``loadlib_from_xml()`` et suivantes, qui appliquent les règles de
+  l'étape 3) ;
+- ``extract_copt.py`` les construit depuis le JSON (:meth:`Loadlib.from_json`).
+
+Un objet à slots n'a pas de dictionnaire d'instance : un CSECT occupe une
+centaine d'octets au lieu du millier d'un ``dict`` à quinze clés, et la
+lecture d'un champ est un accès d'attribut, sans hachage de clé.
+
+La sérialisation reproduit le JSON historique, clés dans le même ordre :
+:meth:`Loadlib.to_dict` retourne l'objet JSON d'une loadlib, toute sa
+hiérarchie comprise. Les scripts la sérialisent une loadlib à la fois :
+convertir la loadlib en dictionnaires juste avant ``json.dumps()`` coûte
+moins qu'une fonction ``default`` appelée par l'encodeur sur chaque objet.
+
+Avec une :class:`CoptTable` (disposition ``table`` de ``build_json.py``),
+``to_dict()`` remplace la liste ``Copt`` de chaque CSECT par le numéro de
+son jeu d'options dans la table ; :class:`ModelDecoder` et
+:func:`expand_copt_table` relisent cette disposition.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+# Clés fixes d'un CSECT dans le JSON ; les autres clés sont ses indicateurs
+# booléens (table [flags] de config.toml, voir csect_flags.py).
+_CSECT_KEYS = frozenset(
+    (
+        "Name",
+        "Type",
+        "Class",
+        "Address",
+        "Size",
+        "RMODE",
+        "Compiler1",
+        "Date",
+        "Identify",
+        "Copt",
+    )
+)
+
+# Clés du document JSON en disposition `table` (voir CoptTable).
+COPT_TABLE_KEY = "CoptTable"
+LOADLIBS_KEY = "Loadlibs"
+
+# Indicateurs lus dans le JSON : une seule instance par combinaison.
+_FLAG_ROWS: dict[tuple[tuple[str, Any], ...], dict[str, Any]] = {}
+
+
+@dataclass(slots=True)
+class CoptTable:
+    """Dictionnaire global des options ``Copt`` (disposition ``table``).
+
+    Chaque option distincte est listée une fois, chaque jeu d'options
+    distinct une fois, sous forme d'indices d'options ; un CSECT ne porte
+    plus que le numéro de son jeu. Deux CSECTs ont les mêmes options si et
+    seulement si leurs numéros sont égaux.
+
+    Attributs:
+        options: Options distinctes, dans l'ordre de première apparition.
+        sets: Jeux distincts, en indices dans :attr:`options`.
+    """
+
+    options: list[str] = field(default_factory=list)
+    sets: list[tuple[int, ...]] = field(default_factory=list)
+    _option_ids: dict[str, int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _set_ids: dict[tuple[str, ...], int] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _expanded: list[tuple[str, ...]] = field(
+        default_factory=list, init=False, repr=False
+    )
+
+    def set_id(self, copt: Sequence[str]) -> int:
+        """Retourne le numéro du jeu ``copt``, ajouté à la table au besoin."""
+        key = tuple(copt)
+        set_id = self._set_ids.get(key)
+        if set_id is None:
+            indices = []
+            for option in key:
+                index = self._option_ids.get(option)
+                if index is None:
+                    index = self._option_ids[option] = len(self.options)
+                    self.options.append(option)
+                indices.append(index)
+            set_id = self._set_ids[key] = len(self.sets)
+            self.sets.append(tuple(indices))
+            self._expanded.append(key)
+        return set_id
+
+    def expand(self, set_id: int) -> tuple[str, ...]:
+        """Retourne les options du jeu ``set_id`` (tuple partagé).
+
+        Raises:
+            ValueError: Si ``set_id`` n'est pas un numéro de la table.
+
+        """
+        if not 0 <= set_id < len(self._expanded):
+            msg = f"Copt : jeu d'options {set_id} absent de {COPT_TABLE_KEY}"
+            raise ValueError(msg)
+        return self._expanded[set_id]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Retourne l'objet JSON de la table (``Options`` et ``Sets``)."""
+        return {
+            "Options": self.options,
+            "Sets": [list(indices) for indices in self.sets],
+        }
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> CoptTable:
+        """Construit la table depuis son objet JSON.
+
+        Raises:
+            ValueError: Si ``Options`` ou ``Sets`` sont absents ou si un jeu
+                référence une option inexistante.
+
+        """
+        try:
+            options = [str(option) for option in data["Options"]]
+            sets = [tuple(int(i) for i in indices) for indices in data["Sets"]]
+            expanded = [tuple(options[i] for i in indices) for indices in sets]
+        except (KeyError, IndexError, TypeError, ValueError) as exc:
+            msg = f"{COPT_TABLE_KEY} invalide ({exc!r})"
+            raise ValueError(msg) from exc
+        if any(i < 0 for indices in sets for i in indices):
+            msg = f"{COPT_TABLE_KEY} invalide (indice d'option négatif)"
+            raise ValueError(msg)
+        table = cls(options=options, sets=sets)
+        table._option_ids = {option: i for i, option in enumerate(options)}
+        table._expanded = expanded
+        for set_id, key in enumerate(expanded):
+            table._set_ids.setdefault(key, set_id)
+        return table
+
+
+@dataclass(slots=True)
+class Csect:
+    """CSECT d'un loadmod.
+
+    Attributs:
+        name, type, cls, address, size, rmode, compiler1, date: Attributs
+            du CSECT (``Name``, ``Type``, ``Class``, ``Address``, ``Size``,
+            ``RMODE``, ``Compiler1`` et ``Date`` dans le JSON).
+        flags: Indicateurs booléens, dans l'ordre du JSON ; le dictionnaire
+            est partagé entre CSECTs, à ne pas modifier.
+        identify: Code package de ``Identify`` (``None`` si invalide).
+        has_identify: Vrai si le CSECT a un ``Identify`` (clé présente dans
+            le JSON, même à ``null``).
+        copt: Options de compilation, ``None`` sans ``<Copt>``.
+    """
+
+    name: str | None
+    type: str | None = None
+    cls: str | None = None
+    address: str | None = None
+    size: str | None = None
+    rmode: str | None = None
+    compiler1: str | None = None
+    date: str | None = None
+    flags: Mapping[str, bool] = field(default_factory=dict)
+    identify: str | None = None
+    has_identify: bool = False
+    copt: Sequence[str] | None = None
+
+    @classmethod
+    def from_json(
+        cls, data: Mapping[str, Any], copt_table: CoptTable | None = None
+    ) -> Csect:
+        """Construit un CSECT depuis son objet JSON.
+
+        Args:
+            data: Objet JSON du CSECT.
+            copt_table: Table des options, si ``Copt`` est un numéro de jeu
+                (disposition ``table``).
+
+        Raises:
+            ValueError: Si ``Copt`` est un numéro de jeu inconnu, ou sans
+                table.
+
+        """
+        flags = tuple(
+            (key, value)
+            for key, value in data.items()
+            if key not in _CSECT_KEYS
+        )
+        copt = data.get("Copt")
+        if isinstance(copt, int):
+            if copt_table is None:
+                msg = f"Copt {copt} : numéro de jeu sans {COPT_TABLE_KEY}"
+                raise ValueError(msg)
+            copt = copt_table.expand(copt)
+        return cls(
+            name=data.get("Name"),
+            type=data.get("Type"),
+            cls=data.get("Class"),
+            address=data.get("Address"),
+            size=data.get("Size"),
+            rmode=data.get("RMODE"),
+            compiler1=data.get("Compiler1"),
+            date=data.get("Date"),
+            flags=_FLAG_ROWS.setdefault(flags, dict(flags)),
+            identify=data.get("Identify"),
+            has_identify="Identify" in data,
+            copt=tuple(copt) if copt is not None else None,
+        )
+
+    def to_dict(self, copt_table: CoptTable | None = None) -> dict[str, Any]:
+        """Retourne l'objet JSON du CSECT, clés dans l'ordre historique.
+
+        Args:
+            copt_table: Table où enregistrer ``Copt`` ; le JSON porte alors
+                le numéro du jeu au lieu de la liste des options.
+
+        """
+        data: dict[str, Any] = {
+            "Name": self.name,
+            "Type": self.type,
+            "Class": self.cls,
+            "Address": self.address,
+            "Size": self.size,
+            "RMODE": self.rmode,
+            "Compiler1": self.compiler1,
+            "Date": self.date,
+        }
+        data.update(self.flags)
+        if self.has_identify:
+            data["Identify"] = self.identify
+        if self.copt is not None:
+            data["Copt"] = (
+                list(self.copt)
+                if copt_table is None
+                else copt_table.set_id(self.copt)
+            )
+        return data
+
+
+@dataclass(slots=True)
+class Loadmod:
+    """Loadmod d'une loadlib et ses CSECTs.
+
+    Attributs:
+        name, linkedon, linkedat, linkedby, epa, msize, ttr, ssi, ac, am, rm:
+            Attributs du loadmod (clés ``Name``, ``Linkedon``… du JSON).
+        csects: CSECTs, dans l'ordre du rapport.
+    """
+
+    name: str | None
+    linkedon: str | None = None
+    linkedat: str | None = None
+    linkedby: str | None = None
+    epa: str | None = None
+    msize: str | None = None
+    ttr: str | None = None
+    ssi: str | None = None
+    ac: str | None = None
+    am: str | None = None
+    rm: str | None = None
+    csects: list[Csect] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> Loadmod:
+        """Construit un loadmod et ses CSECTs depuis son objet JSON.
+
+        Les CSECTs déjà construits (voir :func:`model_object_hook`) sont
+        repris tels quels.
+        """
+        return cls(
+            name=data.get("Name"),
+            linkedon=data.get("Linkedon"),
+            linkedat=data.get("Linkedat"),
+            linkedby=data.get("Linkedby"),
+            epa=data.get("EPA"),
+            msize=data.get("MSize"),
+            ttr=data.get("TTR"),
+            ssi=data.get("SSI"),
+            ac=data.get("AC"),
+            am=data.get("AM"),
+            rm=data.get("RM"),
+            csects=[
+                csect if isinstance(csect, Csect) else Csect.from_json(csect)
+                for csect in data.get("CSECTs", [])
+            ],
+        )
+
+    def to_dict(self, copt_table: CoptTable | None = None) -> dict[str, Any]:
+        """Retourne l'objet JSON du loadmod, CSECTs compris.
+
+        Args:
+            copt_table: Voir :meth:`Csect.to_dict`.
+
+        """
+        return {
+            "Name": self.name,
+            "Linkedon": self.linkedon,
+            "Linkedat": self.linkedat,
+            "Linkedby": self.linkedby,
+            "EPA": self.epa,
+            "MSize": self.msize,
+            "TTR": self.ttr,
+            "SSI": self.ssi,
+            "AC": self.ac,
+            "AM": self.am,
+            "RM": self.rm,
+            "CSECTs": [csect.to_dict(copt_table) for csect in self.csects],
+        }
+
+
+@dataclass(slots=True)
+class Loadlib:
+    """Loadlib (bloc ``<vlm>`` du rapport) et ses loadmods.
+
+    Attributs:
+        name: Nom de la loadlib (clé ``Loadlib``).
+        member_count: Nombre de membres annoncé (clé ``MemberCount``).
+        loadmods: Loadmods, dans l'ordre du rapport.
+    """
+
+    name: str | None
+    member_count: int = 0
+    loadmods: list[Loadmod] = field(default_factory=list)
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> Loadlib:
+        """Construit une loadlib et toute sa hiérarchie depuis le JSON.
+
+        Les loadmods déjà construits (voir :func:`model_object_hook`) sont
+        repris tels quels.
+        """
+        return cls(
+            name=data.get("Loadlib"),
+            member_count=data.get("MemberCount", 0),
+            loadmods=[
+                mod if isinstance(mod, Loadmod) else Loadmod.from_json(mod)
+                for mod in data.get("Loadmods", [])
+            ],
+        )
+
+    def to_dict(self, copt_table: CoptTable | None = None) -> dict[str, Any]:
+        """Retourne l'objet JSON de la loadlib, toute la hiérarchie comprise.
+
+        Args:
+            copt_table: Voir :meth:`Csect.to_dict`.
+
+        """
+        return {
+            "Loadlib": self.name,
+            "MemberCount": self.member_count,
+            "Loadmods": [mod.to_dict(copt_table) for mod in self.loadmods],
+        }
+
+    def csect_count(self) -> int:
+        """Retourne le nombre de CSECTs de tous les loadmods."""
+        return sum(len(mod.csects) for mod in self.loadmods)
+
+
+def model_object_hook(data: dict[str, Any]) -> Loadlib | Loadmod | Csect:
+    """Fonction ``object_hook`` de :func:`json.load` pour ``vlm.json``.
+
+    Le décodeur l'appelle sur chaque objet JSON dès sa fin, enfants d'abord :
+    les CSECTs deviennent des :class:`Csect` avant que leur loadmod ne soit
+    terminé, et ainsi de suite. Les dictionnaires intermédiaires sont libérés
+    au fil de l'analyse : le fichier entier n'existe jamais sous forme de
+    dictionnaires.
+
+    Args:
+        data: Objet JSON décodé (loadlib, loadmod ou CSECT).
+
+    Returns:
+        L'objet du modèle correspondant, reconnu à sa liste d'enfants.
+
+    """
+    if "CSECTs" in data:
+        return Loadmod.from_json(data)
+    if "Loadmods" in data:
+        return Loadlib.from_json(data)
+    return Csect.from_json(data)
+
+
+class ModelDecoder:
+    """Fonction ``object_hook`` pour les deux dispositions de ``vlm.json``.
+
+    Comme :func:`model_object_hook`, mais reconnaît aussi le document de la
+    disposition ``table`` : la table ``CoptTable``, écrite avant les
+    loadlibs, est décodée la première, puis chaque numéro de jeu ``Copt``
+    est remplacé par le tuple partagé de ses options. Le document et les
+    enregistrements JSON Lines sont rendus tels quels (dictionnaires).
+
+    Attributs:
+        copt_table: Table lue dans le document, ``None`` sinon.
+    """
+
+    __slots__ = ("copt_table",)
+
+    def __init__(self) -> None:
+        """Crée un décodeur sans table."""
+        self.copt_table: CoptTable | None = None
+
+    def __call__(
+        self, data: dict[str, Any]
+    ) -> Loadlib | Loadmod | Csect | CoptTable | dict[str, Any]:
+        """Convertit un objet JSON décodé (voir :func:`model_object_hook`).
+
+        Raises:
+            ValueError: Si la table ou un numéro de jeu ``Copt`` est invalide.
+
+        """
+        if "CSECTs" in data:
+            return Loadmod.from_json(data)
+        if "Loadmods" in data:
+            return Loadlib.from_json(data)
+        if "Options" in data and "Sets" in data:
+            self.copt_table = CoptTable.from_json(data)
+            return self.copt_table
+        if COPT_TABLE_KEY in data or LOADLIBS_KEY in data or "Loadmod" in data:
+            return data
+        return Csect.from_json(data, self.copt_table)
+
+
+def expand_copt_table(document: Any) -> list[dict[str, Any]]:
+    """Retourne les loadlibs d'un ``vlm.json`` au format historique.
+
+    Pour les lecteurs qui chargent ``vlm.json`` en dictionnaires : un
+    document de disposition ``table`` voit chaque numéro de jeu ``Copt``
+    remplacé, en place, par la liste de ses options ; une liste de loadlibs
+    (disposition historique) est rendue telle quelle.
+
+    Args:
+        document: Résultat de :func:`json.load` sur ``vlm.json``.
+
+    Returns:
+        La liste des loadlibs, avec des listes ``Copt``.
+
+    Raises:
+        ValueError: Si la table ou un numéro de jeu ``Copt`` est invalide.
+
+    """
+    if isinstance(document, list):
+        return document
+    table = CoptTable.from_json(document[COPT_TABLE_KEY])
+    libs: list[dict[str, Any]] = document[LOADLIBS_KEY]
+    for lib in libs:
+        for mod in lib["Loadmods"]:
+            for csect in mod["CSECTs"]:
+                copt = csect.get("Copt")
+                if isinstance(copt, int):
+                    csect["Copt"] = list(table.expand(copt))
+    return libs
@@ -0,0 +1,555 @@
+"""Instantané colonnaire du parc VLM, lu par projection mémoire (mmap).
+
+``vlm.json`` doit être analysé en entier pour répondre à la moindre
+question sur une seule colonne. L'instantané (``build_json.py --snapshot``)
+range le même contenu par colonnes :
+
+- chaque champ texte est **encodé par dictionnaire** : un tableau de codes
+  ``int32`` (``-1`` pour ``null``) et la liste des valeurs distinctes ;
+- les champs numériques sont aussi disponibles en **tableaux typés** :
+  ``EPA``, ``MSize``, ``TTR``, ``Address`` et ``Size`` convertis depuis
+  l'hexadécimal (``int64``, :data:`NO_NUMBER` si absent ou invalide),
+  ``Linkedon`` et ``Date`` en numéros de jour depuis le 1970-01-01
+  (``int32``, :data:`NO_DAY` si absent ou invalide) ;
+- les indicateurs booléens sont des colonnes ``int8`` (``-1`` : absent) ;
+- les options ``Copt`` sont rangées par jeu distinct : chaque CSECT porte
+  le numéro de son jeu (``-1`` : pas de ``<Copt>``) ;
+- la hiérarchie est décrite par des bornes (les loadmods de la loadlib
+  ``i`` sont ceux de ``bounds[i]`` à ``bounds[i + 1]``) et par l'index du
+  parent de chaque loadmod et de chaque CSECT.
+
+Format du fichier (entiers petit-boutistes dans l'en-tête) ::
+
+    MAGIC (8 octets) | offset de la table (u64) | longueur de la table (u64)
+    colonnes, chacune alignée sur 8 octets
+    table des matières JSON : types, offsets et longueurs des colonnes
+
+:class:`Snapshot` projette le fichier en mémoire et ne lit une colonne qu'à
+sa première demande, sans copie : un parcours comme « les loadmods liés
+depuis telle date » ne touche que les pages de ``loadmod.linkedon:day`` et
+de ``loadmod.name``.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from vlm_model import Csect, Loadlib, Loadmod
+
+# Signature des instantanés (version 1 du format).
+MAGIC = b"VLMSNAP1"
+
+# En-tête : signature, offset et longueur de la table des matières.
+_HEADER = struct.Struct("<8sQQ")
+_ALIGN = 8
+
+# Valeurs des colonnes typées pour un champ absent ou invalide.
+NO_NUMBER = -1
+NO_DAY = -(2**31)
+# Code d'une valeur null dans une colonne texte.
+NO_STRING = -1
+
+# Champs texte du modèle, colonne `<table>.<attribut>` de l'instantané.
+LOADMOD_FIELDS = (
+    "name",
+    "linkedon",
+    "linkedat",
+    "linkedby",
+    "epa",
+    "msize",
+    "ttr",
+    "ssi",
+    "ac",
+    "am",
+    "rm",
+)
+CSECT_FIELDS = (
+    "name",
+    "type",
+    "cls",
+    "address",
+    "size",
+    "rmode",
+    "compiler1",
+    "date",
+    "identify",
+)
+# Champs texte doublés d'une colonne typée `<colonne>:int` ou `<colonne>:day`.
+HEX_FIELDS = (
+    "loadmod.epa",
+    "loadmod.msize",
+    "loadmod.ttr",
+    "csect.address",
+    "csect.size",
+)
+DAY_FIELDS = ("loadmod.linkedon", "csect.date")
+
+_DATE_RE = re.compile(r"(\d{4})[/-](\d{2})[/-](\d{2})")
+_HEX_RE = re.compile(r"[0-9A-Fa-f]{1,16}")
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+_INT64_MAX = 2**63 - 1
+
+
+def day_number(text: str | None) -> int:
+    """Convertit une date ``AAAA/MM/JJ`` en jours depuis le 1970-01-01.
+
+    Returns:
+        Le numéro de jour, ou :data:`NO_DAY` si ``text`` est absent ou
+        n'est pas une date valide.
+
+    """
+    match = _DATE_RE.fullmatch(text) if text is not None else None
+    if match is None:
+        return NO_DAY
+    try:
+        day = datetime.date(*(int(part) for part in match.groups()))
+    except ValueError:
+        return NO_DAY
+    return day.toordinal() - _EPOCH
+
+
+def hex_number(text: str | None) -> int:
+    """Convertit un champ hexadécimal (``"000080"``) en entier.
+
+    Returns:
+        La valeur, ou :data:`NO_NUMBER` si ``text`` est absent, n'est pas
+        hexadécimal ou dépasse un ``int64``.
+
+    """
+    if text is None or _HEX_RE.fullmatch(text) is None:
+        return NO_NUMBER
+    value = int(text, 16)
+    return value if value <= _INT64_MAX else NO_NUMBER
+
+
+class _StringBuilder:
+    """Colonne texte en construction : codes et dictionnaire des valeurs."""
+
+    __slots__ = ("codes", "index")
+
+    def __init__(self) -> None:
+        self.codes = array("i")
+        self.index: dict[str, int] = {}
+
+    def append(self, value: str | None) -> None:
+        if value is None:
+            self.codes.append(NO_STRING)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.index)
+        self.codes.append(code)
+
+    def dictionary(self) -> tuple[array[int], bytes]:
+        """Retourne les bornes et les octets UTF-8 des valeurs distinctes."""
+        encoded = [value.encode("utf-8") for value in self.index]
+        bounds = array("Q", [0])
+        for value in encoded:
+            bounds.append(bounds[-1] + len(value))
+        return bounds, b"".join(encoded)
+
+
+class SnapshotWriter:
+    """Construit un instantané, une loadlib à la fois.
+
+    Les colonnes sont accumulées en tableaux compacts (``array``) puis
+    écrites d'un bloc par :meth:`write`.
+    """
+
+    def __init__(self) -> None:
+        """Crée un instantané vide."""
+        self._strings: dict[str, _StringBuilder] = {
+            "loadlib.name": _StringBuilder()
+        }
+        for name in LOADMOD_FIELDS:
+            self._strings[f"loadmod.{name}"] = _StringBuilder()
+        for name in CSECT_FIELDS:
+            self._strings[f"csect.{name}"] = _StringBuilder()
+        # Options des jeux distincts, mises bout à bout.
+        self._strings["coptset.options"] = _StringBuilder()
+        self._numbers: dict[str, array[int]] = {
+            "loadlib.member_count": array("q"),
+            "loadlib.loadmods": array("Q", [0]),
+            "loadmod.loadlib": array("i"),
+            "loadmod.csects": array("Q", [0]),
+            "csect.loadmod": array("i"),
+            "csect.has_identify": array("b"),
+            "csect.copt": array("i"),
+            "coptset.bounds": array("Q", [0]),
+        }
+        for name in HEX_FIELDS:
+            self._numbers[f"{name}:int"] = array("q")
+        for name in DAY_FIELDS:
+            self._numbers[f"{name}:day"] = array("i")
+        self._flags: dict[str, array[int]] = {}
+        self._copt_sets: dict[tuple[str, ...], int] = {}
+        self._counts = {"loadlib": 0, "loadmod": 0, "csect": 0}
+
+    def add(self, lib: Loadlib) -> None:
+        """Ajoute une loadlib et toute sa hiérarchie."""
+        lib_index = self._counts["loadlib"]
+        self._strings["loadlib.name"].append(lib.name)
+        self._numbers["loadlib.member_count"].append(lib.member_count)
+        for mod in lib.loadmods:
+            self._add_loadmod(mod, lib_index)
+        self._numbers["loadlib.loadmods"].append(self._counts["loadmod"])
+        self._counts["loadlib"] += 1
+
+    def _add_loadmod(self, mod: Loadmod, lib_index: int) -> None:
+        mod_index = self._counts["loadmod"]
+        for name in LOADMOD_FIELDS:
+            self._strings[f"loadmod.{name}"].append(getattr(mod, name))
+        self._numbers["loadmod.loadlib"].append(lib_index)
+        for csect in mod.csects:
+            self._add_csect(csect, mod_index)
+        self._numbers["loadmod.csects"].append(self._counts["csect"])
+        self._counts["loadmod"] += 1
+
+    def _add_csect(self, csect: Csect, mod_index: int) -> None:
+        for name in CSECT_FIELDS:
+            self._strings[f"csect.{name}"].append(getattr(csect, name))
+        numbers = self._numbers
+        numbers["csect.loadmod"].append(mod_index)
+        numbers["csect.has_identify"].append(int(csect.has_identify))
+        numbers["csect.copt"].append(self._copt_set(csect.copt))
+        row = self._counts["csect"]
+        for flag, value in csect.flags.items():
+            column = self._flags.get(flag)
+            if column is None:
+                # Indicateur apparu en cours de route : absent avant.
+                column = self._flags[flag] = array("b", [-1]) * row
+            column.append(int(value))
+        for column in self._flags.values():
+            if len(column) == row:
+                column.append(-1)
+        self._counts["csect"] += 1
+
+    def _copt_set(self, copt: Sequence[str] | None) -> int:
+        """Retourne le numéro du jeu d'options ``copt`` (``-1`` si absent)."""
+        if copt is None:
+            return -1
+        key = tuple(copt)
+        set_id = self._copt_sets.get(key)
+        if set_id is None:
+            set_id = self._copt_sets[key] = len(self._copt_sets)
+            options = self._strings["coptset.options"]
+            for option in key:
+                options.append(option)
+            self._numbers["coptset.bounds"].append(len(options.codes))
+        return set_id
+
+    def _typed_columns(self) -> dict[str, array[int]]:
+        """Retourne les colonnes typées, tirées des colonnes texte."""
+        typed: dict[str, array[int]] = {}
+        for fields, suffix, typecode, convert in (
+            (HEX_FIELDS, "int", "q", hex_number),
+            (DAY_FIELDS, "day", "i", day_number),
+        ):
+            for name in fields:
+                builder = self._strings[name]
+                # Une conversion par valeur distincte, pas par ligne.
+                by_code = [convert(value) for value in builder.index]
+                missing = convert(None)
+                typed[f"{name}:{suffix}"] = array(
+                    typecode,
+                    [
+                        by_code[code] if code >= 0 else missing
+                        for code in builder.codes
+                    ],
+                )
+        return typed
+
+    def write(self, path: Path) -> None:
+        """Écrit l'instantané dans ``path`` (jamais compressé : lu par mmap)."""
+        columns: dict[str, array[int] | bytes] = {}
+        for name, builder in self._strings.items():
+            bounds, data = builder.dictionary()
+            columns[name] = builder.codes
+            columns[f"{name}.bounds"] = bounds
+            columns[f"{name}.data"] = data
+        columns.update(self._numbers)
+        columns.update(self._typed_columns())
+        for flag, column in self._flags.items():
+            columns[f"csect.flag.{flag}"] = column
+
+        toc: dict[str, Any] = {
+            "byteorder": sys.byteorder,
+            "counts": self._counts,
+            "flags": list(self._flags),
+            "strings": list(self._strings),
+            "columns": {},
+        }
+        with path.open("wb") as f:
+            f.write(_HEADER.pack(MAGIC, 0, 0))
+            for name, blob in columns.items():
+                f.write(b"\0" * (-f.tell() % _ALIGN))
+                data = blob if isinstance(blob, bytes) else blob.tobytes()
+                toc["columns"][name] = {
+                    "type": "B" if isinstance(blob, bytes) else blob.typecode,
+                    "offset": f.tell(),
+                    "length": len(data),
+                }
+                f.write(data)
+            toc_data = json.dumps(toc, separators=(",", ":")).encode("utf-8")
+            toc_offset = f.tell()
+            f.write(toc_data)
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, toc_offset, len(toc_data)))
+
+
+class StringColumn:
+    """Colonne texte d'un instantané, décodée à la demande.
+
+    ``column[i]`` retourne la valeur de la ligne ``i`` (``None`` pour null) ;
+    chaque valeur distincte n'est décodée qu'une fois.
+    """
+
+    __slots__ = ("_bounds", "_data", "_index", "_values", "codes")
+
+    def __init__(
+        self,
+        codes: Sequence[int],
+        bounds: Sequence[int],
+        data: memoryview,
+    ) -> None:
+        """Associe les codes d'une colonne à son dictionnaire."""
+        self.codes = codes
+        self._bounds = bounds
+        self._data = data
+        self._values: dict[int, str] = {}
+        self._index: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        """Retourne le nombre de lignes."""
+        return len(self.codes)
+
+    def __getitem__(self, row: int) -> str | None:
+        """Retourne la valeur de la ligne ``row``."""
+        code = self.codes[row]
+        return None if code < 0 else self.value(code)
+
+    def value(self, code: int) -> str:
+        """Retourne la valeur distincte de code ``code``."""
+        value = self._values.get(code)
+        if value is None:
+            start, end = self._bounds[code], self._bounds[code + 1]
+            value = self._values[code] = str(self._data[start:end], "utf-8")
+        return value
+
+    def code(self, value: str) -> int | None:
+        """Retourne le code de ``value``, ``None`` si elle n'apparaît pas.
+
+        Permet de filtrer une colonne en comparant des entiers, sans
+        décoder les lignes.
+        """
+        if self._index is None:
+            self._index = {
+                self.value(code): code for code in range(len(self._bounds) - 1)
+            }
+        return self._index.get(value)
+
+
+class Snapshot:
+    """Instantané ouvert en lecture ; colonnes chargées à la demande.
+
+    Les colonnes numériques sont des vues (``memoryview``) sur le fichier
+    projeté en mémoire, valables jusqu'à :meth:`close`.
+
+    Attributs:
+        counts: Nombre de loadlibs, loadmods et CSECTs.
+        flags: Noms des indicateurs booléens, dans l'ordre du JSON.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Projette ``path`` en mémoire et lit sa table des matières.
+
+        Raises:
+            ValueError: Si ``path`` n'est pas un instantané VLM valide.
+            OSError: Si le fichier est illisible.
+
+        """
+        self._file = path.open("rb")
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        self._views: list[memoryview] = []
+        self._cache: dict[str, Any] = {}
+        try:
+            toc = self._read_toc(path)
+        except ValueError:
+            self.close()
+            raise
+        self._columns: dict[str, dict[str, Any]] = toc["columns"]
+        self._swap = toc["byteorder"] != sys.byteorder
+        self.counts: dict[str, int] = toc["counts"]
+        self.flags: list[str] = toc["flags"]
+
+    def _read_toc(self, path: Path) -> dict[str, Any]:
+        if len(self._map) < _HEADER.size:
+            msg = f"'{path}' n'est pas un instantané VLM (fichier trop court)"
+            raise ValueError(msg)
+        magic, offset, length = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            msg = f"'{path}' n'est pas un instantané VLM (signature {magic!r})"
+            raise ValueError(msg)
+        try:
+            toc: dict[str, Any] = json.loads(
+                self._map[offset : offset + length]
+            )
+        except json.JSONDecodeError as exc:
+            msg = f"'{path}' : table des matières illisible ({exc})"
+            raise ValueError(msg) from exc
+        return toc
+
+    def __enter__(self) -> Snapshot:
+        """Retourne l'instantané ouvert."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        """Ferme l'instantané."""
+        self.close()
+
+    def close(self) -> None:
+        """Libère les vues puis ferme la projection et le fichier."""
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._cache.clear()
+        self._map.close()
+        self._file.close()
+
+    def _raw(self, name: str) -> memoryview:
+        spec = self._columns[name]
+        view = memoryview(self._map)[
+            spec["offset"] : spec["offset"] + spec["length"]
+        ]
+        self._views.append(view)
+        return view
+
+    def column(self, name: str) -> Sequence[int]:
+        """Retourne la colonne numérique ``name`` (sans copie si possible).
+
+        Raises:
+            KeyError: Si la colonne n'existe pas.
+
+        """
+        column = self._cache.get(name)
+        if column is None:
+            spec = self._columns[name]
+            raw = self._raw(name)
+            if self._swap and spec["type"] not in ("b", "B"):
+                # Instantané écrit sur une machine d'autre boutisme.
+                column = array(spec["type"], raw.tobytes())
+                column.byteswap()
+            else:
+                column = raw.cast(spec["type"])
+                self._views.append(column)
+            self._cache[name] = column
+        return column
+
+    def strings(self, name: str) -> StringColumn:
+        """Retourne la colonne texte ``name`` (``loadmod.name``…).
+
+        Raises:
+            KeyError: Si la colonne n'existe pas.
+
+        """
+        column = self._cache.get(name)
+        if column is None:
+            column = StringColumn(
+                self.column(name),
+                self.column(f"{name}.bounds"),
+                self._raw(f"{name}.data"),
+            )
+            self._cache[name] = column
+        return column
+
+    def copt(self, set_id: int) -> tuple[str, ...]:
+        """Retourne les options du jeu ``set_id``."""
+        bounds = self.column("coptset.bounds")
+        options = self.strings("coptset.options")
+        return tuple(
+            options.value(options.codes[row])
+            for row in range(bounds[set_id], bounds[set_id + 1])
+        )
+
+    def loadlibs(self) -> Iterator[Loadlib]:
+        """Reconstruit les loadlibs du modèle commun, dans l'ordre.
+
+        ``lib.to_dict()`` redonne alors le JSON de ``build_json.py``.
+        """
+        names = self.strings("loadlib.name")
+        member_counts = self.column("loadlib.member_count")
+        bounds = self.column("loadlib.loadmods")
+        mod_fields = [(f, self.strings(f"loadmod.{f}")) for f in LOADMOD_FIELDS]
+        mod_bounds = self.column("loadmod.csects")
+        csect = self._csect_builder()
+        for lib in range(self.counts["loadlib"]):
+            loadmods = []
+            for mod in range(bounds[lib], bounds[lib + 1]):
+                fields = {name: column[mod] for name, column in mod_fields}
+                csects = [
+                    csect(row)
+                    for row in range(mod_bounds[mod], mod_bounds[mod + 1])
+                ]
+                loadmods.append(Loadmod(**fields, csects=csects))
+            yield Loadlib(
+                name=names[lib],
+                member_count=member_counts[lib],
+                loadmods=loadmods,
+            )
+
+    def _csect_builder(self) -> Any:
+        """Prépare la reconstruction d'un :class:`Csect` par numéro de ligne."""
+        fields = [(f, self.strings(f"csect.{f}")) for f in CSECT_FIELDS]
+        has_identify = self.column("csect.has_identify")
+        copt = self.column("csect.copt")
+        flags = [(f, self.column(f"csect.flag.{f}")) for f in self.flags]
+        flag_rows: dict[tuple[tuple[str, bool], ...], dict[str, bool]] = {}
+        copt_sets: dict[int, tuple[str, ...]] = {}
+
+        def build(row: int) -> Csect:
+            key = tuple(
+                (flag, bool(column[row]))
+                for flag, column in flags
+                if column[row] >= 0
+            )
+            set_id = copt[row]
+            if set_id >= 0 and set_id not in copt_sets:
+                copt_sets[set_id] = self.copt(set_id)
+            return Csect(
+                **{name: column[row] for name, column in fields},
+                flags=flag_rows.setdefault(key, dict(key)),
+                has_identify=bool(has_identify[row]),
+                copt=copt_sets[set_id] if set_id >= 0 else None,
+            )
+
+        return build
+
+
+def is_snapshot(path: Path) -> bool:
+    """Indique si ``path`` commence par la signature d'un instantané."""
+    try:
+        with path.open("rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
@@ -0,0 +1,308 @@
+"""Lecture en flux de ``vlm.json``, une loadlib à la fois.
+
+:func:`json.load` analyse tout le fichier avant de rendre la main : le
+premier CSECT n'est disponible qu'une fois la hiérarchie complète en
+mémoire. :func:`iter_loadlibs` lit le fichier par blocs et décode chaque
+élément du tableau de premier niveau avec
+:meth:`json.JSONDecoder.raw_decode` dès qu'il est complet ; seule la
+loadlib en cours et le bloc de texte qui la contient sont en mémoire.
+
+Les trois sorties de ``build_json.py`` sont reconnues :
+
+- ``pretty`` / ``compact`` en disposition ``inline`` : tableau de loadlibs ;
+- disposition ``table`` : objet ``{"CoptTable", "Loadlibs"}``, la table
+  étant décodée avant le tableau des loadlibs ;
+- ``jsonl`` : une valeur par ligne, table éventuelle puis un enregistrement
+  ``{"Loadlib", "MemberCount", "Loadmod"}`` par loadmod (``"Loadmod"``
+  ``null`` pour une loadlib vide) ; les enregistrements consécutifs d'une
+  même loadlib sont regroupés.
+
+Seule la bibliothèque standard est utilisée.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+from vlm_model import LOADLIBS_KEY, Loadlib, Loadmod, ModelDecoder
+
+# Taille des blocs lus dans le fichier (caractères).
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Fin de tampon sans blanc ni délimiteur : lexème peut-être coupé par le bloc.
+_PARTIAL_TOKEN = re.compile(r'[^ \t\n\r\[\]{},:"]*')
+
+
+class JsonStream:
+    """Flux de valeurs JSON décodées au fil de la lecture d'un fichier texte.
+
+    Le tampon ne garde que le texte non encore décodé : il est compacté à
+    chaque lecture d'un nouveau bloc. Une valeur plus longue qu'un bloc
+    fait doubler la taille de lecture jusqu'à ce qu'elle soit complète.
+    """
+
+    __slots__ = (
+        "_buffer",
+        "_decoder",
+        "_eof",
+        "_f",
+        "_line_start",
+        "_lines",
+        "_offset",
+        "_pos",
+        "_size",
+    )
+
+    def __init__(
+        self,
+        f: TextIO,
+        decoder: json.JSONDecoder,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        """Prépare la lecture de ``f`` avec ``decoder``.
+
+        Args:
+            f: Fichier texte ouvert en lecture.
+            decoder: Décodeur des valeurs (``object_hook`` compris).
+            chunk_size: Taille des blocs lus dans ``f``.
+
+        """
+        self._f = f
+        self._decoder = decoder
+        self._size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        # Position, dans le fichier, du début du tampon, nombre de lignes
+        # qui le précèdent et début de sa première ligne (messages d'erreur).
+        self._offset = 0
+        self._lines = 0
+        self._line_start = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Lit un bloc de plus ; retourne ``False`` en fin de fichier."""
+        if self._eof:
+            return False
+        pending = len(self._buffer) - self._pos
+        data = self._f.read(max(self._size, pending))
+        if not data:
+            # Tampon laissé intact : les positions déjà calculées restent
+            # valables pour le message d'erreur.
+            self._eof = True
+            return False
+        newlines = self._buffer.count("\n", 0, self._pos)
+        if newlines:
+            self._lines += newlines
+            self._line_start = (
+                self._offset + self._buffer.rfind("\n", 0, self._pos) + 1
+            )
+        self._offset += self._pos
+        self._buffer = self._buffer[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def error(
+        self, message: str, pos: int | None = None
+    ) -> json.JSONDecodeError:
+        """Retourne l'erreur de syntaxe ``message`` à la position ``pos``.
+
+        ``pos`` est relative au tampon ; par défaut, la position courante.
+
+        Ligne, colonne et position sont rapportées au fichier, pas au
+        tampon, comme celles de :func:`json.load`.
+        """
+        if pos is None:
+            pos = self._pos
+        exc = json.JSONDecodeError(message, self._buffer, pos)
+        exc.pos = self._offset + pos
+        exc.lineno += self._lines
+        if exc.lineno == self._lines + 1:
+            exc.colno = exc.pos - self._line_start + 1
+        exc.args = (
+            f"{message}: line {exc.lineno} column {exc.colno} (char {exc.pos})",
+        )
+        return exc
+
+    def peek(self) -> str:
+        """Retourne le prochain caractère significatif, ``""`` en fin de flux.
+
+        Les blancs qui le précèdent sont consommés.
+        """
+        while True:
+            match = _WHITESPACE.match(self._buffer, self._pos)
+            self._pos = match.end() if match else self._pos
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        """Consomme le prochain caractère significatif, qui doit être dans ``chars``.
+
+        Raises:
+            json.JSONDecodeError: Si le caractère est autre ou absent.
+
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            raise self.error(f"{' ou '.join(chars)} attendu")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Décode et retourne la prochaine valeur JSON complète.
+
+        Raises:
+            json.JSONDecodeError: Si le texte n'est pas une valeur JSON.
+
+        """
+        if not self.peek():
+            raise self.error("valeur attendue")
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                # Valeur coupée par la fin du bloc : on relit plus loin. Une
+                # erreur avant le dernier lexème est définitive, sans lire le
+                # reste du fichier.
+                if self._truncated(exc) and self._fill():
+                    continue
+                raise self.error(exc.msg, exc.pos) from None
+            # Un nombre en fin de tampon peut se poursuivre dans le bloc
+            # suivant (``1`` puis ``2``, ``1.5`` puis ``e10``) : on ne le
+            # garde qu'une fois le fichier épuisé.
+            if _PARTIAL_TOKEN.fullmatch(self._buffer, end) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _truncated(self, exc: json.JSONDecodeError) -> bool:
+        r"""Indique si l'erreur ``exc`` peut venir de la coupure du tampon.
+
+        C'est le cas d'une chaîne non terminée, ou d'une erreur portant sur
+        le dernier lexème du tampon (``tru``, ``-``, ``1.``, ``\u12``…) ou
+        sur sa fin même.
+        """
+        if exc.msg.startswith("Unterminated string"):
+            return True
+        return _PARTIAL_TOKEN.fullmatch(self._buffer, exc.pos) is not None
+
+    def iter_members(self) -> Iterator[str]:
+        """Parcourt les clés d'un objet ; l'appelant consomme chaque valeur.
+
+        Raises:
+            json.JSONDecodeError: Si l'objet est mal formé.
+
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self.error("clé attendue")
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def iter_array(self) -> Iterator[Any]:
+        """Parcourt les éléments d'un tableau, décodés un par un.
+
+        Raises:
+            json.JSONDecodeError: Si le tableau est mal formé.
+
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _loadlibs(stream: JsonStream) -> Iterator[Loadlib]:
+    """Parcourt un tableau de loadlibs."""
+    for lib in stream.iter_array():
+        if not isinstance(lib, Loadlib):
+            raise stream.error("loadlib attendue")
+        yield lib
+
+
+def _iter_top_level(stream: JsonStream) -> Iterator[Loadlib | dict[str, Any]]:
+    """Parcourt les valeurs de premier niveau du flux.
+
+    Les tableaux de loadlibs sont lus en flux, de même que le membre
+    ``Loadlibs`` d'un objet (document ``table``) ; les autres membres d'un
+    objet, dont la table décodée par ``ModelDecoder``, sont lus en une fois
+    et l'objet est rendu comme dictionnaire.
+    """
+    while char := stream.peek():
+        if char == "[":
+            yield from _loadlibs(stream)
+            continue
+        if char != "{":
+            raise stream.error("tableau ou objet attendu")
+        record: dict[str, Any] = {}
+        for key in stream.iter_members():
+            if key == LOADLIBS_KEY:
+                yield from _loadlibs(stream)
+            else:
+                record[key] = stream.value()
+        yield record
+
+
+def iter_loadlibs(f: TextIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Loadlib]:
+    """Parcourt les loadlibs de ``vlm.json`` au fil de la lecture.
+
+    Args:
+        f: Fichier ``vlm.json`` ouvert en lecture (voir ``utils.open_text``).
+        chunk_size: Taille des blocs lus dans ``f``.
+
+    Yields:
+        Chaque loadlib, objet du modèle commun, dans l'ordre du fichier.
+
+    Raises:
+        json.JSONDecodeError: Si le fichier n'est pas du JSON valide ; les
+            loadlibs précédant l'erreur ont déjà été rendues.
+        ValueError: Si la table des options ou un numéro de jeu ``Copt``
+            est invalide.
+
+    """
+    stream = JsonStream(
+        f, json.JSONDecoder(object_hook=ModelDecoder()), chunk_size
+    )
+    # Loadlib en cours de regroupement (enregistrements JSON Lines).
+    pending: Loadlib | None = None
+    for item in _iter_top_level(stream):
+        if isinstance(item, Loadlib):
+            if pending is not None:
+                yield pending
+                pending = None
+            yield item
+            continue
+        name = item.get("Loadlib")
+        loadmod = item.get("Loadmod")
+        if name is None or not (
+            loadmod is None or isinstance(loadmod, Loadmod)
+        ):
+            # Table des options ou document `table` déjà parcouru.
+            continue
+        if pending is not None and pending.name != name:
+            yield pending
+            pending = None
+        if pending is None:
+            pending = Loadlib(name, item.get("MemberCount", 0))
+        # `"Loadmod": null` : loadlib sans loadmod, rendue vide.
+        if loadmod is not None:
+            pending.loadmods.append(loadmod)
+    if pending is not None:
+        yield pending
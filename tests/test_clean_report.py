@@ -0,0 +1,191 @@
+"""Tests de clean_report.py : découpage en sections et nettoyage parallèle."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import clean_report
+
+ENCODING = "iso8859-1"
+
+
+def _vlm_block(name: str, *, count_line: bool = True) -> list[str]:
+    lines = [
+        "0<vlm>",
+        f'0  <Loadmod Name="{name}">',
+        "0  </Loadmod>",
+        "0</vlm>",
+    ]
+    if count_line:
+        lines.append(" FMNBB437    1 member(s) read")
+    return lines
+
+
+def _dsnin(loadlib: str) -> str:
+    return f" $$FILEM VLM   DSNIN={loadlib},"
+
+
+def _write_report(path: Path, lines: list[str]) -> Path:
+    path.write_text("\n".join(lines) + "\n", encoding=ENCODING)
+    return path
+
+
+@pytest.fixture
+def stray_report(tmp_path: Path) -> Path:
+    """Rapport dont une ligne DSNIN= suit directement ``</vlm>``."""
+    return _write_report(
+        tmp_path / "vlm.txt",
+        [
+            "1IBM File Manager for z/OS",
+            _dsnin("MY.LIB0.LOAD"),
+            *_vlm_block("A0", count_line=False),
+            _dsnin("MY.LIB1.LOAD"),
+            *_vlm_block("A1"),
+            _dsnin("MY.LIB2.LOAD"),
+            *_vlm_block("A2"),
+            " FMNBA010 end",
+        ],
+    )
+
+
+def _section_heads(path: Path) -> list[str]:
+    data = path.read_bytes()
+    sections = clean_report.find_sections(path, ENCODING)
+    return [
+        data[start:end].split(b"\n", 1)[0].decode(ENCODING)
+        for start, end in sections
+    ]
+
+
+def test_find_sections_cuts_at_dsnin(tmp_path: Path) -> None:
+    path = _write_report(
+        tmp_path / "vlm.txt",
+        [
+            "1IBM File Manager for z/OS",
+            _dsnin("MY.LIB0.LOAD"),
+            *_vlm_block("A0"),
+            _dsnin("MY.LIB1.LOAD"),
+            *_vlm_block("A1"),
+        ],
+    )
+    assert _section_heads(path) == [
+        "1IBM File Manager for z/OS",
+        _dsnin("MY.LIB0.LOAD"),
+        _dsnin("MY.LIB1.LOAD"),
+    ]
+
+
+def test_find_sections_skips_dsnin_after_vlm_end(stray_report: Path) -> None:
+    # La ligne qui suit </vlm> est lue comme message FMNBB437 : la DSNIN de
+    # MY.LIB1.LOAD n'ouvre pas de section.
+    assert _section_heads(stray_report) == [
+        "1IBM File Manager for z/OS",
+        _dsnin("MY.LIB0.LOAD"),
+        _dsnin("MY.LIB2.LOAD"),
+    ]
+
+
+def test_find_sections_counts_vlm_end_parity(tmp_path: Path) -> None:
+    # Le second </vlm> est consommé par le premier : la DSNIN est retenue.
+    path = _write_report(
+        tmp_path / "vlm.txt",
+        [
+            _dsnin("MY.LIB0.LOAD"),
+            *_vlm_block("A0", count_line=False),
+            "0</vlm>",
+            _dsnin("MY.LIB1.LOAD"),
+            *_vlm_block("A1"),
+        ],
+    )
+    assert _section_heads(path)[-1] == _dsnin("MY.LIB1.LOAD")
+
+
+def test_parallel_matches_sequential(
+    stray_report: Path, tmp_path: Path
+) -> None:
+    sequential = tmp_path / "w1.xml"
+    parallel = tmp_path / "w4.xml"
+    clean_report.convert_report(stray_report, sequential, ENCODING, workers=1)
+    clean_report.convert_report(stray_report, parallel, ENCODING, workers=4)
+
+    xml = sequential.read_text(encoding="utf-8")
+    assert parallel.read_text(encoding="utf-8") == xml
+    assert xml.count('<vlm loadlib="MY.LIB0.LOAD">') == 2
+    assert "MY.LIB1.LOAD" not in xml
+
+
+class _InterruptedError(Exception):
+    """Interruption simulée après un point de reprise."""
+
+
+def _multi_lib_report(path: Path, nb_libs: int = 6) -> Path:
+    lines = ["1IBM File Manager for z/OS"]
+    for lib in range(nb_libs):
+        lines += [_dsnin(f"MY.LIB{lib}.LOAD"), *_vlm_block(f"A{lib}")]
+    return _write_report(path, lines)
+
+
+def _interrupt_after(monkeypatch: pytest.MonkeyPatch, nb_saves: int) -> None:
+    """Fait échouer le traitement juste après le ``nb_saves``-ième point."""
+    save = clean_report.save_checkpoint
+    calls = 0
+
+    def save_then_fail(path: Path, checkpoint: clean_report.Checkpoint) -> None:
+        nonlocal calls
+        save(path, checkpoint)
+        calls += 1
+        if calls == nb_saves:
+            raise _InterruptedError
+
+    monkeypatch.setattr(clean_report, "save_checkpoint", save_then_fail)
+
+
+def test_resume_truncates_and_restarts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    report = _multi_lib_report(tmp_path / "vlm.txt")
+    expected = tmp_path / "expected.xml"
+    clean_report.convert_report(report, expected, ENCODING)
+
+    output = tmp_path / "clean.xml"
+    ckpt = clean_report.checkpoint_path(output)
+    # Un point de reprise par section, interruption après le deuxième.
+    monkeypatch.setattr(clean_report, "_CHECKPOINT_EVERY", 1)
+    _interrupt_after(monkeypatch, 2)
+    with pytest.raises(_InterruptedError):
+        clean_report.convert_report(report, output, ENCODING, workers=2)
+    assert ckpt.is_file()
+
+    # Fragment écrit après le point de reprise : tronqué à la reprise. Le
+    # début de la sortie, marqué, prouve qu'il n'est pas recalculé.
+    partial = output.read_bytes().replace(b"MY.LIB0", b"MY.LIBX")
+    output.write_bytes(partial + b'<vlm loadlib="PARTIAL">')
+    monkeypatch.undo()
+    clean_report.convert_report(report, output, ENCODING, resume=True)
+
+    assert output.read_bytes() == expected.read_bytes().replace(
+        b"MY.LIB0", b"MY.LIBX"
+    )
+    assert not ckpt.exists()
+
+
+def test_resume_ignores_checkpoint_of_modified_report(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    report = _multi_lib_report(tmp_path / "vlm.txt")
+    output = tmp_path / "clean.xml"
+    monkeypatch.setattr(clean_report, "_CHECKPOINT_EVERY", 1)
+    _interrupt_after(monkeypatch, 1)
+    with pytest.raises(_InterruptedError):
+        clean_report.convert_report(report, output, ENCODING, workers=2)
+    monkeypatch.undo()
+
+    # Le rapport change : le point de reprise ne s'applique plus.
+    report = _multi_lib_report(report, nb_libs=3)
+    expected = tmp_path / "expected.xml"
+    clean_report.convert_report(report, expected, ENCODING)
+    clean_report.convert_report(report, output, ENCODING, resume=True)
+
+    assert output.read_bytes() == expected.read_bytes()
@@ -0,0 +1,224 @@
+"""Tests de reformat_copt.py : moteurs flux, parallèle et splice."""
+
+from __future__ import annotations
+
+import functools
+import io
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import astuple
+
+import pytest
+
+import reformat_copt
+
+ENCODING = "utf-8"
+LOGGER = logging.getLogger("test_reformat_copt")
+
+# Copt variés : LEINFO répétés, déjà numérotés (valeur inchangée une fois
+# renumérotée) ou absents.
+COPT_VALUES = (
+    "NOADV LEINFO=(LE,NOLONGNAME) RENT",
+    "LEINFO=(LE,NOLONGNAME)  NON-LEINFO=(A,(B,C))",
+    "OPT(2)  ,  NOSSRANGE",
+    "X LEINFO=({num})",
+    "",
+)
+
+
+def _vlm_xml(nb_vlm: int) -> bytes:
+    blocks = []
+    num = 1
+    for vlm in range(nb_vlm):
+        copts = []
+        for value in COPT_VALUES:
+            copts.append(f'<Copt Val="{value.format(num=num)}"/>')
+            num += value.count("LEINFO=")
+        blocks.append(
+            f'<vlm loadlib="MY.LIB{vlm}.LOAD"><Loadmod Name="A{vlm}">'
+            f'<Csect Name="C{vlm}">{"".join(copts)}</Csect>'
+            "</Loadmod></vlm>\n"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<root source="vlm &amp; co">\n'
+        f"{''.join(blocks)}</root>"
+    ).encode()
+
+
+def _run(
+    engine: str, xml: bytes, leinfo_mode: str
+) -> tuple[bytes, str, reformat_copt.ReformatStats]:
+    f_out = io.BytesIO()
+    ignored = io.StringIO()
+    f_in = io.BytesIO(xml)
+    if engine == "stream":
+        stats = reformat_copt.reformat_stream(
+            f_in, f_out, ENCODING, leinfo_mode, ignored, LOGGER
+        )
+    else:
+        stats = reformat_copt.reformat_parallel(
+            f_in, f_out, ENCODING, leinfo_mode, ignored, LOGGER, workers=2
+        )
+    return f_out.getvalue(), ignored.getvalue(), stats
+
+
+def _metrics(stats: reformat_copt.ReformatStats) -> tuple[int, ...]:
+    """Métriques du traitement, hors compteurs de cache des processus."""
+    return astuple(stats)[:4]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Découpe le XML en morceaux de quelques blocs `<vlm>`."""
+    monkeypatch.setattr(
+        reformat_copt,
+        "split_vlm_chunks",
+        functools.partial(reformat_copt.split_vlm_chunks, chunk_size=512),
+    )
+
+
+@pytest.mark.usefixtures("small_chunks")
+@pytest.mark.parametrize("leinfo_mode", reformat_copt.LEINFO_MODES)
+def test_parallel_matches_stream(leinfo_mode: str) -> None:
+    xml = _vlm_xml(40)
+    assert len(list(reformat_copt.split_vlm_chunks(io.BytesIO(xml)))) > 4
+
+    out, ignored, stats = _run("stream", xml, leinfo_mode)
+    par_out, par_ignored, par_stats = _run("parallel", xml, leinfo_mode)
+
+    assert par_out == out
+    assert par_ignored == ignored
+    assert _metrics(par_stats) == _metrics(stats)
+    assert b'<root source="vlm &amp; co">' in out
+
+
+@pytest.mark.usefixtures("small_chunks")
+def test_parallel_numbers_leinfo_in_document_order() -> None:
+    out, ignored, stats = _run("parallel", _vlm_xml(40), "placeholder")
+
+    nb_leinfo = 40 * 4
+    assert [line.split("\t", 1)[0] for line in ignored.splitlines()] == [
+        str(num) for num in range(1, nb_leinfo + 1)
+    ]
+    assert f"LEINFO=({nb_leinfo})".encode() in out
+    assert reformat_copt._SLOT.encode() not in out
+    # `X LEINFO=(N)` retrouve son numéro : ce Copt reste inchangé.
+    assert stats.total_copt == 40 * len(COPT_VALUES)
+    assert stats.modified_copt == 40 * 3
+    # Les caches des processus sont remontés au processus principal.
+    assert stats.worker_cache_hits + stats.worker_cache_misses > 0
+
+
+def test_merge_chunk_fills_slots() -> None:
+    slot = reformat_copt._SLOT
+    body = f'<Copt Val="A LEINFO=({slot}) LEINFO=({slot})"/>'
+    stats = reformat_copt.ReformatStats(total_copt=2, modified_copt=2)
+    result = reformat_copt._ChunkResult(
+        body=body.encode(),
+        leinfo_tokens=["LEINFO=(X)", "LEINFO=(Y)"],
+        stats=stats,
+        checks=[
+            (0, "A LEINFO=(3) LEINFO=(4)", f"A LEINFO=({slot}) LEINFO=({slot})")
+        ],
+    )
+    state = reformat_copt.ReformatState(leinfo_counter=2)
+    f_out = io.BytesIO()
+    ignored = io.StringIO()
+
+    reformat_copt._merge_chunk(result, f_out, state, ignored, "placeholder")
+
+    assert f_out.getvalue() == b'<Copt Val="A LEINFO=(3) LEINFO=(4)"/>'
+    assert ignored.getvalue() == "3\tLEINFO=(X)\n4\tLEINFO=(Y)\n"
+    assert state.leinfo_counter == 4
+    assert stats.modified_copt == 1
+
+
+# Moteur `splice` : entités, délimiteurs et contenus à ne pas réécrire.
+SPLICE_XML = """<?xml version="1.0" encoding="iso8859-1"?>
+<root source='vlm &amp; co'>
+  <!-- <Copt Val="NE  PAS , TOUCHER"/> -->
+  <vlm loadlib="MY.LIB0.LOAD">
+    <Loadmod Name="A0">
+      <Copt Id="1" Val="A&amp;B  ,  C&#10;D&#x9;E LEINFO=(LE,X)"/>
+      <Copt Val='QUOTE(&apos;)  ,  APOST("x")  LEINFO=(LE,X)'/>
+      <Copt
+        Val = "OPT(2)   NOSSRANGE" Name="&lt;é&gt;"/>
+      <Copt Name="sans Val"/>
+      <Desc><![CDATA[<Copt Val="A  ,  B"/>]]></Desc>
+      <?pi <Copt Val="A  ,  B"?>
+      <Copt Val="DÉJÀ PROPRE"/>
+    </Loadmod>
+  </vlm>
+</root>
+"""
+
+
+def _copt_values(xml: bytes) -> list[str | None]:
+    root = ET.fromstring(xml)
+    return [copt.get("Val") for copt in root.iter("Copt")]
+
+
+@pytest.mark.parametrize("feed_size", [7, 64, 1 << 20])
+@pytest.mark.parametrize("leinfo_mode", reformat_copt.LEINFO_MODES)
+def test_splice_matches_stream(
+    monkeypatch: pytest.MonkeyPatch, feed_size: int, leinfo_mode: str
+) -> None:
+    monkeypatch.setattr(reformat_copt, "_FEED_SIZE", feed_size)
+    xml = SPLICE_XML.encode("iso8859-1")
+
+    outputs = {}
+    for engine in ("stream", "splice"):
+        f_out = io.BytesIO()
+        ignored = io.StringIO()
+        run = getattr(reformat_copt, f"reformat_{engine}")
+        stats = run(
+            io.BytesIO(xml), f_out, "iso8859-1", leinfo_mode, ignored, LOGGER
+        )
+        outputs[engine] = (f_out.getvalue(), ignored.getvalue(), stats)
+
+    stream_out, stream_ignored, stream_stats = outputs["stream"]
+    splice_out, splice_ignored, splice_stats = outputs["splice"]
+    assert _copt_values(splice_out) == _copt_values(stream_out)
+    assert splice_ignored == stream_ignored
+    assert splice_stats == stream_stats
+
+    # Seuls les `Val` modifiés changent : le reste est recopié tel quel.
+    text = splice_out.decode("iso8859-1")
+    assert text.startswith(SPLICE_XML[: SPLICE_XML.index("<vlm")])
+    assert '<Desc><![CDATA[<Copt Val="A  ,  B"/>]]></Desc>' in text
+    assert '<?pi <Copt Val="A  ,  B"?>' in text
+    assert '<Copt Val="DÉJÀ PROPRE"/>' in text
+    assert 'Val = "OPT(2) NOSSRANGE" Name="&lt;é&gt;"/>' in text
+
+
+def test_splice_escapes_with_original_quote() -> None:
+    f_out = io.BytesIO()
+    reformat_copt.reformat_splice(
+        io.BytesIO(SPLICE_XML.encode("iso8859-1")),
+        f_out,
+        "iso8859-1",
+        "keep",
+        None,
+        LOGGER,
+    )
+    text = f_out.getvalue().decode("iso8859-1")
+    assert "Val='QUOTE(&apos;) , APOST(\"x\") LEINFO=(LE,X)'" in text
+    assert 'Val="A&amp;B , C D E LEINFO=(LE,X)"' in text
+
+
+@pytest.mark.parametrize(
+    ("body", "message"),
+    [
+        ('<Copt Val="&nbsp;"/>', "undefined entity"),
+        ('<Copt Val="A & B"/>', "invalid '&'"),
+        ('<Copt Val="&#xZZ;"/>', "invalid '&'"),
+        ("<!-- <Copt", "unclosed comment"),
+    ],
+)
+def test_splice_rejects_malformed_input(body: str, message: str) -> None:
+    xml = f"<root><vlm>{body}</vlm></root>".encode()
+    with pytest.raises(ET.ParseError, match=message):
+        reformat_copt.reformat_splice(
+            io.BytesIO(xml), io.BytesIO(), "utf-8", "keep", None, LOGGER
+        )
@@ -0,0 +1,167 @@
+"""Tests de vlm_stream.py : décodage en flux de vlm.json."""
+
+from __future__ import annotations
+
+import io
+import json
+from typing import Any
+
+import pytest
+
+import build_json
+import vlm_stream
+from vlm_model import ModelDecoder
+
+# Nombres, échappements et littéraux : autant de lexèmes à couper.
+VALUES_JSON = """[
+  12345, -1.5e10, 0, "a\\"b\\\\c", "\\u00e9t\\u00e9 \\ud83d\\ude00",
+  true, false, null, [], {},
+  {"Name": "CEEUOPT", "Size": 4096, "Copt": ["RENT", "OPT(2)"]},
+  [[1, [2, [3]]], {"a": {"b": {"c": -0.25}}}],
+  "fin"
+]
+"""
+
+LIBS = [
+    {
+        "Loadlib": "MY.LIB0.LOAD",
+        "MemberCount": 2,
+        "Loadmods": [
+            {
+                "Name": "PGMA",
+                "CSECTs": [
+                    {"Name": "PGMA", "Copt": ["RENT", "OPT(2)"]},
+                    {"Name": "DFHECI", "Copt": []},
+                ],
+            },
+            {"Name": "PGMB", "CSECTs": [{"Name": "PGMB", "Copt": ["RENT"]}]},
+        ],
+    },
+    {"Loadlib": "MY.EMPTY.LOAD", "MemberCount": 0, "Loadmods": []},
+    {
+        "Loadlib": "MY.LIB2.LOAD",
+        "MemberCount": 1,
+        "Loadmods": [{"Name": "PGMC", "CSECTs": [{"Name": "PGMC"}]}],
+    },
+]
+
+
+class _CountingReader(io.StringIO):
+    """Flux texte qui compte les caractères lus."""
+
+    def __init__(self, text: str) -> None:
+        super().__init__(text)
+        self.chars_read = 0
+
+    def read(self, size: int | None = -1, /) -> str:
+        data = super().read(size)
+        self.chars_read += len(data)
+        return data
+
+
+def _stream(text: str, chunk_size: int) -> vlm_stream.JsonStream:
+    return vlm_stream.JsonStream(
+        io.StringIO(text), json.JSONDecoder(), chunk_size
+    )
+
+
+def _model_libs() -> list[Any]:
+    return json.loads(json.dumps(LIBS), object_hook=ModelDecoder())
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 41))
+def test_values_split_across_chunks(chunk_size: int) -> None:
+    stream = _stream(VALUES_JSON, chunk_size)
+    assert list(stream.iter_array()) == json.loads(VALUES_JSON)
+    assert stream.peek() == ""
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "[1, 2,\n  tru]",
+        '[\n {"a": 1,\n  "b": [1, 2 3]}]',
+        '[1,\n  "abc]',
+        "[1, 2\n 3]",
+        '[1, 2, {"a" 1}]',
+        "[1, -]",
+        "[1, 1.5e]",
+        "[1, 2,",
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 3, 8, 1 << 16])
+def test_error_position_matches_json_loads(text: str, chunk_size: int) -> None:
+    with pytest.raises(json.JSONDecodeError) as expected:
+        json.loads(text)
+    with pytest.raises(json.JSONDecodeError) as error:
+        list(_stream(text, chunk_size).iter_array())
+
+    exc = error.value
+    want = expected.value
+    assert (exc.pos, exc.lineno, exc.colno) == (
+        want.pos,
+        want.lineno,
+        want.colno,
+    )
+
+
+def test_error_mid_file_stops_reading() -> None:
+    text = '[{"a": 1 "b": 2},\n' + "1,\n" * 100_000 + "1]"
+    f = _CountingReader(text)
+    stream = vlm_stream.JsonStream(f, json.JSONDecoder(), 64)
+
+    with pytest.raises(json.JSONDecodeError, match="line 1 column 10"):
+        list(stream.iter_array())
+    assert f.chars_read <= 128
+
+
+@pytest.mark.parametrize("json_format", build_json.JSON_FORMATS)
+@pytest.mark.parametrize("copt_layout", build_json.COPT_LAYOUTS)
+@pytest.mark.parametrize("chunk_size", [5, 1 << 16])
+def test_iter_loadlibs_reads_every_output(
+    json_format: str, copt_layout: str, chunk_size: int
+) -> None:
+    f = io.StringIO()
+    build_json.write_json(_model_libs(), f, json_format, copt_layout)
+    f.seek(0)
+
+    libs = list(vlm_stream.iter_loadlibs(f, chunk_size))
+
+    assert [lib.to_dict() for lib in libs] == [
+        lib.to_dict() for lib in _model_libs()
+    ]
+
+
+def test_iter_loadlibs_groups_json_lines() -> None:
+    lines = [
+        {
+            "Loadlib": "A",
+            "MemberCount": 2,
+            "Loadmod": {"Name": "M1", "CSECTs": []},
+        },
+        {
+            "Loadlib": "A",
+            "MemberCount": 2,
+            "Loadmod": {"Name": "M2", "CSECTs": []},
+        },
+        {"Loadlib": "EMPTY", "MemberCount": 0, "Loadmod": None},
+        {
+            "Loadlib": "B",
+            "MemberCount": 1,
+            "Loadmod": {"Name": "M3", "CSECTs": []},
+        },
+    ]
+    text = "".join(json.dumps(line) + "\n" for line in lines)
+
+    libs = list(vlm_stream.iter_loadlibs(io.StringIO(text), 7))
+
+    assert [(lib.name, lib.member_count) for lib in libs] == [
+        ("A", 2),
+        ("EMPTY", 0),
+        ("B", 1),
+    ]
+    assert [[mod.name for mod in lib.loadmods] for lib in libs] == [
+        ["M1", "M2"],
+        [],
+        ["M3"],
+    ]